@@ -1,8 +1,5 @@
 from flask import Flask, send_from_directory, send_file
-from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 import sys
 import os
 sys.path.append('..')
@@ -13,53 +10,88 @@ from backend.app.database import db
 jwt = JWTManager()
 limiter = None
 
+# Worker app shared by all tasks in one worker process
+_worker_app = None
+_worker_app_pid = None
+
 def create_app(config_class=Config):
     """Create and configure the Flask application"""
+    from backend.app.utils.startup import StartupTimer
+    timer = StartupTimer()
+    
     app = Flask(__name__)
     app.config.from_object(config_class)
     
-    # Initialize database and JWT first
-    db.init_app(app)
-    jwt.init_app(app)
-    
-    # Configure CORS - Allow all origins for production deployment
-    CORS(app, 
-         origins=['*'], 
-         supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
-    
-    # Initialize rate limiter with memory storage (Redis removed)
-    global limiter
-    limiter = Limiter(
-        key_func=get_remote_address,
-        default_limits=["200000 per day", "5000 per hour"]
-    )
-    limiter.init_app(app)
+    with timer.phase('extensions'):
+        # Initialize database and JWT first
+        db.init_app(app)
+        jwt.init_app(app)
+
+        # Admit, queue or shed requests by route priority before any other work
+        from backend.app.utils.admission import init_admission_control
+        init_admission_control(app)
+
+        # Route read-only requests to the replica when one is configured
+        from backend.app.utils.db_routing import init_read_replica
+        init_read_replica(app)
+
+        # Count queries and DB time per request (Server-Timing header)
+        from backend.app.utils.sql_stats import init_sql_stats
+        init_sql_stats(app)
+
+        # Log slow statements with EXPLAIN plans for /api/admin/slow-queries
+        from backend.app.utils.slow_queries import init_slow_query_log
+        init_slow_query_log(app)
+
+        # Queue submissions for group commit when GROUP_COMMIT_ENABLED is set
+        from backend.app.utils.group_commit import init_group_commit
+        init_group_commit(app)
+        
+        # HTTP-only extensions are imported here so workers and scripts skip them
+        from flask_cors import CORS
+        from flask_limiter import Limiter
+        from flask_limiter.util import get_remote_address
+        
+        # Configure CORS - Allow all origins for production deployment
+        CORS(app, 
+             origins=['*'], 
+             supports_credentials=True,
+             allow_headers=['Content-Type', 'Authorization'],
+             methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+        
+        # Initialize rate limiter with memory storage (Redis removed)
+        global limiter
+        limiter = Limiter(
+            key_func=get_remote_address,
+            default_limits=["200000 per day", "5000 per hour"]
+        )
+        limiter.init_app(app)
     
-    # Import models to ensure they're registered with SQLAlchemy
-    from backend.app.models import User, Admin, Subject, Chapter, Quiz, Question, Score
-    
-    # Register blueprints
-    from backend.app.routes.auth import auth_bp
-    from backend.app.routes.admin import admin_bp
-    from backend.app.routes.user import user_bp
-    from backend.app.routes.quiz import quiz_bp
-    from backend.app.routes.common import common_bp
-    
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    app.register_blueprint(user_bp, url_prefix='/api/user')
-    app.register_blueprint(quiz_bp, url_prefix='/api/quiz')
-    app.register_blueprint(common_bp, url_prefix='/api')
-    
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    with timer.phase('models'):
+        # Import models to ensure they're registered with SQLAlchemy
+        from backend.app.models import User, Admin, Subject, Chapter, Quiz, Question, Score
+    
+    with timer.phase('blueprints'):
+        # Register blueprints
+        from backend.app.routes.auth import auth_bp
+        from backend.app.routes.admin import admin_bp
+        from backend.app.routes.user import user_bp
+        from backend.app.routes.quiz import quiz_bp
+        from backend.app.routes.common import common_bp
         
-        # Create default admin if not exists
-        from backend.app.utils.init_db import create_default_admin
-        create_default_admin()
+        app.register_blueprint(auth_bp, url_prefix='/api/auth')
+        app.register_blueprint(admin_bp, url_prefix='/api/admin')
+        app.register_blueprint(user_bp, url_prefix='/api/user')
+        app.register_blueprint(quiz_bp, url_prefix='/api/quiz')
+        app.register_blueprint(common_bp, url_prefix='/api')
+    
+    # Schema creation connects to the database and may hash the admin
+    # password, so it is opt-in; otherwise run init_database() on deploy
+    if app.config.get('AUTO_CREATE_SCHEMA'):
+        with timer.phase('schema'):
+            from backend.app.utils.init_db import init_database
+            with app.app_context():
+                init_database()
     
     # Serve frontend static files
     frontend_dist = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
@@ -90,4 +122,39 @@ def create_app(config_class=Config):
     def ratelimit_handler(e):
         return {'error': f'Rate limit exceeded: {e.description}'}, 429
     
-    return app 
+    app.extensions['startup_timings'] = timer.to_dict()
+    if app.config.get('STARTUP_PROFILE'):
+        print(timer.report())
+    
+    return app
+
+def create_worker_app(config_class=Config):
+    """Create a lightweight app for Celery tasks and CLI scripts
+    
+    Only the database and its instrumentation are set up. Schema creation, the
+    default admin, JWT, CORS, rate limiting and blueprints are HTTP-only and
+    are skipped, so the schema must already exist (see init_database()).
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    
+    db.init_app(app)
+    
+    from backend.app.utils.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+    
+    # Import models to ensure they're registered with SQLAlchemy
+    from backend.app import models
+    
+    return app
+
+def get_worker_app():
+    """Get the worker app, building it once per (forked) worker process"""
+    global _worker_app, _worker_app_pid
+    
+    # Engines must not be shared across fork, so a child builds its own app
+    if _worker_app is None or _worker_app_pid != os.getpid():
+        _worker_app = create_worker_app()
+        _worker_app_pid = os.getpid()
+    
+    return _worker_app
@@ -1,4 +1,36 @@
 from flask_sqlalchemy import SQLAlchemy
+from backend.app.utils.db_routing import RoutingSession
 
 # Create a single instance to be shared across all models
-db = SQLAlchemy() 
+# RoutingSession sends read-only work to the replica bind when one is configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def insert_ignore(model, index_elements):
+    """INSERT statement for model that skips rows conflicting on index_elements"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    from sqlalchemy import insert
+    return insert(model).prefix_with('IGNORE')
+
+def insert_or_increment(model, index_elements, columns):
+    """INSERT statement for model that adds columns onto rows conflicting on index_elements"""
+    table = model.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(model)
+        return stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: table.c[column] + stmt.excluded[column] for column in columns}
+        )
+    from sqlalchemy.dialects.mysql import insert
+    stmt = insert(model)
+    return stmt.on_duplicate_key_update({column: table.c[column] + stmt.inserted[column] for column in columns})
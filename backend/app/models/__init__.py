@@ -5,6 +5,16 @@ from .chapter import Chapter
 from .quiz import Quiz
 from .question import Question
 from .score import Score
-from .reminder import Reminder
+from .reminder import Reminder, ReminderReadState
+from .broadcast import BroadcastNotification, BroadcastReceipt
+from .subject_follower import SubjectFollower
+from .monthly_report import MonthlyReportDelivery
+from .item_analysis import ItemAnalysisCache
+from .answer_distribution import QuestionOptionCount
+from .regrade import RegradeJob
+from .answer_layout import AnswerLayout
 
-__all__ = ['User', 'Admin', 'Subject', 'Chapter', 'Quiz', 'Question', 'Score', 'Reminder'] 
+__all__ = ['User', 'Admin', 'Subject', 'Chapter', 'Quiz', 'Question', 'Score', 'Reminder',
+           'ReminderReadState', 'BroadcastNotification', 'BroadcastReceipt', 'SubjectFollower',
+           'MonthlyReportDelivery', 'ItemAnalysisCache', 'QuestionOptionCount', 'RegradeJob',
+           'AnswerLayout'] 
@@ -0,0 +1,69 @@
+from backend.app.database import db, insert_or_increment
+
+
+class QuestionOptionCount(db.Model):
+    """How many submissions picked each answer of a question
+
+    answer is one of the question's answer choices, 'other' for a value that
+    is not one of them, or 'omitted' when the question was left blank, so the
+    counts of a question add up to its quiz's submissions. Rows are kept up to
+    date by the submit routes, which commit count_rows() for each submission
+    together with its score (see utils/group_commit.py).
+    """
+    __tablename__ = 'question_option_counts'
+    __table_args__ = (
+        db.Index('idx_question_option_counts_quiz', 'quiz_id'),
+    )
+
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    answer = db.Column(db.String(255), primary_key=True)  # same values as Question.correct_answer
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    OTHER = 'other'
+    OMITTED = 'omitted'
+
+    @staticmethod
+    def bucket(question, answer, choices=None):
+        """Counter an answer to question is recorded under"""
+        if answer is None or answer == '':
+            return QuestionOptionCount.OMITTED
+        answer = str(answer)
+        return answer if answer in (choices or question.get_answer_choices()) else QuestionOptionCount.OTHER
+
+    @staticmethod
+    def count_rows(quiz_id, questions, answer_maps):
+        """Counter increments for a batch of submissions, one row per (question, answer)"""
+        increments = {}
+        for question in questions:
+            choices = question.get_answer_choices()
+            for answers in answer_maps:
+                key = (question.id, QuestionOptionCount.bucket(question, answers.get(str(question.id)), choices))
+                increments[key] = increments.get(key, 0) + 1
+        return [{'question_id': question_id, 'answer': answer, 'quiz_id': quiz_id, 'count': count}
+                for (question_id, answer), count in increments.items()]
+
+    @staticmethod
+    def add_counts(rows):
+        """Add count_rows() increments to the counters with a single multi-row upsert
+
+        Runs in the caller's transaction, so the counts commit with the score.
+        """
+        if rows:
+            db.session.execute(
+                insert_or_increment(QuestionOptionCount, ['question_id', 'answer'], ['count']).values(rows)
+            )
+
+    @staticmethod
+    def distribution(quiz_id):
+        """{question_id: {answer: count}} for a quiz, from one query"""
+        rows = db.session.query(
+            QuestionOptionCount.question_id, QuestionOptionCount.answer, QuestionOptionCount.count
+        ).filter(QuestionOptionCount.quiz_id == quiz_id).all()
+        counts = {}
+        for question_id, answer, count in rows:
+            counts.setdefault(question_id, {})[answer] = count
+        return counts
+
+    def __repr__(self):
+        return f'<QuestionOptionCount question {self.question_id} {self.answer!r}: {self.count}>'
@@ -0,0 +1,75 @@
+from backend.app.database import db, insert_ignore
+from datetime import datetime
+import json
+
+# Layout rows never change once written, so their codecs are kept per process
+_codecs = {}
+_layout_ids = {}
+
+
+class AnswerLayout(db.Model):
+    """Question order and answer choices that packed Score answers refer to
+
+    One row per quiz version (see utils/answer_encoding.py); rows are
+    immutable, a change to the questions' choices adds a new one.
+    """
+    __tablename__ = 'answer_layouts'
+    __table_args__ = (
+        db.UniqueConstraint('quiz_id', 'version', name='uq_answer_layouts_quiz_version'),
+        # Cached codecs are keyed by id, so SQLite must never reuse the id of a rolled-back row
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    version = db.Column(db.String(40), nullable=False)
+    question_ids = db.Column(db.Text, nullable=False)  # JSON array, layout column order
+    choices = db.Column(db.Text, nullable=False)  # JSON array of each question's answer choices
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def codec(layout_id):
+        """AnswerCodec for a stored layout"""
+        from backend.app.utils.answer_encoding import AnswerCodec
+
+        codec = _codecs.get(layout_id)
+        if codec is None:
+            layout = db.session.get(AnswerLayout, layout_id)
+            codec = AnswerCodec(layout.id, json.loads(layout.question_ids), json.loads(layout.choices))
+            _codecs[layout_id] = codec
+        return codec
+
+    @staticmethod
+    def for_questions(quiz_id, questions):
+        """AnswerCodec for the quiz's current questions, adding the layout if it is new
+
+        A new layout is inserted in the caller's transaction, so it commits
+        (or rolls back) together with the scores packed against it.
+        """
+        from backend.app.utils.answer_encoding import AnswerCodec, layout_version
+
+        questions = sorted(questions, key=lambda question: (question.order or 0, question.id))
+        version = layout_version(questions)
+        layout_id = _layout_ids.get((quiz_id, version))
+        if layout_id is None:
+            layout_id = db.session.query(AnswerLayout.id).filter_by(quiz_id=quiz_id, version=version).scalar()
+            if layout_id is not None:
+                _layout_ids[(quiz_id, version)] = layout_id
+        if layout_id is not None:
+            return AnswerLayout.codec(layout_id)
+
+        question_ids = [question.id for question in questions]
+        choices = [question.get_answer_choices() for question in questions]
+        db.session.execute(insert_ignore(AnswerLayout, ['quiz_id', 'version']).values(
+            quiz_id=quiz_id,
+            version=version,
+            question_ids=json.dumps(question_ids),
+            choices=json.dumps(choices),
+            created_at=datetime.utcnow()
+        ))
+        layout_id = db.session.query(AnswerLayout.id).filter_by(quiz_id=quiz_id, version=version).scalar()
+        # Not cached until it is found committed; the insert may still roll back
+        return AnswerCodec(layout_id, question_ids, choices)
+
+    def __repr__(self):
+        return f'<AnswerLayout {self.id} quiz {self.quiz_id} v{self.version[:8]}>'
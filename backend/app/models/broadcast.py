@@ -0,0 +1,124 @@
+from backend.app.database import db, insert_ignore
+from datetime import datetime
+from sqlalchemy import and_, or_, exists, func, select
+from backend.app.models.subject_follower import SubjectFollower
+from backend.app.models.reminder import ReminderReadState
+
+
+class BroadcastNotification(db.Model):
+    """A notification stored once and shown to every user in its audience"""
+    __tablename__ = 'broadcast_notifications'
+    __table_args__ = (
+        # One broadcast per type and entity (e.g. one 'new_quiz' per quiz)
+        db.Index('uq_broadcast_type_entity', 'notification_type', 'entity_id', unique=True),
+        db.Index('idx_broadcast_created', 'created_at'),
+        # Read cursors compare ids, so SQLite must never reuse the id of a deleted row
+        {'sqlite_autoincrement': True},
+    )
+
+    AUDIENCE_ALL = 'all'
+    AUDIENCE_SUBJECT_FOLLOWERS = 'subject_followers'
+
+    id = db.Column(db.Integer, primary_key=True)
+    message = db.Column(db.Text, nullable=False)
+    notification_type = db.Column(db.String(50), nullable=False)  # 'new_quiz', 'general'
+    audience = db.Column(db.String(30), default=AUDIENCE_ALL, nullable=False)  # 'all', 'subject_followers'
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=True)
+    entity_id = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    @staticmethod
+    def insert_ignore_duplicates():
+        """INSERT statement that skips broadcasts already sent for the entity"""
+        return insert_ignore(BroadcastNotification, ['notification_type', 'entity_id'])
+
+    @staticmethod
+    def read_condition(user_id):
+        """SQL condition: read via the user's broadcast cursor or a per-broadcast receipt
+
+        Needs BroadcastReceipt outer-joined for user_id (see for_user()).
+        """
+        last_read_id = select(ReminderReadState.last_read_broadcast_id).where(
+            ReminderReadState.user_id == user_id
+        ).scalar_subquery()
+        return or_(
+            BroadcastNotification.id <= func.coalesce(last_read_id, 0),
+            func.coalesce(BroadcastReceipt.is_read, False) == True
+        )
+
+    @staticmethod
+    def for_user(user_id, now=None):
+        """Query of (broadcast, is_read) rows visible to a user, fanned out at read time"""
+        now = now or datetime.utcnow()
+        in_audience = or_(
+            BroadcastNotification.audience == BroadcastNotification.AUDIENCE_ALL,
+            and_(
+                BroadcastNotification.audience == BroadcastNotification.AUDIENCE_SUBJECT_FOLLOWERS,
+                exists().where(
+                    SubjectFollower.user_id == user_id,
+                    SubjectFollower.subject_id == BroadcastNotification.subject_id
+                )
+            )
+        )
+
+        return db.session.query(
+            BroadcastNotification,
+            BroadcastNotification.read_condition(user_id).label('is_read')
+        ).outerjoin(
+            BroadcastReceipt,
+            and_(
+                BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                BroadcastReceipt.user_id == user_id
+            )
+        ).filter(
+            in_audience,
+            or_(BroadcastNotification.expires_at.is_(None), BroadcastNotification.expires_at > now),
+            func.coalesce(BroadcastReceipt.is_dismissed, False) == False
+        )
+
+    @staticmethod
+    def total_for_user(user_id, now=None):
+        """Number of broadcasts visible to a user, read or not"""
+        return BroadcastNotification.for_user(user_id, now).with_entities(
+            func.count(BroadcastNotification.id)
+        ).scalar() or 0
+
+    @staticmethod
+    def unread_count_for_user(user_id, last_read_id, now=None):
+        """Unread broadcasts visible to a user, given their broadcast cursor
+
+        Only broadcasts above the cursor can be unread, so this is a primary key
+        range scan over what was posted since the user last marked all read,
+        however many broadcasts exist in total.
+        """
+        return BroadcastNotification.for_user(user_id, now).filter(
+            BroadcastNotification.id > (last_read_id or 0),
+            func.coalesce(BroadcastReceipt.is_read, False) == False
+        ).with_entities(func.count(BroadcastNotification.id)).scalar() or 0
+
+    def to_dict(self, user_id=None, is_read=False):
+        """Serialize in the same shape as Reminder.to_dict()"""
+        return {
+            'id': f'broadcast-{self.id}',
+            'user_id': user_id,
+            'message': self.message,
+            'reminder_type': self.notification_type,
+            'is_read': bool(is_read),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'broadcast': True
+        }
+
+    def __repr__(self):
+        return f'<BroadcastNotification {self.id}: {self.notification_type} to {self.audience}>'
+
+
+class BroadcastReceipt(db.Model):
+    """Per-user state of a single broadcast, only written when the user acts on it"""
+    __tablename__ = 'broadcast_receipts'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    broadcast_id = db.Column(db.Integer, db.ForeignKey('broadcast_notifications.id'), primary_key=True)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)
+    is_dismissed = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from backend.app.database import db
+from datetime import datetime
+
+
+class ItemAnalysisCache(db.Model):
+    """Running item analysis totals for one quiz version
+
+    state holds the sums that the statistics are derived from (see
+    utils/item_analysis.py), covering every score up to last_score_id. New
+    scores are added to it; a change to the quiz's questions gives a new
+    version and the totals are rebuilt from all scores.
+    """
+    __tablename__ = 'item_analysis_cache'
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), primary_key=True)
+    version = db.Column(db.String(40), nullable=False)  # fingerprint of the active questions
+    last_score_id = db.Column(db.Integer, default=0, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    state = db.Column(db.Text, nullable=False)  # JSON running totals
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ItemAnalysisCache quiz {self.quiz_id} v{self.version[:8]}: {self.attempts} attempts>'
@@ -0,0 +1,53 @@
+from backend.app.database import db
+from datetime import datetime
+
+
+class MonthlyReportDelivery(db.Model):
+    """Checkpoint of one user's monthly report for one period
+    
+    A row is claimed as 'pending' before the report is sent and finished as
+    'sent', 'failed' or 'skipped' afterwards, so an overlapping run never
+    picks the same user. A row is only claimed again (attempts + 1) when it
+    is 'failed' with attempts left, or still 'pending' after the lease
+    expired, i.e. its run crashed; a crash between sending and recording the
+    outcome is the only way a report can go out twice.
+    """
+    __tablename__ = 'monthly_report_deliveries'
+    __table_args__ = (
+        db.Index('idx_monthly_report_deliveries_status', 'period', 'status'),
+    )
+    
+    period = db.Column(db.Date, primary_key=True)  # first day of the reported month
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # 'pending', 'sent', 'failed', 'skipped'
+    claimed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    attempts = db.Column(db.Integer, default=1, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    STATUSES = ('pending', 'sent', 'failed', 'skipped')
+    
+    @staticmethod
+    def reclaimable(period, lease_expired_before, max_attempts):
+        """Filter for the period's rows that a run may claim again"""
+        return db.and_(
+            MonthlyReportDelivery.period == period,
+            db.or_(
+                db.and_(MonthlyReportDelivery.status == 'pending',
+                        MonthlyReportDelivery.claimed_at < lease_expired_before),
+                db.and_(MonthlyReportDelivery.status == 'failed',
+                        MonthlyReportDelivery.attempts < max_attempts)
+            )
+        )
+    
+    @staticmethod
+    def counts_for_period(period):
+        """Number of deliveries per status for a period"""
+        rows = db.session.query(
+            MonthlyReportDelivery.status, db.func.count()
+        ).filter(MonthlyReportDelivery.period == period).group_by(MonthlyReportDelivery.status).all()
+        counts = dict.fromkeys(MonthlyReportDelivery.STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+    
+    def __repr__(self):
+        return f'<MonthlyReportDelivery {self.period} user {self.user_id}: {self.status}>'
@@ -36,6 +36,16 @@ class Question(db.Model):
         """Set options from list"""
         self.options = json.dumps(options_list)
     
+    def get_answer_choices(self):
+        """Answer values the options are submitted as ('0', '1', ... or 'true'/'false')"""
+        if self.question_type == 'true_false':
+            choices = ['true', 'false']
+        else:
+            choices = [str(index) for index in range(len(self.get_options()))]
+        if str(self.correct_answer) not in choices:
+            choices.append(str(self.correct_answer))
+        return choices
+    
     def to_dict(self):
         """Convert question to dictionary"""
         return {
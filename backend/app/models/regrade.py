@@ -0,0 +1,97 @@
+from backend.app.database import db
+from sqlalchemy import update
+from datetime import datetime, timedelta
+
+
+class RegradeJob(db.Model):
+    """Checkpointed regrade of a quiz's scores after its answer key changed
+
+    last_score_id is the checkpoint: scores up to it have been regraded
+    against the key with fingerprint key_version, and it is committed in the
+    same transaction as each chunk's updates, so a restarted job carries on
+    from there. A quiz has at most one unfinished job; later key changes are
+    picked up by that job, which starts over when the key it graded with is
+    no longer current. A worker must claim() a job before running it, and
+    updated_at is its heartbeat.
+    """
+    __tablename__ = 'regrade_jobs'
+    __table_args__ = (
+        db.Index('idx_regrade_jobs_quiz_status', 'quiz_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=True)  # question whose change queued it
+    status = db.Column(db.String(20), default='pending', nullable=False)  # 'pending', 'running', 'completed', 'failed'
+    key_version = db.Column(db.String(40), nullable=True)
+    last_score_id = db.Column(db.Integer, default=0, nullable=False)
+    total_scores = db.Column(db.Integer, default=0, nullable=False)
+    processed = db.Column(db.Integer, default=0, nullable=False)
+    changed = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # heartbeat, moved every chunk
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    UNFINISHED = ('pending', 'running')
+    # A running job whose heartbeat is older than this is taken to have lost its worker
+    STALE_AFTER = timedelta(minutes=10)
+
+    @staticmethod
+    def request(quiz_id, question_id=None):
+        """The quiz's unfinished job, or a new pending one; returns (job, created)"""
+        job = RegradeJob.query.filter(
+            RegradeJob.quiz_id == quiz_id,
+            RegradeJob.status.in_(RegradeJob.UNFINISHED)
+        ).order_by(RegradeJob.id.desc()).first()
+        if job is not None:
+            # Clearing key_version makes a running job check the key again before it completes
+            db.session.execute(update(RegradeJob).where(
+                RegradeJob.id == job.id,
+                RegradeJob.status.in_(RegradeJob.UNFINISHED)
+            ).values(key_version=None))
+            db.session.commit()
+            return job, False
+        job = RegradeJob(quiz_id=quiz_id, question_id=question_id)
+        db.session.add(job)
+        db.session.commit()
+        return job, True
+
+    @staticmethod
+    def claim(job_id):
+        """Atomically take a pending or abandoned job for this worker; False if another one runs it"""
+        now = datetime.utcnow()
+        claimed = db.session.execute(update(RegradeJob).where(
+            RegradeJob.id == job_id,
+            (RegradeJob.status == 'pending') | (
+                (RegradeJob.status == 'running') & (RegradeJob.updated_at < now - RegradeJob.STALE_AFTER)
+            )
+        ).values(status='running', updated_at=now)).rowcount == 1
+        db.session.commit()
+        return claimed
+
+    @property
+    def progress(self):
+        if self.status == 'completed':
+            return 100
+        return min(99, int(self.processed * 100 / self.total_scores)) if self.total_scores else 0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'quiz_id': self.quiz_id,
+            'question_id': self.question_id,
+            'status': self.status,
+            'progress': self.progress,
+            'total_scores': self.total_scores,
+            'processed': self.processed,
+            'changed': self.changed,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<RegradeJob {self.id} quiz {self.quiz_id}: {self.status} {self.processed}/{self.total_scores}>'
@@ -1,10 +1,19 @@
-from backend.app.database import db
+from backend.app.database import db, insert_ignore
 from datetime import datetime
+from collections import Counter
+from sqlalchemy import event, case, update
 from sqlalchemy.orm import relationship
 
 
 class Reminder(db.Model):
     __tablename__ = 'reminders'
+    __table_args__ = (
+        db.Index('idx_reminders_user_type_created', 'user_id', 'reminder_type', 'created_at'),
+        # One reminder per user, type, entity and day; reminders without a day are never deduplicated
+        db.Index('uq_reminders_dedup', 'user_id', 'reminder_type', 'entity_id', 'reminder_date', unique=True),
+        # Read cursors compare ids, so SQLite must never reuse the id of a deleted row
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -13,18 +22,137 @@ class Reminder(db.Model):
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    # Dedup key: the entity the reminder is about (quiz id for 'new_quiz', 0 when none) and its day
+    entity_id = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    reminder_date = db.Column(db.Date, nullable=True)
+    
+    DEDUP_KEY = ['user_id', 'reminder_type', 'entity_id', 'reminder_date']
+    
     # Relationships
     user = relationship('User', back_populates='reminders')
     
-    def to_dict(self):
+    @staticmethod
+    def insert_ignore_duplicates():
+        """INSERT statement that skips rows whose dedup key already exists"""
+        return insert_ignore(Reminder, Reminder.DEDUP_KEY)
+    
+    def to_dict(self, last_read_id=0):
+        """Serialize; reminders at or below the user's read cursor count as read"""
         return {
             'id': self.id,
             'user_id': self.user_id,
             'message': self.message,
             'reminder_type': self.reminder_type,
-            'is_read': self.is_read,
+            'is_read': bool(self.is_read or (self.id or 0) <= last_read_id),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
     def __repr__(self):
         return f'<Reminder {self.id}: {self.reminder_type} for user {self.user_id}>'
+
+
+class ReminderReadState(db.Model):
+    """Per-user read cursors and maintained reminder counters
+    
+    A reminder is read when its is_read flag is set or its id is at or below
+    last_read_reminder_id, so mark-all-read only moves the cursors here.
+    total_count / unread_count track the user's personal reminders and are
+    kept up to date by record_inserted() and the Reminder mapper events.
+    Every user with reminders has a row (see migrations/add_reminder_read_state.py).
+    """
+    __tablename__ = 'reminder_read_states'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_read_reminder_id = db.Column(db.Integer, default=0, nullable=False)
+    last_read_broadcast_id = db.Column(db.Integer, default=0, nullable=False)
+    total_count = db.Column(db.Integer, default=0, nullable=False)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Keeps IN (...) lists well under database parameter limits
+    BATCH_SIZE = 1000
+    
+    @staticmethod
+    def for_user(user_id):
+        """Get the user's state; a missing row is counted from reminders, not stored"""
+        state = db.session.get(ReminderReadState, user_id)
+        if state is None:
+            state = ReminderReadState(
+                user_id=user_id,
+                last_read_reminder_id=0,
+                last_read_broadcast_id=0,
+                total_count=Reminder.query.filter_by(user_id=user_id).count(),
+                unread_count=Reminder.query.filter_by(user_id=user_id, is_read=False).count()
+            )
+        return state
+    
+    @staticmethod
+    def get_or_create(user_id):
+        """Get the user's state row for writing, creating it from reminder counts"""
+        state = db.session.get(ReminderReadState, user_id)
+        if state is None:
+            state = ReminderReadState.for_user(user_id)
+            db.session.add(state)
+        return state
+    
+    @staticmethod
+    def record_inserted(connection, user_ids, unread=True):
+        """Count newly inserted reminders, one entry in user_ids per reminder
+        
+        Used by bulk inserts that bypass the ORM. Users without a state row have
+        no earlier reminders, so their row starts from zero.
+        """
+        per_user = Counter(user_ids)
+        by_amount = {}
+        for user_id, amount in per_user.items():
+            by_amount.setdefault(amount, []).append(user_id)
+        
+        for amount, ids in by_amount.items():
+            for i in range(0, len(ids), ReminderReadState.BATCH_SIZE):
+                batch = ids[i:i + ReminderReadState.BATCH_SIZE]
+                connection.execute(
+                    insert_ignore(ReminderReadState, ['user_id']),
+                    [{'user_id': user_id, 'last_read_reminder_id': 0, 'last_read_broadcast_id': 0,
+                      'total_count': 0, 'unread_count': 0} for user_id in batch]
+                )
+                connection.execute(
+                    update(ReminderReadState).where(ReminderReadState.user_id.in_(batch)).values(
+                        total_count=ReminderReadState.total_count + amount,
+                        unread_count=ReminderReadState.unread_count + (amount if unread else 0)
+                    )
+                )
+
+
+@event.listens_for(Reminder, 'after_insert')
+def _count_inserted_reminder(mapper, connection, target):
+    ReminderReadState.record_inserted(connection, [target.user_id], unread=not target.is_read)
+
+
+@event.listens_for(Reminder, 'after_update')
+def _count_read_change(mapper, connection, target):
+    history = db.inspect(target).attrs.is_read.history
+    if not history.has_changes() or not history.deleted:
+        return
+    was_read, is_read = bool(history.deleted[0]), bool(target.is_read)
+    if was_read == is_read:
+        return
+    # Reminders behind the cursor already count as read
+    connection.execute(
+        update(ReminderReadState).where(
+            ReminderReadState.user_id == target.user_id,
+            ReminderReadState.last_read_reminder_id < target.id
+        ).values(unread_count=ReminderReadState.unread_count + (-1 if is_read else 1))
+    )
+
+
+@event.listens_for(Reminder, 'after_delete')
+def _count_deleted_reminder(mapper, connection, target):
+    unread = 0 if target.is_read else case(
+        (ReminderReadState.last_read_reminder_id < target.id, 1), else_=0
+    )
+    connection.execute(
+        update(ReminderReadState).where(ReminderReadState.user_id == target.user_id).values(
+            total_count=ReminderReadState.total_count - 1,
+            unread_count=ReminderReadState.unread_count - unread
+        )
+    )
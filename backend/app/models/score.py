@@ -2,9 +2,14 @@ from datetime import datetime
 from sqlalchemy.orm import relationship
 import json
 from backend.app.database import db
+from backend.app.models.answer_layout import AnswerLayout
 
 class Score(db.Model):
     __tablename__ = 'scores'
+    __table_args__ = (
+        db.Index('idx_scores_user_created', 'user_id', 'created_at'),
+        db.Index('idx_scores_quiz_user', 'quiz_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -21,8 +26,10 @@ class Score(db.Model):
     completed_at = db.Column(db.DateTime, nullable=False)
     time_taken_seconds = db.Column(db.Integer)
     
-    # Store answers as JSON
-    answers = db.Column(db.Text)  # JSON object with question_id: answer mapping
+    # Store answers as JSON, or packed against an answer layout (see utils/answer_encoding.py)
+    answers = db.Column(db.Text)  # JSON object with question_id: answer mapping; NULL when packed
+    answers_packed = db.Column(db.LargeBinary, nullable=True)  # one byte per layout question
+    answer_layout_id = db.Column(db.Integer, db.ForeignKey('answer_layouts.id'), nullable=True)
     
     # Attempt tracking
     attempt_number = db.Column(db.Integer, default=1)
@@ -33,16 +40,31 @@ class Score(db.Model):
     user = relationship('User', back_populates='scores')
     quiz = relationship('Quiz', back_populates='scores')
     
-    def get_answers(self):
-        """Get answers as dictionary"""
+    @staticmethod
+    def parse_answers(raw, packed=None, layout_id=None):
+        """Parse stored answers (JSON text or packed bytes) into a question_id -> answer dictionary"""
+        if packed is not None and layout_id is not None:
+            return AnswerLayout.codec(layout_id).unpack(packed)
         try:
-            return json.loads(self.answers) if self.answers else {}
+            return json.loads(raw) if raw else {}
         except:
             return {}
     
-    def set_answers(self, answers_dict):
-        """Set answers from dictionary"""
-        self.answers = json.dumps(answers_dict)
+    def get_answers(self):
+        """Get answers as dictionary"""
+        return Score.parse_answers(self.answers, self.answers_packed, self.answer_layout_id)
+    
+    def set_answers(self, answers_dict, codec=None):
+        """Set answers from dictionary, packed when codec is given and the answers fit its layout"""
+        packed = codec.pack(answers_dict) if codec is not None else None
+        if packed is not None:
+            self.answers = None
+            self.answers_packed = packed
+            self.answer_layout_id = codec.layout_id
+        else:
+            self.answers = json.dumps(answers_dict)
+            self.answers_packed = None
+            self.answer_layout_id = None
     
     def calculate_time_taken(self):
         """Calculate time taken in seconds"""
@@ -0,0 +1,18 @@
+from backend.app.database import db
+from datetime import datetime
+
+
+class SubjectFollower(db.Model):
+    """A user following a subject (audience for subject broadcasts)"""
+    __tablename__ = 'subject_followers'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'subject_id': self.subject_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
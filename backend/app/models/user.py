@@ -17,10 +17,14 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    timezone = db.Column(db.String(50), nullable=True)  # IANA name, e.g. 'Asia/Kolkata'; schedules monthly reports
     
     # Relationships
     scores = relationship('Score', back_populates='user', cascade='all, delete-orphan')
     reminders = relationship('Reminder', back_populates='user', cascade='all, delete-orphan')
+    followed_subjects = relationship('SubjectFollower', cascade='all, delete-orphan')
+    broadcast_receipts = relationship('BroadcastReceipt', cascade='all, delete-orphan')
+    reminder_read_state = relationship('ReminderReadState', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set the password"""
@@ -39,6 +43,7 @@ class User(db.Model):
             'full_name': self.full_name,
             'qualification': self.qualification,
             'role': self.role,
+            'timezone': self.timezone,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'last_login': self.last_login.isoformat() if self.last_login else None
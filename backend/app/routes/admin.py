@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from backend.app.database import db
 from backend.app.models import User, Subject, Chapter, Quiz, Question, Score
 from backend.app.utils.auth import admin_required
@@ -12,6 +12,19 @@ def clear_cache_pattern(pattern):
     """Dummy function - cache clearing disabled since Redis is removed"""
     pass
 
+def queue_regrade(quiz_id, question_id=None):
+    """Record a regrade job for the quiz and start it; an unfinished job picks up the new key itself"""
+    from backend.app.models import RegradeJob
+    job, created = RegradeJob.request(quiz_id, question_id)
+    if created:
+        try:
+            from celery_tasks.tasks import regrade_quiz_scores
+            regrade_quiz_scores.delay(job.id)
+        except Exception as e:
+            # The job stays pending and resume_regrade_jobs starts it later
+            print(f"[REGRADE ERROR] Could not queue job {job.id}: {e}")
+    return job
+
 # User Management
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
@@ -233,6 +246,47 @@ def export_users():
     except Exception as e:
         return jsonify({'error': f'Failed to export users: {str(e)}'}), 500
 
+@admin_bp.route('/users/export.csv', methods=['GET'])
+@admin_required
+def export_users_csv():
+    """Stream all users as a CSV download (?gzip=true compresses it on the fly)"""
+    try:
+        from sqlalchemy import select
+        from backend.app.utils.csv_stream import csv_response
+
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+
+        def user_rows():
+            # yield_per streams from a server-side cursor, one batch at a time
+            query = select(
+                User.id, User.username, User.email, User.full_name, User.qualification,
+                User.role, User.is_active, User.created_at, User.last_login
+            ).order_by(User.id).execution_options(yield_per=batch_size)
+
+            for partition in db.session.execute(query).partitions():
+                yield [[
+                    user.id,
+                    user.username,
+                    user.email,
+                    user.full_name,
+                    user.qualification or '',
+                    user.role,
+                    'Active' if user.is_active else 'Inactive',
+                    user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
+                    user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else ''
+                ] for user in partition]
+
+        return csv_response(
+            ['ID', 'Username', 'Email', 'Full Name', 'Qualification', 'Role', 'Status', 'Created At', 'Last Login'],
+            user_rows(),
+            f'users_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            gzip=compress
+        )
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to export users: {str(e)}'}), 500
+
 # Subject Management
 @admin_bp.route('/subjects', methods=['GET'])
 @admin_required
@@ -747,6 +801,49 @@ def delete_quiz(quiz_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/quizzes/<int:quiz_id>/report.pdf', methods=['GET'])
+@admin_required
+def download_quiz_report(quiz_id):
+    """Download the class report for a quiz as a PDF (?month=YYYY-MM, default all time)"""
+    try:
+        import io
+        from flask import send_file
+        from backend.app.utils.pdf_reports import month_range, period_label, collect_quiz_reports, build_quiz_report
+
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+
+        start = end = None
+        month = request.args.get('month')
+        if month:
+            try:
+                start, end = month_range(month)
+            except ValueError:
+                return jsonify({'error': 'month must be in YYYY-MM format'}), 400
+
+        reports = collect_quiz_reports([quiz_id], start, end)
+        data = reports[0] if reports else {
+            'quiz_id': quiz.id,
+            'quiz_title': quiz.title,
+            'chapter': quiz.chapter.name,
+            'subject': quiz.chapter.subject.name,
+            'period_label': period_label(start, end),
+            'generated_at': datetime.utcnow(),
+            'attempts': 0,
+            'students': []
+        }
+
+        return send_file(
+            io.BytesIO(build_quiz_report(data)),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f'quiz_{quiz_id}_report_{month or "all"}.pdf'
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Question Management
 @admin_bp.route('/quizzes/<int:quiz_id>/questions', methods=['GET'])
 @admin_required
@@ -772,6 +869,117 @@ def get_quiz_questions(quiz_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/quizzes/<int:quiz_id>/item-analysis', methods=['GET'])
+@admin_required
+def get_quiz_item_analysis(quiz_id):
+    """Difficulty, discrimination and distractor statistics for each question of a quiz"""
+    try:
+        from backend.app.utils.item_analysis import analyze_quiz
+
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+
+        version, summary, items, new_attempts = analyze_quiz(quiz_id)
+
+        questions = {q.id: q for q in Question.query.filter(Question.id.in_([item['question_id'] for item in items]))}
+        for item in items:
+            question = questions[item['question_id']]
+            item['question_text'] = question.question_text
+            item['order'] = question.order
+            options = question.get_options()
+            for option in item['options']:
+                if option['answer'].isdigit() and int(option['answer']) < len(options):
+                    option['text'] = options[int(option['answer'])]
+
+        return jsonify({
+            'quiz': quiz.to_dict(),
+            'version': version,
+            'new_attempts': new_attempts,
+            'summary': summary,
+            'questions': items
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/quizzes/<int:quiz_id>/answer-distribution', methods=['GET'])
+@admin_required
+def get_quiz_answer_distribution(quiz_id):
+    """How many submissions picked each option of each question, from the live counters"""
+    try:
+        from backend.app.models import QuestionOptionCount
+
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+
+        questions = Question.query.filter_by(
+            quiz_id=quiz_id,
+            is_active=True
+        ).order_by(Question.order).all()
+        counts = QuestionOptionCount.distribution(quiz_id)
+
+        distribution = []
+        for question in questions:
+            question_counts = counts.get(question.id, {})
+            total = sum(question_counts.values())
+            options = question.get_options()
+            answers = question.get_answer_choices() + [QuestionOptionCount.OTHER, QuestionOptionCount.OMITTED]
+            distribution.append({
+                'question_id': question.id,
+                'question_text': question.question_text,
+                'order': question.order,
+                'responses': total,
+                'options': [{
+                    'answer': answer,
+                    'text': options[int(answer)] if answer.isdigit() and int(answer) < len(options) else None,
+                    'is_correct': answer == str(question.correct_answer),
+                    'count': question_counts.get(answer, 0),
+                    'share': round(question_counts.get(answer, 0) / total, 4) if total else 0
+                } for answer in answers]
+            })
+
+        return jsonify({
+            'quiz_id': quiz_id,
+            'questions': distribution
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/quizzes/<int:quiz_id>/regrade', methods=['POST'])
+@admin_required
+def regrade_quiz(quiz_id):
+    """Regrade all stored scores of a quiz against its current answer key"""
+    try:
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+        
+        job = queue_regrade(quiz_id)
+        return jsonify({'message': 'Regrade started', 'regrade_job': job.to_dict()}), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/regrade-jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_regrade_job(job_id):
+    """Progress of a regrade job"""
+    try:
+        from backend.app.models import RegradeJob
+        
+        job = db.session.get(RegradeJob, job_id)
+        if not job:
+            return jsonify({'error': 'Regrade job not found'}), 404
+        
+        return jsonify({'regrade_job': job.to_dict()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/questions/<int:quiz_id>', methods=['GET'])
 @admin_required
 def get_questions(quiz_id):
@@ -855,6 +1063,7 @@ def update_question(question_id):
             return jsonify({'error': 'Question not found'}), 404
         
         data = request.get_json()
+        graded_with = (question.correct_answer, question.points)
         
         # Update fields
         if 'question_text' in data:
@@ -872,16 +1081,23 @@ def update_question(question_id):
         if 'order' in data:
             question.order = data['order']
         
+        # Stored scores were graded with the old key or points
+        needs_regrade = (question.correct_answer, question.points) != graded_with
+        
         question.updated_at = datetime.utcnow()
         db.session.commit()
         
         # Clear cache
         clear_cache_pattern(f'quiz:{question.quiz_id}:*')
         
-        return jsonify({
+        response = {
             'message': 'Question updated successfully',
             'question': question.to_dict()
-        }), 200
+        }
+        if needs_regrade:
+            response['regrade_job'] = queue_regrade(question.quiz_id, question.id).to_dict()
+        
+        return jsonify(response), 200
         
     except Exception as e:
         db.session.rollback()
@@ -963,27 +1179,45 @@ def get_dashboard_stats():
         stats['quiz_distribution'] = distribution_data
         
         # Quiz activity trend (last 7 days)
+        from backend.app.utils.db_routing import use_snapshot
         today = datetime.now().date()
         activity_data = []
         activity_labels = []
-        
-        for i in range(6, -1, -1):  # Last 7 days
-            day_date = today - timedelta(days=i)
+        days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+        
+        # Days the nightly snapshot has closed come from its daily facts
+        snapshot_attempts = {}
+        with use_snapshot() as snapshot_built_at:
+            covered = [day for day in days if snapshot_built_at and day < snapshot_built_at.date()]
+            if covered:
+                from sqlalchemy import select
+                from backend.app.utils.analytics_snapshot import fact_daily_attempts
+                snapshot_attempts = dict.fromkeys(covered, 0)
+                for row in db.session.execute(select(fact_daily_attempts).where(
+                    fact_daily_attempts.c.day.in_([day.isoformat() for day in covered])
+                )):
+                    snapshot_attempts[datetime.strptime(row.day, '%Y-%m-%d').date()] = row.attempts
+        
+        for day_date in days:
             day_start = datetime.combine(day_date, datetime.min.time())
             day_end = datetime.combine(day_date, datetime.max.time())
             
             # Count quiz attempts (scores) for this day
-            attempts = Score.query.filter(
-                Score.completed_at >= day_start,
-                Score.completed_at <= day_end
-            ).count()
+            if day_date in snapshot_attempts:
+                attempts = snapshot_attempts[day_date]
+            else:
+                attempts = Score.query.filter(
+                    Score.completed_at >= day_start,
+                    Score.completed_at <= day_end
+                ).count()
             
             activity_data.append(attempts)
             activity_labels.append(day_date.strftime('%a'))  # Mon, Tue, etc.
         
         stats['activity_trend'] = {
             'labels': activity_labels,
-            'data': activity_data
+            'data': activity_data,
+            'snapshot_built_at': snapshot_built_at.isoformat() if snapshot_built_at else None
         }
         
         # Cache for 5 minutes (Redis disabled)
@@ -1056,6 +1290,55 @@ def search():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Slow Query Log
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """Get the most recent slow queries with their EXPLAIN plans"""
+    try:
+        from backend.app.utils.slow_queries import get_slow_queries as read_slow_queries
+        
+        limit = request.args.get('limit', 50, type=int)
+        entries = read_slow_queries(limit)
+        
+        return jsonify({
+            'slow_queries': entries,
+            'total': len(entries),
+            'threshold_ms': current_app.config.get('SLOW_QUERY_THRESHOLD_MS')
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """Clear the slow query log"""
+    try:
+        from backend.app.utils.slow_queries import clear_slow_queries as clear_slow_query_log
+        
+        cleared = clear_slow_query_log()
+        return jsonify({'message': f'Cleared {cleared} slow query entries'}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/admission/stats', methods=['GET'])
+@admin_required
+def get_admission_stats():
+    """Get admitted, queued and shed request counts per priority class"""
+    try:
+        from backend.app.utils.admission import admission_stats
+        
+        stats = admission_stats(current_app)
+        if stats is None:
+            return jsonify({'enabled': False}), 200
+        
+        return jsonify({'enabled': True, **stats}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/cache/stats', methods=['GET'])
 @admin_required
 def get_cache_stats():
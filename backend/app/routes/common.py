@@ -155,27 +155,47 @@ def global_leaderboard():
     """Get global leaderboard across all quizzes"""
     try:
         from backend.app.models import Score
+        from backend.app.utils.db_routing import use_snapshot
         import json
         
         # Cache removed - fetch data directly
         
-        # Get top performers based on average score
-        top_performers = db.session.query(
-            User.id,
-            User.username,
-            User.full_name,
-            db.func.count(Score.id).label('total_quizzes'),
-            db.func.avg(Score.percentage).label('avg_score'),
-            db.func.sum(Score.passed).label('passed_count')
-        ).join(
-            Score, User.id == Score.user_id
-        ).group_by(
-            User.id, User.username, User.full_name
-        ).having(
-            db.func.count(Score.id) >= 3  # Minimum 3 quizzes attempted
-        ).order_by(
-            db.desc('avg_score')
-        ).limit(20).all()
+        # Get top performers based on average score; the nightly snapshot has
+        # them pre-aggregated, otherwise aggregate the live scores
+        with use_snapshot() as snapshot_built_at:
+            if snapshot_built_at:
+                from backend.app.utils.analytics_snapshot import fact_user_totals
+                top_performers = db.session.query(
+                    User.id,
+                    User.username,
+                    User.full_name,
+                    fact_user_totals.c.attempts.label('total_quizzes'),
+                    fact_user_totals.c.avg_percentage.label('avg_score'),
+                    fact_user_totals.c.passed_count.label('passed_count')
+                ).join(
+                    fact_user_totals, fact_user_totals.c.user_id == User.id
+                ).filter(
+                    fact_user_totals.c.attempts >= 3  # Minimum 3 quizzes attempted
+                ).order_by(
+                    db.desc('avg_score')
+                ).limit(20).all()
+            else:
+                top_performers = db.session.query(
+                    User.id,
+                    User.username,
+                    User.full_name,
+                    db.func.count(Score.id).label('total_quizzes'),
+                    db.func.avg(Score.percentage).label('avg_score'),
+                    db.func.sum(db.case((Score.passed == True, 1), else_=0)).label('passed_count')
+                ).join(
+                    Score, User.id == Score.user_id
+                ).group_by(
+                    User.id, User.username, User.full_name
+                ).having(
+                    db.func.count(Score.id) >= 3  # Minimum 3 quizzes attempted
+                ).order_by(
+                    db.desc('avg_score')
+                ).limit(20).all()
         
         leaderboard = []
         for idx, performer in enumerate(top_performers, 1):
@@ -190,7 +210,10 @@ def global_leaderboard():
                 'success_rate': round((performer.passed_count / performer.total_quizzes * 100), 2)
             })
         
-        data = {'leaderboard': leaderboard}
+        data = {
+            'leaderboard': leaderboard,
+            'snapshot_built_at': snapshot_built_at.isoformat() if snapshot_built_at else None
+        }
         
         # Cache removed - return data directly
         return jsonify(data), 200
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from backend.app.database import db
-from backend.app.models import Quiz, Question, Score
+from backend.app.models import Quiz, Question, Score, QuestionOptionCount, AnswerLayout
 from backend.app.utils.auth import user_required, get_current_user_id
+from backend.app.utils.group_commit import save_submission, GroupCommitTimeout
+from backend.app.utils.grading import grade_submission
 from datetime import datetime
 import json
 
@@ -125,20 +127,9 @@ def submit_quiz(quiz_id):
         ).all()
         
         # Calculate score
-        total_points = 0
-        earned_points = 0
-        correct_answers = 0
-        
-        for question in questions:
-            total_points += question.points
-            answer = data['answers'].get(str(question.id))
-            
-            if answer is not None and str(answer) == str(question.correct_answer):
-                earned_points += question.points
-                correct_answers += 1
-        
-        percentage = (earned_points / total_points * 100) if total_points > 0 else 0
-        passed = percentage >= quiz.passing_score
+        grade = grade_submission(questions, data['answers'], quiz.passing_score)
+        percentage = grade['percentage']
+        passed = grade['passed']
         
         # Get attempt number
         existing_attempts = Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).count()
@@ -147,19 +138,19 @@ def submit_quiz(quiz_id):
         score = Score(
             user_id=user_id,
             quiz_id=quiz_id,
-            score=earned_points,
-            max_score=total_points,
+            score=grade['earned'],
+            max_score=grade['max_score'],
             percentage=percentage,
             passed=passed,
             started_at=datetime.utcnow(),  # Use current time since session is not tracked
             completed_at=datetime.utcnow(),
             attempt_number=existing_attempts + 1
         )
-        score.set_answers(data['answers'])
+        score.set_answers(data['answers'], AnswerLayout.for_questions(quiz_id, questions))
         score.calculate_time_taken()
         
-        db.session.add(score)
-        db.session.commit()
+        # Live option counters, committed together with the score
+        score = save_submission(score, QuestionOptionCount.count_rows(quiz_id, questions, [data['answers']]))
         
         # Session management removed - no cache invalidation needed
         
@@ -167,7 +158,7 @@ def submit_quiz(quiz_id):
         question_results = []
         for question in questions:
             user_answer = data['answers'].get(str(question.id))
-            is_correct = str(user_answer) == str(question.correct_answer) if user_answer is not None else False
+            is_correct = grade['correct'][question.id]
             
             question_results.append({
                 'question_id': question.id,
@@ -185,7 +176,7 @@ def submit_quiz(quiz_id):
             'score': score.to_dict(),
             'results': {
                 'total_questions': len(questions),
-                'correct_answers': correct_answers,
+                'correct_answers': grade['correct_answers'],
                 'percentage': round(percentage, 2),
                 'passed': passed,
                 'time_taken_seconds': score.time_taken_seconds,
@@ -193,6 +184,9 @@ def submit_quiz(quiz_id):
             }
         }), 201
         
+    except GroupCommitTimeout as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from backend.app.database import db
 from backend.app.models import Subject, Chapter, Quiz, Score, Reminder, User
+from backend.app.models import ReminderReadState, BroadcastNotification, BroadcastReceipt, SubjectFollower
+from backend.app.models import AnswerLayout, QuestionOptionCount
 from backend.app.utils.auth import user_required, get_current_user_id
+from backend.app.utils.group_commit import save_submission, GroupCommitTimeout
+from backend.app.utils.grading import grade_submission
 import json
 from datetime import datetime
 
@@ -433,6 +437,46 @@ def get_export_status(task_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@user_bp.route('/reports/scores.pdf', methods=['GET'])
+@user_required
+def download_score_report():
+    """Download the user's score report as a PDF (?month=YYYY-MM, default all time)"""
+    try:
+        import io
+        from flask import send_file
+        from backend.app.utils.pdf_reports import month_range, period_label, collect_user_reports, build_user_report
+
+        user_id = get_current_user_id()
+        user = User.query.get_or_404(user_id)
+
+        start = end = None
+        month = request.args.get('month')
+        if month:
+            try:
+                start, end = month_range(month)
+            except ValueError:
+                return jsonify({'error': 'month must be in YYYY-MM format'}), 400
+
+        reports = collect_user_reports([user_id], start, end)
+        data = reports[0] if reports else {
+            'user_id': user.id,
+            'name': user.full_name or user.username,
+            'email': user.email,
+            'period_label': period_label(start, end),
+            'generated_at': datetime.utcnow(),
+            'attempts': []
+        }
+
+        return send_file(
+            io.BytesIO(build_user_report(data)),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f'quiz_report_{month or "all"}.pdf'
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/dashboard/stats', methods=['GET'])
 @user_required
 def get_user_stats():
@@ -557,6 +601,11 @@ def update_profile():
         # Update allowed fields
         if 'full_name' in data:
             user.full_name = data['full_name']
+        if 'timezone' in data:
+            from backend.app.utils.report_schedule import is_valid_timezone
+            if data['timezone'] and not is_valid_timezone(data['timezone']):
+                return jsonify({'error': 'Unknown time zone'}), 400
+            user.timezone = data['timezone'] or None
         
         db.session.commit()
         
@@ -633,39 +682,75 @@ def update_preferences():
 @user_bp.route('/reminders', methods=['GET'])
 @user_required
 def get_user_reminders():
-    """Get user's reminders"""
+    """Get user's reminders merged with the broadcasts in their audience
+
+    The unread count only looks at broadcasts above the user's read cursor.
+    Counting all visible broadcasts is only done when paging through all
+    reminders (unread_only=false); total_reminders is left out otherwise.
+    """
     try:
         user_id = get_current_user_id()
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
         per_page = request.args.get('per_page', 10, type=int)
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
         
-        # Build query
+        # Counters and read cursors are maintained per user, so no count() over reminders
+        state = ReminderReadState.for_user(user_id)
+        unread_reminders = state.unread_count + BroadcastNotification.unread_count_for_user(
+            user_id, state.last_read_broadcast_id
+        )
+        
+        # Personal reminders
         query = Reminder.query.filter_by(user_id=user_id)
         if unread_only:
-            query = query.filter_by(is_read=False)
+            query = query.filter(Reminder.is_read == False, Reminder.id > state.last_read_reminder_id)
         
-        # Order by newest first
-        query = query.order_by(Reminder.created_at.desc())
+        # Broadcasts are fanned out here, at read time
+        broadcasts = BroadcastNotification.for_user(user_id)
+        if unread_only:
+            broadcasts = broadcasts.filter(~BroadcastNotification.read_condition(user_id))
         
-        # Paginate
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # The first page * per_page of each source is enough to merge this page
+        window = page * per_page
+        personal_items = query.order_by(Reminder.created_at.desc()).limit(window).all()
+        broadcast_items = broadcasts.order_by(BroadcastNotification.created_at.desc()).limit(window).all()
         
-        # Get counts
-        total_reminders = Reminder.query.filter_by(user_id=user_id).count()
-        unread_reminders = Reminder.query.filter_by(user_id=user_id, is_read=False).count()
+        merged = [(reminder.created_at, reminder.to_dict(state.last_read_reminder_id)) for reminder in personal_items]
+        merged += [(broadcast.created_at, broadcast.to_dict(user_id, is_read)) for broadcast, is_read in broadcast_items]
+        merged.sort(key=lambda item: item[0], reverse=True)
+        items = [item for _, item in merged[(page - 1) * per_page:window]]
         
-        return jsonify({
-            'reminders': [reminder.to_dict() for reminder in pagination.items],
-            'total': pagination.total,
-            'page': page,
-            'pages': pagination.pages,
-            'total_reminders': total_reminders,
+        response = {
+            'reminders': items,
             'unread_reminders': unread_reminders
+        }
+        if unread_only:
+            total = unread_reminders
+        else:
+            total = response['total_reminders'] = state.total_count + BroadcastNotification.total_for_user(user_id)
+        response.update({
+            'total': total,
+            'page': page,
+            'pages': (total + per_page - 1) // per_page if per_page > 0 else 0
+        })
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/reminders/unread-count', methods=['GET'])
+@user_required
+def get_unread_reminder_count():
+    """Get the unread badge count without loading any reminders"""
+    try:
+        user_id = get_current_user_id()
+        
+        state = ReminderReadState.for_user(user_id)
+        broadcast_unread = BroadcastNotification.unread_count_for_user(user_id, state.last_read_broadcast_id)
+        
+        return jsonify({
+            'unread_reminders': state.unread_count + broadcast_unread
         }), 200
         
     except Exception as e:
@@ -686,6 +771,7 @@ def mark_reminder_read(reminder_id):
         if not reminder:
             return jsonify({'error': 'Reminder not found'}), 404
         
+        # The unread counter is adjusted by the Reminder update event
         reminder.is_read = True
         db.session.commit()
         
@@ -705,11 +791,15 @@ def mark_all_reminders_read():
     try:
         user_id = get_current_user_id()
         
-        # Update all unread reminders for this user
-        updated_count = Reminder.query.filter_by(
-            user_id=user_id,
-            is_read=False
-        ).update({'is_read': True})
+        # Single-row update: move both read cursors past everything posted so far
+        latest_reminder_id = db.session.query(db.func.max(Reminder.id)).scalar() or 0
+        latest_broadcast_id = db.session.query(db.func.max(BroadcastNotification.id)).scalar() or 0
+        
+        state = ReminderReadState.get_or_create(user_id)
+        updated_count = state.unread_count
+        state.last_read_reminder_id = max(state.last_read_reminder_id or 0, latest_reminder_id)
+        state.last_read_broadcast_id = max(state.last_read_broadcast_id or 0, latest_broadcast_id)
+        state.unread_count = 0
         
         db.session.commit()
         
@@ -746,7 +836,112 @@ def delete_reminder(reminder_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500 
+        return jsonify({'error': str(e)}), 500
+
+def _get_broadcast_receipt(user_id, broadcast_id):
+    """Get or create the user's receipt for a broadcast visible to them"""
+    visible = BroadcastNotification.for_user(user_id).filter(
+        BroadcastNotification.id == broadcast_id
+    ).first()
+    if not visible:
+        return None
+    
+    receipt = db.session.get(BroadcastReceipt, (user_id, broadcast_id))
+    if receipt is None:
+        receipt = BroadcastReceipt(user_id=user_id, broadcast_id=broadcast_id, is_read=False, is_dismissed=False)
+        db.session.add(receipt)
+    return receipt
+
+@user_bp.route('/reminders/broadcast-<int:broadcast_id>/mark-read', methods=['PUT'])
+@user_required
+def mark_broadcast_read(broadcast_id):
+    """Mark a broadcast notification as read for the current user"""
+    try:
+        user_id = get_current_user_id()
+        
+        receipt = _get_broadcast_receipt(user_id, broadcast_id)
+        if not receipt:
+            return jsonify({'error': 'Reminder not found'}), 404
+        
+        receipt.is_read = True
+        db.session.commit()
+        
+        broadcast = db.session.get(BroadcastNotification, broadcast_id)
+        return jsonify({
+            'message': 'Reminder marked as read',
+            'reminder': broadcast.to_dict(user_id, True)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/reminders/broadcast-<int:broadcast_id>', methods=['DELETE'])
+@user_required
+def dismiss_broadcast(broadcast_id):
+    """Hide a broadcast notification for the current user"""
+    try:
+        user_id = get_current_user_id()
+        
+        receipt = _get_broadcast_receipt(user_id, broadcast_id)
+        if not receipt:
+            return jsonify({'error': 'Reminder not found'}), 404
+        
+        receipt.is_dismissed = True
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Reminder deleted successfully'
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/subjects/<int:subject_id>/follow', methods=['POST'])
+@user_required
+def follow_subject(subject_id):
+    """Follow a subject to receive its broadcast notifications"""
+    try:
+        user_id = get_current_user_id()
+        
+        subject = Subject.query.filter_by(id=subject_id, is_active=True).first()
+        if not subject:
+            return jsonify({'error': 'Subject not found'}), 404
+        
+        if not db.session.get(SubjectFollower, (user_id, subject_id)):
+            db.session.add(SubjectFollower(user_id=user_id, subject_id=subject_id))
+            db.session.commit()
+        
+        return jsonify({
+            'message': f'Following {subject.name}',
+            'subject_id': subject_id,
+            'following': True
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/subjects/<int:subject_id>/follow', methods=['DELETE'])
+@user_required
+def unfollow_subject(subject_id):
+    """Stop following a subject"""
+    try:
+        user_id = get_current_user_id()
+        
+        SubjectFollower.query.filter_by(user_id=user_id, subject_id=subject_id).delete()
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Subject unfollowed',
+            'subject_id': subject_id,
+            'following': False
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/quizzes/<string:quiz_slug>/take', methods=['GET'])
 @user_required
@@ -830,28 +1025,21 @@ def submit_quiz(quiz_slug):
         user_answers = data.get('answers', {})
         time_taken = data.get('time_taken', 0)
         
-        # Calculate score
-        correct_answers = 0
-        total_questions = len(quiz.questions)
-        
-        for question in quiz.questions:
-            if str(question.id) in user_answers:
-                user_answer = user_answers[str(question.id)]
-                # Convert both to string for comparison since correct_answer is stored as string
-                if str(user_answer) == str(question.correct_answer):
-                    correct_answers += 1
-        
-        # Calculate percentage
-        percentage = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-        passed = percentage >= quiz.passing_score
+        # Calculate score (same rules as quiz.py and regrades)
+        active_questions = [question for question in quiz.questions if question.is_active]
+        grade = grade_submission(active_questions, user_answers, quiz.passing_score)
+        correct_answers = grade['correct_answers']
+        total_questions = len(active_questions)
+        percentage = grade['percentage']
+        passed = grade['passed']
         
         # Create score record
         now = datetime.utcnow()
         score = Score(
             user_id=user_id,
             quiz_id=quiz.id,
-            score=correct_answers,
-            max_score=total_questions,
+            score=grade['earned'],
+            max_score=grade['max_score'],
             percentage=percentage,
             passed=passed,
             attempt_number=len(attempts) + 1,
@@ -859,10 +1047,10 @@ def submit_quiz(quiz_slug):
             started_at=now,
             completed_at=now
         )
-        score.set_answers(user_answers)
+        score.set_answers(user_answers, AnswerLayout.for_questions(quiz.id, active_questions))
         
-        db.session.add(score)
-        db.session.commit()
+        # Live option counters, committed together with the score
+        score = save_submission(score, QuestionOptionCount.count_rows(quiz.id, active_questions, [user_answers]))
         
         # Cache removed - no cache invalidation needed
         return jsonify({
@@ -876,6 +1064,9 @@ def submit_quiz(quiz_slug):
             }
         }), 200
         
+    except GroupCommitTimeout as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500 
@@ -904,28 +1095,21 @@ def submit_quiz_by_id(quiz_id):
         user_answers = data.get('answers', {})
         time_taken = data.get('time_taken', 0)
         
-        # Calculate score
-        correct_answers = 0
-        total_questions = len(quiz.questions)
-        
-        for question in quiz.questions:
-            if str(question.id) in user_answers:
-                user_answer = user_answers[str(question.id)]
-                # Convert both to string for comparison since correct_answer is stored as string
-                if str(user_answer) == str(question.correct_answer):
-                    correct_answers += 1
-        
-        # Calculate percentage
-        percentage = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-        passed = percentage >= quiz.passing_score
+        # Calculate score (same rules as quiz.py and regrades)
+        active_questions = [question for question in quiz.questions if question.is_active]
+        grade = grade_submission(active_questions, user_answers, quiz.passing_score)
+        correct_answers = grade['correct_answers']
+        total_questions = len(active_questions)
+        percentage = grade['percentage']
+        passed = grade['passed']
         
         # Create score record
         now = datetime.utcnow()
         score = Score(
             user_id=user_id,
             quiz_id=quiz.id,
-            score=correct_answers,
-            max_score=total_questions,
+            score=grade['earned'],
+            max_score=grade['max_score'],
             percentage=percentage,
             passed=passed,
             attempt_number=len(attempts) + 1,
@@ -933,10 +1117,10 @@ def submit_quiz_by_id(quiz_id):
             started_at=now,
             completed_at=now
         )
-        score.set_answers(user_answers)
+        score.set_answers(user_answers, AnswerLayout.for_questions(quiz.id, active_questions))
         
-        db.session.add(score)
-        db.session.commit()
+        # Live option counters, committed together with the score
+        score = save_submission(score, QuestionOptionCount.count_rows(quiz.id, active_questions, [user_answers]))
         
         # Cache removed - no cache invalidation needed
         return jsonify({
@@ -950,6 +1134,9 @@ def submit_quiz_by_id(quiz_id):
             }
         }), 200
         
+    except GroupCommitTimeout as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
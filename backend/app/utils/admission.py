@@ -0,0 +1,267 @@
+"""
+Admission control by route priority.
+
+During live exams, leaderboards, search, dashboards and exports compete with
+starting and submitting quizzes for the same workers and database
+connections. Every endpoint belongs to a priority class (ROUTE_PRIORITIES,
+``normal`` when not listed), and each class admits a bounded number of
+concurrent requests per process (``ADMISSION_<CLASS>_CONCURRENCY``, 0 for
+no limit). A request over the limit waits in the class's bounded queue
+(``ADMISSION_<CLASS>_QUEUE``) for up to ``ADMISSION_QUEUE_TIMEOUT_MS``;
+when the queue is full or the wait runs out it is shed:
+
+- a low priority GET gets the last successful response for the same URL and
+  caller, if one is younger than ``ADMISSION_STALE_MAX_AGE_SECONDS``
+  (marked with ``X-Admission: stale`` and an ``Age`` header)
+- anything else gets a 503 with ``Retry-After``
+
+Admitted, shed and stale counts, queue depth and latency percentiles per
+class, and shed counts per endpoint, are reported by
+``/api/admin/admission/stats``.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from flask import request, g, jsonify, current_app
+
+CRITICAL = 'critical'
+NORMAL = 'normal'
+LOW = 'low'
+PRIORITY_CLASSES = (CRITICAL, NORMAL, LOW)
+
+ROUTE_PRIORITIES = {
+    # Taking a quiz, plus what monitoring and token refresh need to keep working
+    'quiz.start_quiz': CRITICAL,
+    'quiz.submit_quiz': CRITICAL,
+    'user.take_quiz': CRITICAL,
+    'user.take_quiz_by_id': CRITICAL,
+    'user.submit_quiz': CRITICAL,
+    'user.submit_quiz_by_id': CRITICAL,
+    'auth.refresh': CRITICAL,
+    'common.health_check': CRITICAL,
+    'common.api_health': CRITICAL,
+    'health_check': CRITICAL,
+    'admin.get_admission_stats': CRITICAL,
+
+    # Leaderboards, search, dashboards, reports and exports
+    'common.global_leaderboard': LOW,
+    'common.search': LOW,
+    'quiz.get_quiz_leaderboard': LOW,
+    'user.get_leaderboard': LOW,
+    'user.get_subject_leaderboard': LOW,
+    'user.get_recent_activity': LOW,
+    'user.get_user_stats': LOW,
+    'user.get_performance_trend': LOW,
+    'user.export_scores': LOW,
+    'user.download_score_report': LOW,
+    'admin.get_dashboard_stats': LOW,
+    'admin.search': LOW,
+    'admin.export_users': LOW,
+    'admin.export_users_csv': LOW,
+    'admin.download_quiz_report': LOW,
+    'admin.get_quiz_item_analysis': LOW,
+    'admin.get_quiz_answer_distribution': LOW,
+}
+
+# Bodies larger than this are not kept for stale responses
+MAX_STALE_BODY_BYTES = 1024 * 1024
+STALE_HEADERS = ('Content-Disposition', 'Cache-Control')
+
+
+def route_priority(endpoint):
+    return ROUTE_PRIORITIES.get(endpoint, NORMAL)
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 2) if ordered else None
+
+
+class PriorityClass:
+    """Concurrency limit and bounded wait queue of one priority class"""
+
+    def __init__(self, name, concurrency, queue_size):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.stale = 0
+        self.latencies = deque(maxlen=1000)  # seconds, most recent admitted requests
+        self._condition = threading.Condition()
+
+    def _has_slot(self):
+        return self.concurrency <= 0 or self.in_flight < self.concurrency
+
+    def acquire(self, timeout):
+        """Take a slot, waiting up to timeout seconds; False when the request must be shed"""
+        with self._condition:
+            # Requests already waiting go first
+            if not (self.waiting == 0 and self._has_slot()):
+                if self.waiting >= self.queue_size:
+                    self.shed += 1
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(self._has_slot, timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.shed += 1
+                    return False
+            self.in_flight += 1
+            self.admitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def release(self, duration):
+        with self._condition:
+            self.in_flight -= 1
+            self.latencies.append(duration)
+            self._condition.notify()
+
+    def record_stale(self):
+        with self._condition:
+            self.stale += 1
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {
+            'concurrency': self.concurrency or None,
+            'queue_size': self.queue_size,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'peak_in_flight': self.peak_in_flight,
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'served_stale': self.stale,
+            'latency_p50_ms': _percentile(latencies, 50),
+            'latency_p99_ms': _percentile(latencies, 99)
+        }
+
+
+class StaleCache:
+    """Last successful low priority GET responses, per URL and caller (LRU)"""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key():
+        # The caller's token is part of the key, so one user never gets another's data
+        caller = request.headers.get('Authorization', '')
+        return hashlib.sha1(f'{request.full_path}\n{caller}'.encode('utf-8')).hexdigest()
+
+    def put(self, key, response):
+        headers = {name: response.headers[name] for name in STALE_HEADERS if name in response.headers}
+        entry = (time.time(), response.get_data(), response.mimetype, headers)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get(self, key, max_age):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        return entry
+
+
+class AdmissionController:
+    """Priority classes, stale cache and shed counters of one app"""
+
+    def __init__(self, config):
+        self.classes = {
+            name: PriorityClass(
+                name,
+                config.get(f'ADMISSION_{name.upper()}_CONCURRENCY', 0),
+                config.get(f'ADMISSION_{name.upper()}_QUEUE', 0)
+            ) for name in PRIORITY_CLASSES
+        }
+        self.queue_timeout = config.get('ADMISSION_QUEUE_TIMEOUT_MS', 500) / 1000
+        self.retry_after = config.get('ADMISSION_RETRY_AFTER_SECONDS', 5)
+        self.stale_max_age = config.get('ADMISSION_STALE_MAX_AGE_SECONDS', 300)
+        self.stale_cache = StaleCache(config.get('ADMISSION_STALE_CACHE_SIZE', 1000))
+        self.shed_by_endpoint = {}
+        self._lock = threading.Lock()
+
+    def shed_response(self, priority, endpoint):
+        """Stale copy or 503 for a request that was not admitted"""
+        with self._lock:
+            self.shed_by_endpoint[endpoint] = self.shed_by_endpoint.get(endpoint, 0) + 1
+
+        if priority == LOW and request.method == 'GET':
+            entry = self.stale_cache.get(StaleCache.key(), self.stale_max_age)
+            if entry is not None:
+                stored_at, body, mimetype, headers = entry
+                response = current_app.response_class(body, status=200, mimetype=mimetype, headers=headers)
+                response.headers['Age'] = str(int(time.time() - stored_at))
+                response.headers['X-Admission'] = 'stale'
+                self.classes[priority].record_stale()
+                return response
+
+        response = jsonify({'error': 'Server is busy, please retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        response.headers['X-Admission'] = 'shed'
+        return response
+
+    def stats(self):
+        with self._lock:
+            shed_by_endpoint = dict(sorted(self.shed_by_endpoint.items(), key=lambda item: -item[1]))
+        return {
+            'classes': {name: priority_class.stats() for name, priority_class in self.classes.items()},
+            'shed_by_endpoint': shed_by_endpoint,
+            'queue_timeout_ms': int(self.queue_timeout * 1000),
+            'retry_after_seconds': self.retry_after
+        }
+
+
+def init_admission_control(app):
+    """Register request hooks that admit, queue or shed requests by route priority"""
+    if not app.config.get('ADMISSION_CONTROL_ENABLED'):
+        return
+
+    controller = AdmissionController(app.config)
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def admit_request():
+        if request.endpoint is None or request.method == 'OPTIONS':
+            return None
+        priority = route_priority(request.endpoint)
+        if not controller.classes[priority].acquire(controller.queue_timeout):
+            return controller.shed_response(priority, request.endpoint)
+        g.admission = (priority, time.perf_counter())
+        return None
+
+    @app.after_request
+    def remember_response(response):
+        admission = g.get('admission')
+        if (admission is not None and admission[0] == LOW and request.method == 'GET'
+                and response.status_code == 200 and not response.is_streamed
+                and not response.direct_passthrough
+                and (response.content_length or 0) <= MAX_STALE_BODY_BYTES):
+            controller.stale_cache.put(StaleCache.key(), response)
+        return response
+
+    @app.teardown_request
+    def release_slot(exc):
+        admission = g.pop('admission', None)
+        if admission is not None:
+            priority, started = admission
+            controller.classes[priority].release(time.perf_counter() - started)
+
+
+def admission_stats(app):
+    """Admission counters of app, or None when admission control is off"""
+    controller = app.extensions.get('admission')
+    return controller.stats() if controller else None
@@ -0,0 +1,284 @@
+"""
+Columnar analytics export of scores, answers and questions as Parquet.
+
+Layout under ``ANALYTICS_EXPORT_DIR`` (hive-style partitions, readable with
+``pyarrow.dataset`` / pandas / DuckDB / Spark):
+
+    scores/month=YYYY-MM/subject_id=N/part-<first score id>.parquet
+    answers/month=YYYY-MM/subject_id=N/part-<first score id>.parquet
+    questions/questions.parquet
+    _watermark.json
+
+Each run appends only the scores with an id above the watermark, streaming
+them from the database in batches and writing one new part file per
+partition. Answer maps are flattened into one typed row per answered
+question. Part files are named after the first score id of the run, so a
+run that crashed before moving the watermark is redone by the next run,
+which overwrites the same files instead of duplicating rows. The questions
+dimension is small and rewritten in full every run.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+WATERMARK_FILE = '_watermark.json'
+
+# Scores younger than this are left for the next run, so an attempt whose
+# transaction commits after a higher id cannot fall below the watermark
+COMMIT_LAG_SECONDS = 300
+
+
+def _schemas():
+    import pyarrow as pa
+    timestamp = pa.timestamp('us')
+    scores = pa.schema([
+        ('score_id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('quiz_id', pa.int64()),
+        ('chapter_id', pa.int64()),
+        ('score', pa.int32()),
+        ('max_score', pa.int32()),
+        ('percentage', pa.float64()),
+        ('passed', pa.bool_()),
+        ('attempt_number', pa.int32()),
+        ('time_taken_seconds', pa.int32()),
+        ('started_at', timestamp),
+        ('completed_at', timestamp),
+        ('created_at', timestamp),
+    ])
+    answers = pa.schema([
+        ('score_id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('quiz_id', pa.int64()),
+        ('question_id', pa.int64()),
+        ('answer', pa.string()),
+        ('answer_index', pa.int32()),  # MCQ option index, null for other answers
+        ('is_correct', pa.bool_()),
+        ('created_at', timestamp),
+    ])
+    questions = pa.schema([
+        ('question_id', pa.int64()),
+        ('quiz_id', pa.int64()),
+        ('chapter_id', pa.int64()),
+        ('subject_id', pa.int64()),
+        ('question_type', pa.string()),
+        ('points', pa.int32()),
+        ('correct_answer', pa.string()),
+        ('option_count', pa.int32()),
+        ('question_order', pa.int32()),
+        ('is_active', pa.bool_()),
+    ])
+    return scores, answers, questions
+
+
+def read_watermark(root):
+    """The last exported score id and run details, or a fresh watermark"""
+    path = os.path.join(root, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {'last_score_id': 0}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_watermark(root, watermark):
+    path = os.path.join(root, WATERMARK_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _temporary_path(path):
+    # Dataset readers skip dot-files, so unfinished files are never read
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.tmp')
+
+
+class _PartitionWriters:
+    """One open ParquetWriter per (month, subject_id) partition for the current run"""
+
+    def __init__(self, root, table_name, schema, part_name):
+        self.root = root
+        self.table_name = table_name
+        self.schema = schema
+        self.part_name = part_name
+        self.writers = {}
+        self.rows = 0
+
+    def write(self, partition, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if partition not in self.writers:
+            month, subject_id = partition
+            directory = os.path.join(self.root, self.table_name, f'month={month}', f'subject_id={subject_id}')
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, self.part_name)
+            self.writers[partition] = (pq.ParquetWriter(_temporary_path(path), self.schema, compression='zstd'), path)
+        table = pa.Table.from_pydict(columns, schema=self.schema)
+        self.writers[partition][0].write_table(table)
+        self.rows += table.num_rows
+
+    def close(self, commit=True):
+        """Close every writer, moving finished files into place (or discarding them)"""
+        for writer, path in self.writers.values():
+            writer.close()
+            if commit:
+                os.replace(_temporary_path(path), path)
+            else:
+                os.remove(_temporary_path(path))
+        return len(self.writers)
+
+
+def _columns(schema):
+    return {name: [] for name in schema.names}
+
+
+def _answer_index(answer):
+    return int(answer) if answer.isdigit() else None
+
+
+def write_questions(root, schema):
+    """Rewrite the questions dimension; returns {question_id: correct_answer}"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from sqlalchemy import select
+    from backend.app.models import Question, Quiz, Chapter
+    from backend.app.database import db
+
+    rows = db.session.execute(select(
+        Question.id, Question.quiz_id, Quiz.chapter_id, Chapter.subject_id, Question.question_type,
+        Question.points, Question.correct_answer, Question.options, Question.order, Question.is_active
+    ).join(Quiz, Quiz.id == Question.quiz_id).join(
+        Chapter, Chapter.id == Quiz.chapter_id
+    ).order_by(Question.id)).all()
+
+    columns = _columns(schema)
+    for row in rows:
+        columns['question_id'].append(row.id)
+        columns['quiz_id'].append(row.quiz_id)
+        columns['chapter_id'].append(row.chapter_id)
+        columns['subject_id'].append(row.subject_id)
+        columns['question_type'].append(row.question_type)
+        columns['points'].append(row.points)
+        columns['correct_answer'].append(str(row.correct_answer))
+        try:
+            columns['option_count'].append(len(json.loads(row.options)) if row.options else 0)
+        except ValueError:
+            columns['option_count'].append(None)
+        columns['question_order'].append(row.order)
+        columns['is_active'].append(row.is_active)
+
+    directory = os.path.join(root, 'questions')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'questions.parquet')
+    pq.write_table(pa.Table.from_pydict(columns, schema=schema), _temporary_path(path), compression='zstd')
+    os.replace(_temporary_path(path), path)
+    return {row.id: str(row.correct_answer) for row in rows}
+
+
+def export_analytics(root, batch_size=50000, now=None):
+    """Append scores and answers above the watermark to the Parquet dataset at root
+
+    Returns a summary with the score id range, row counts and files written.
+    """
+    from sqlalchemy import select
+    from backend.app.models import Score, Quiz, Chapter
+    from backend.app.database import db
+
+    now = now or datetime.utcnow()
+    os.makedirs(root, exist_ok=True)
+    after_id = read_watermark(root)['last_score_id']
+    scores_schema, answers_schema, questions_schema = _schemas()
+
+    correct_answers = write_questions(root, questions_schema)
+
+    query = select(
+        Score.id, Score.user_id, Score.quiz_id, Quiz.chapter_id, Chapter.subject_id,
+        Score.score, Score.max_score, Score.percentage, Score.passed, Score.attempt_number,
+        Score.time_taken_seconds, Score.started_at, Score.completed_at, Score.created_at,
+        Score.answers, Score.answers_packed, Score.answer_layout_id
+    ).join(Quiz, Quiz.id == Score.quiz_id).join(
+        Chapter, Chapter.id == Quiz.chapter_id
+    ).where(
+        Score.id > after_id,
+        Score.created_at < now - timedelta(seconds=COMMIT_LAG_SECONDS)
+    ).order_by(Score.id).execution_options(yield_per=batch_size)
+
+    part_name = f'part-{after_id + 1:012d}.parquet'
+    scores_out = _PartitionWriters(root, 'scores', scores_schema, part_name)
+    answers_out = _PartitionWriters(root, 'answers', answers_schema, part_name)
+    last_id = after_id
+
+    try:
+        for batch in db.session.execute(query).partitions():
+            score_columns, answer_columns = {}, {}
+            for row in batch:
+                partition = (row.created_at.strftime('%Y-%m'), row.subject_id)
+                if partition not in score_columns:
+                    score_columns[partition] = _columns(scores_schema)
+                    answer_columns[partition] = _columns(answers_schema)
+
+                columns = score_columns[partition]
+                columns['score_id'].append(row.id)
+                columns['user_id'].append(row.user_id)
+                columns['quiz_id'].append(row.quiz_id)
+                columns['chapter_id'].append(row.chapter_id)
+                columns['score'].append(row.score)
+                columns['max_score'].append(row.max_score)
+                columns['percentage'].append(row.percentage)
+                columns['passed'].append(bool(row.passed))
+                columns['attempt_number'].append(row.attempt_number)
+                columns['time_taken_seconds'].append(row.time_taken_seconds)
+                columns['started_at'].append(row.started_at)
+                columns['completed_at'].append(row.completed_at)
+                columns['created_at'].append(row.created_at)
+
+                # Flatten the answer map into one typed row per answered question
+                columns = answer_columns[partition]
+                for question_id, answer in Score.parse_answers(row.answers, row.answers_packed, row.answer_layout_id).items():
+                    try:
+                        question_id = int(question_id)
+                    except (TypeError, ValueError):
+                        continue
+                    answer = str(answer)
+                    columns['score_id'].append(row.id)
+                    columns['user_id'].append(row.user_id)
+                    columns['quiz_id'].append(row.quiz_id)
+                    columns['question_id'].append(question_id)
+                    columns['answer'].append(answer)
+                    columns['answer_index'].append(_answer_index(answer))
+                    columns['is_correct'].append(answer == correct_answers.get(question_id))
+                    columns['created_at'].append(row.created_at)
+
+                last_id = row.id
+
+            for partition, columns in score_columns.items():
+                scores_out.write(partition, columns)
+            for partition, columns in answer_columns.items():
+                if columns['score_id']:
+                    answers_out.write(partition, columns)
+    except Exception:
+        scores_out.close(commit=False)
+        answers_out.close(commit=False)
+        raise
+
+    files = scores_out.close() + answers_out.close()
+
+    # The watermark moves only once every file of the run is in place
+    summary = {
+        'last_score_id': last_id,
+        'previous_score_id': after_id,
+        'scores': scores_out.rows,
+        'answers': answers_out.rows,
+        'questions': len(correct_answers),
+        'files': files,
+        'exported_at': now.isoformat()
+    }
+    _write_watermark(root, summary)
+    return summary
+
+
+def read_analytics_dataset(root, table):
+    """Open one exported table ('scores', 'answers' or 'questions') as a pyarrow dataset"""
+    import pyarrow.dataset as ds
+    return ds.dataset(os.path.join(root, table), format='parquet', partitioning='hive')
@@ -0,0 +1,134 @@
+"""
+Nightly read-only analytics snapshot for reporting queries.
+
+The snapshot is a separate SQLite file holding a copy of the database plus
+pre-aggregated fact tables. Leaderboards, dashboard trends and monthly
+reports opt into it with ``use_snapshot()`` (see db_routing.py), so their
+heavy scans run against the copy instead of the live ``scores`` table.
+
+A SQLite primary is copied with the backup API, which gives a consistent
+copy while the app keeps running. Other databases have the reporting tables
+streamed across in batches. The snapshot is built under a temporary name
+and moved into place when complete; readers pick up the new file on their
+next health check.
+"""
+import os
+import sqlite3
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, Integer, Float, String, create_engine, select
+
+# Tables copied when the primary is not SQLite (the backup API copies everything)
+SNAPSHOT_TABLES = ['users', 'subjects', 'chapters', 'quizzes', 'questions', 'scores']
+
+snapshot_metadata = MetaData()
+
+fact_daily_attempts = Table(
+    'fact_daily_attempts', snapshot_metadata,
+    Column('day', String, primary_key=True),  # YYYY-MM-DD of completed_at
+    Column('attempts', Integer),
+    Column('users', Integer),
+    Column('avg_percentage', Float),
+    Column('passed_count', Integer)
+)
+
+fact_user_totals = Table(
+    'fact_user_totals', snapshot_metadata,
+    Column('user_id', Integer, primary_key=True),
+    Column('attempts', Integer),
+    Column('avg_percentage', Float),
+    Column('passed_count', Integer)
+)
+
+FACT_TABLES_SQL = [
+    """
+    CREATE TABLE fact_daily_attempts AS
+    SELECT date(completed_at) AS day,
+           COUNT(*) AS attempts,
+           COUNT(DISTINCT user_id) AS users,
+           AVG(percentage) AS avg_percentage,
+           SUM(CASE WHEN passed THEN 1 ELSE 0 END) AS passed_count
+    FROM scores
+    GROUP BY date(completed_at)
+    """,
+    "CREATE UNIQUE INDEX idx_fact_daily_attempts_day ON fact_daily_attempts(day)",
+    """
+    CREATE TABLE fact_user_totals AS
+    SELECT user_id,
+           COUNT(*) AS attempts,
+           AVG(percentage) AS avg_percentage,
+           SUM(CASE WHEN passed THEN 1 ELSE 0 END) AS passed_count
+    FROM scores
+    GROUP BY user_id
+    """,
+    "CREATE UNIQUE INDEX idx_fact_user_totals_user ON fact_user_totals(user_id)",
+    "CREATE INDEX idx_fact_user_totals_avg ON fact_user_totals(avg_percentage, attempts)",
+]
+
+
+def _copy_with_backup(source_path, target_path):
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def _copy_tables(source_engine, target_path, batch_size):
+    """Stream the reporting tables into a fresh SQLite file"""
+    from backend.app.database import db
+
+    tables = [db.metadata.tables[name] for name in SNAPSHOT_TABLES]
+    target_engine = create_engine(f'sqlite:///{target_path}')
+    try:
+        db.metadata.create_all(bind=target_engine, tables=tables)
+        with source_engine.connect() as source, target_engine.begin() as target:
+            for table in tables:
+                result = source.execution_options(yield_per=batch_size).execute(select(table))
+                for partition in result.partitions():
+                    target.execute(table.insert(), [dict(row._mapping) for row in partition])
+    finally:
+        target_engine.dispose()
+
+
+def build_snapshot(source_engine, target_path, batch_size=50000):
+    """Build the snapshot file at target_path from the primary database
+
+    Returns a summary with the build time and fact table sizes.
+    """
+    built_at = datetime.utcnow()
+    building = target_path + '.building'
+    if os.path.exists(building):
+        os.remove(building)
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+
+    if source_engine.url.get_backend_name() == 'sqlite':
+        _copy_with_backup(source_engine.url.database, building)
+    else:
+        _copy_tables(source_engine, building, batch_size)
+
+    conn = sqlite3.connect(building)
+    try:
+        # A WAL-mode source leaves the copy in WAL mode, which read-only readers cannot open
+        conn.execute("PRAGMA journal_mode=DELETE")
+        for statement in FACT_TABLES_SQL:
+            conn.execute(statement)
+        conn.execute("CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO snapshot_meta (key, value) VALUES (?, ?)", [
+            ('built_at', built_at.isoformat()),
+            ('source', source_engine.url.get_backend_name()),
+        ])
+        conn.execute("ANALYZE")
+        conn.commit()
+        summary = {
+            'built_at': built_at.isoformat(),
+            'daily_facts': conn.execute("SELECT COUNT(*) FROM fact_daily_attempts").fetchone()[0],
+            'user_facts': conn.execute("SELECT COUNT(*) FROM fact_user_totals").fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+    os.replace(building, target_path)
+    summary['size_mb'] = round(os.path.getsize(target_path) / 1024 / 1024, 1)
+    return summary
@@ -0,0 +1,135 @@
+"""
+Compact binary encoding of a score's answer map.
+
+An answer layout fixes, for one version of a quiz, the order of its
+questions and each question's answer choices (Question.get_answer_choices).
+A packed answer map is then one byte per question in layout order holding
+the index of the chosen answer, or OMITTED. Scores store the bytes in
+``answers_packed`` together with ``answer_layout_id``; answer maps that do
+not fit a layout (unknown question ids, answers outside the choices, more
+than 255 choices) stay JSON text in ``answers``.
+
+Decoding gives the same map with string keys and values, which is how
+answers are compared everywhere (``str(answer) == correct_answer``).
+"""
+import hashlib
+import json
+from operator import getitem
+
+import numpy as np
+
+OMITTED = 255
+
+
+def layout_version(questions):
+    """Fingerprint of the question order and answer choices"""
+    key = json.dumps([[question.id, question.get_answer_choices()] for question in questions])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class AnswerCodec:
+    """Packs and unpacks answer maps for one answer layout"""
+
+    def __init__(self, layout_id, question_ids, choices):
+        self.layout_id = layout_id
+        self.question_ids = list(question_ids)
+        self.choices = [list(question_choices) for question_choices in choices]
+        self.packable = all(len(question_choices) < OMITTED for question_choices in self.choices)
+        self._columns = {str(question_id): column for column, question_id in enumerate(self.question_ids)}
+        self._codes = [{choice: code for code, choice in enumerate(question_choices)} for question_choices in self.choices]
+        self._keys = [str(question_id) for question_id in self.question_ids]
+        # Per column, the answer for every possible byte (None for OMITTED)
+        self._answers = [tuple(question_choices) + (None,) * (256 - len(question_choices))
+                         for question_choices in self.choices]
+
+    def column(self, question_id):
+        """Layout column of a question, or None if it is not in the layout"""
+        return self._columns.get(str(question_id))
+
+    def pack(self, answers):
+        """bytes for an answer map, or None when it does not fit the layout"""
+        if not self.packable or not isinstance(answers, dict):
+            return None
+        packed = bytearray([OMITTED]) * len(self.question_ids)
+        for question_id, answer in answers.items():
+            column = self._columns.get(str(question_id))
+            if column is None:
+                return None
+            if answer is None:
+                continue
+            if isinstance(answer, bool) or not isinstance(answer, (str, int)):
+                return None
+            code = self._codes[column].get(str(answer))
+            if code is None:
+                return None
+            packed[column] = code
+        return bytes(packed)
+
+    def unpack(self, packed):
+        """The answer map for packed bytes"""
+        answers = map(getitem, self._answers, packed)
+        if OMITTED not in packed:
+            return dict(zip(self._keys, answers))
+        return {key: answer for key, answer in zip(self._keys, answers) if answer is not None}
+
+    def unpack_matrix(self, blobs):
+        """Codes of many packed answer maps as a (scores, questions) uint8 array"""
+        return np.frombuffer(b''.join(blobs), dtype=np.uint8).reshape(len(blobs), len(self.question_ids))
+
+
+def storage_stats():
+    """Scores and bytes stored as JSON text and as packed answers"""
+    from sqlalchemy import select, func
+    from backend.app.models import Score
+    from backend.app.database import db
+
+    row = db.session.execute(select(
+        func.count(Score.answers), func.coalesce(func.sum(func.length(Score.answers)), 0),
+        func.count(Score.answers_packed), func.coalesce(func.sum(func.length(Score.answers_packed)), 0)
+    )).one()
+    return {'json_scores': row[0], 'json_bytes': int(row[1]), 'packed_scores': row[2], 'packed_bytes': int(row[3])}
+
+
+def pack_legacy_answers(after_id=0, batch_size=5000):
+    """Convert JSON answer maps above after_id to the packed encoding
+
+    Each batch is committed on its own, so an interrupted run loses nothing
+    and the next run skips the rows already packed. Answer maps that do not
+    fit the quiz's current layout stay JSON. Returns a summary.
+    """
+    from sqlalchemy import select, update
+    from backend.app.models import Score, AnswerLayout
+    from backend.app.database import db
+    from backend.app.utils.item_analysis import active_questions
+
+    codecs = {}
+    summary = {'scanned': 0, 'packed': 0, 'kept_json': 0, 'json_bytes': 0, 'packed_bytes': 0, 'last_score_id': after_id}
+    while True:
+        rows = db.session.execute(select(Score.id, Score.quiz_id, Score.answers).where(
+            Score.id > summary['last_score_id'],
+            Score.answers.isnot(None),
+            Score.answers_packed.is_(None)
+        ).order_by(Score.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        updates = []
+        for row in rows:
+            codec = codecs.get(row.quiz_id)
+            if codec is None:
+                codec = codecs[row.quiz_id] = AnswerLayout.for_questions(row.quiz_id, active_questions(row.quiz_id))
+            packed = codec.pack(Score.parse_answers(row.answers))
+            if packed is None:
+                summary['kept_json'] += 1
+                continue
+            updates.append({'id': row.id, 'answers': None, 'answers_packed': packed, 'answer_layout_id': codec.layout_id})
+            summary['json_bytes'] += len(row.answers.encode('utf-8'))
+            summary['packed_bytes'] += len(packed)
+        if updates:
+            db.session.execute(update(Score), updates)
+        db.session.commit()
+
+        summary['scanned'] += len(rows)
+        summary['packed'] += len(updates)
+        summary['last_score_id'] = rows[-1].id
+    return summary
@@ -0,0 +1,52 @@
+"""
+Streaming CSV responses.
+
+Rows are produced in batches (typically from a ``yield_per`` query) and
+encoded one batch at a time, so a download of any size holds a single batch
+in memory and the header reaches the client before the query has finished.
+With ``gzip=True`` the stream is compressed on the fly into a .csv.gz file.
+"""
+import csv
+import io
+import zlib
+from flask import Response, stream_with_context
+
+
+def iter_csv(header, row_batches):
+    """Yield CSV text: the header first, then one string per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+
+    for rows in row_batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def iter_gzip(chunks, level=6):
+    """Compress a stream of text chunks into one gzip member"""
+    # wbits=31 writes the gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def csv_response(header, row_batches, filename, gzip=False):
+    """Stream row_batches as a CSV attachment named filename (+ .gz when gzip)"""
+    chunks = iter_csv(header, row_batches)
+    if gzip:
+        body, mimetype, filename = iter_gzip(chunks), 'application/gzip', f'{filename}.gz'
+    else:
+        body, mimetype = (chunk.encode('utf-8') for chunk in chunks), 'text/csv'
+
+    # stream_with_context keeps the request (and its DB session) alive while streaming
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'  # let nginx pass batches straight through
+    return response
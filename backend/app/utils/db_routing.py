@@ -0,0 +1,201 @@
+"""
+Read/write routing between the primary database and an optional read replica.
+
+When ``REPLICA_DATABASE_URL`` is configured the replica is registered as the
+``replica`` bind. GET requests and code running inside ``use_replica()`` read
+from it; flushes, writes and everything else go to the primary. A client that
+wrote recently keeps reading from the primary for ``READ_YOUR_WRITES_SECONDS``
+so it always sees its own changes.
+
+When ``ANALYTICS_SNAPSHOT_PATH`` is configured, the nightly read-only
+snapshot (see analytics_snapshot.py) is registered as the ``analytics``
+bind, and reporting code can opt into it with ``use_snapshot()``.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+REPLICA_BIND_KEY = 'replica'
+SNAPSHOT_BIND_KEY = 'analytics'
+LAST_WRITE_COOKIE = 'qm_last_write'
+
+# The replica must hold the schema, not just accept connections
+HEALTH_CHECK_SQL = 'SELECT 1 FROM users LIMIT 1'
+
+READ_METHODS = ('GET', 'HEAD')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+_read_from_snapshot = ContextVar('read_from_snapshot', default=False)
+_replica_health = {}  # engine url -> (healthy, checked_at)
+_snapshot_state = {}  # engine url -> (built_at, file inode, checked_at)
+_health_check_interval = 30
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica bind when routing allows it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _read_from_snapshot.get():
+            engine = self._db.engines.get(SNAPSHOT_BIND_KEY)
+            if engine is not None:
+                return engine
+        if bind is None and not self._flushing and _read_from_replica.get():
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None and replica_available(engine):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_available(engine):
+    """Check replica health, caching the result for the health check interval"""
+    key = str(engine.url)
+    healthy, checked_at = _replica_health.get(key, (False, None))
+    now = time.monotonic()
+
+    if checked_at is None or now - checked_at >= _health_check_interval:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(HEALTH_CHECK_SQL))
+            healthy = True
+        except Exception as e:
+            if healthy or checked_at is None:
+                print(f"[DB ROUTING] Replica unavailable, falling back to primary: {e}")
+            healthy = False
+        _replica_health[key] = (healthy, now)
+
+    return healthy
+
+
+@contextmanager
+def use_replica():
+    """Route reads inside the block to the replica (used by reporting tasks)"""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def snapshot_path(engine):
+    """Filesystem path of the analytics snapshot behind a bind engine"""
+    database = engine.url.database
+    return database[5:] if database.startswith('file:') else database
+
+
+def snapshot_built_at(engine):
+    """When the current snapshot file was built, or None if there is none
+
+    Checked at most every health check interval. A rebuilt snapshot replaces
+    the file, so pooled connections to the old file are dropped when its
+    inode changes.
+    """
+    key = str(engine.url)
+    built_at, inode, checked_at = _snapshot_state.get(key, (None, None, None))
+    now = time.monotonic()
+
+    if checked_at is None or now - checked_at >= _health_check_interval:
+        try:
+            current_inode = os.stat(snapshot_path(engine)).st_ino
+        except OSError:
+            current_inode = None
+
+        if current_inode is None:
+            built_at = None
+        elif current_inode != inode or built_at is None:
+            engine.dispose()
+            try:
+                with engine.connect() as conn:
+                    value = conn.execute(text(
+                        "SELECT value FROM snapshot_meta WHERE key = 'built_at'"
+                    )).scalar()
+                built_at = datetime.fromisoformat(value) if value else None
+            except Exception as e:
+                print(f"[DB ROUTING] Analytics snapshot unreadable, using live data: {e}")
+                built_at = None
+        _snapshot_state[key] = (built_at, current_inode, now)
+
+    return built_at
+
+
+@contextmanager
+def use_snapshot(covers=None):
+    """Route reads inside the block to the nightly analytics snapshot
+
+    Yields the snapshot's build time. When no snapshot is configured, it is
+    older than ANALYTICS_SNAPSHOT_MAX_AGE_HOURS, or it was built before
+    covers, yields None and reads keep their normal routing.
+    """
+    from flask import current_app
+
+    built_at = None
+    engine = current_app.extensions['sqlalchemy'].engines.get(SNAPSHOT_BIND_KEY)
+    if engine is not None:
+        built_at = snapshot_built_at(engine)
+        max_age = timedelta(hours=current_app.config.get('ANALYTICS_SNAPSHOT_MAX_AGE_HOURS', 36))
+        if built_at is not None and (datetime.utcnow() - built_at > max_age
+                                     or (covers is not None and built_at < covers)):
+            built_at = None
+
+    token = _read_from_snapshot.set(built_at is not None)
+    try:
+        yield built_at
+    finally:
+        _read_from_snapshot.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Force reads inside the block to the primary"""
+    token = _read_from_replica.set(False)
+    snapshot_token = _read_from_snapshot.set(False)
+    try:
+        yield
+    finally:
+        _read_from_snapshot.reset(snapshot_token)
+        _read_from_replica.reset(token)
+
+
+def _wrote_recently(window):
+    """Check the last-write cookie for read-your-writes stickiness"""
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < window
+
+
+def init_read_replica(app):
+    """Register request hooks that pick the replica for read-only requests"""
+    global _health_check_interval
+
+    if REPLICA_BIND_KEY not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    _health_check_interval = app.config.get('REPLICA_HEALTH_CHECK_SECONDS', 30)
+    window = app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+
+    @app.before_request
+    def route_reads():
+        _read_from_replica.set(request.method in READ_METHODS and not _wrote_recently(window))
+
+    @app.after_request
+    def remember_writes(response):
+        if request.method not in READ_METHODS + ('OPTIONS',) and response.status_code < 400:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                str(time.time()),
+                max_age=window,
+                httponly=True,
+                secure=app.config.get('SESSION_COOKIE_SECURE', False),
+                samesite='Lax'
+            )
+        return response
+
+    @app.teardown_request
+    def reset_routing(exc):
+        _read_from_replica.set(False)
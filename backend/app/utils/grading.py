@@ -0,0 +1,47 @@
+"""
+Scoring rules shared by every submit route and by regrades.
+
+A submission is graded against the quiz's active questions: an answer is
+correct when ``str(answer) == str(correct_answer)`` and earns the question's
+points, max_score is the active questions' points, the percentage is earned
+over max_score and the attempt passes at the quiz's passing score.
+score_percentage() and score_passed() also work on numpy arrays, so the
+vectorized regrade (utils/regrade.py) applies the same rules.
+"""
+
+
+def is_correct(question, answer):
+    return answer is not None and str(answer) == str(question.correct_answer)
+
+
+def score_percentage(earned, max_score):
+    """Percentage of max_score earned; 0 when the quiz has no points"""
+    if hasattr(max_score, 'shape'):
+        import numpy as np
+        # Per attempt, each with its own max_score
+        return np.divide(earned, max_score, out=np.zeros(max_score.shape), where=max_score > 0) * 100
+    return earned / max_score * 100 if max_score > 0 else earned * 0.0
+
+
+def score_passed(percentage, passing_score):
+    return percentage >= passing_score
+
+
+def grade_submission(questions, answers, passing_score):
+    """Grade an answer map against the quiz's active questions
+
+    Returns a dict with earned, max_score, correct_answers, percentage,
+    passed and correct (question id -> bool).
+    """
+    correct = {question.id: is_correct(question, answers.get(str(question.id))) for question in questions}
+    earned = sum(question.points or 0 for question in questions if correct[question.id])
+    max_score = sum(question.points or 0 for question in questions)
+    percentage = score_percentage(earned, max_score)
+    return {
+        'earned': earned,
+        'max_score': max_score,
+        'correct_answers': sum(correct.values()),
+        'percentage': percentage,
+        'passed': score_passed(percentage, passing_score),
+        'correct': correct
+    }
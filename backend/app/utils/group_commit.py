@@ -0,0 +1,196 @@
+"""
+Group commit for quiz submissions.
+
+By default every submit commits its own transaction, which on SQLite means a
+write lock and an fsync per submission; when a whole class submits at the
+deadline those serialize and throughput collapses. With
+``GROUP_COMMIT_ENABLED`` the submit routes hand their writes (the score row
+and its option counter increments) to a bounded in-process queue instead.
+One writer thread per process drains it and commits everything it gathered
+in a single transaction, once ``GROUP_COMMIT_MAX_BATCH`` submissions are
+waiting or ``GROUP_COMMIT_INTERVAL_MS`` after the first one arrived. Each
+request blocks until the transaction holding its row has committed, so a
+submission is only acknowledged once it is durable.
+
+If a batch fails, its submissions are retried one transaction each, so one
+bad row only fails its own request. A full queue blocks new submissions for
+up to ``GROUP_COMMIT_WAIT_SECONDS``, then they fail with
+GroupCommitTimeout (503).
+"""
+import os
+import queue
+import threading
+import time
+
+
+class GroupCommitTimeout(Exception):
+    """A submission was not committed within GROUP_COMMIT_WAIT_SECONDS"""
+
+
+class PendingSubmission:
+    """One submission's writes, waiting in the queue"""
+
+    __slots__ = ('score_values', 'counter_rows', 'done', 'score_id', 'error')
+
+    def __init__(self, score_values, counter_rows):
+        self.score_values = score_values
+        self.counter_rows = counter_rows or []
+        self.done = threading.Event()
+        self.score_id = None
+        self.error = None
+
+
+class GroupCommitter:
+    """Bounded submission queue drained by one writer thread"""
+
+    def __init__(self, app, max_batch=64, interval_ms=5, queue_size=1000, wait_seconds=30):
+        self.app = app
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0, interval_ms) / 1000
+        self.queue_size = queue_size
+        self.wait_seconds = wait_seconds
+        self.batches = 0
+        self.submissions = 0
+        self.largest_batch = 0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def _ensure_writer(self):
+        # A forked worker inherits the queue but not the thread, so it starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def submit(self, score_values, counter_rows=None):
+        """Queue a submission and wait until it is committed; returns the new score id"""
+        self._ensure_writer()
+        pending = PendingSubmission(score_values, counter_rows)
+        deadline = time.monotonic() + self.wait_seconds
+        try:
+            self._queue.put(pending, timeout=self.wait_seconds)
+        except queue.Full:
+            raise GroupCommitTimeout('Too many submissions in progress, please retry')
+        if not pending.done.wait(max(0, deadline - time.monotonic())):
+            raise GroupCommitTimeout('Submission is still being saved, please check your scores before retrying')
+        if pending.error is not None:
+            raise pending.error
+        return pending.score_id
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'submissions': self.submissions,
+            'largest_batch': self.largest_batch,
+            'average_batch': round(self.submissions / self.batches, 2) if self.batches else 0,
+            'queued': self._queue.qsize() if self._queue is not None else 0
+        }
+
+    def _gather(self):
+        """Block for the first submission, then collect more until the batch is full or the interval ends"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        from backend.app.database import db
+
+        with self.app.app_context():
+            while True:
+                batch = self._gather()
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    db.session.rollback()
+                    if len(batch) > 1:
+                        print(f"[GROUP COMMIT] Batch of {len(batch)} failed, retrying one by one: {e}")
+                        for pending in batch:
+                            try:
+                                self._commit([pending])
+                            except Exception as item_error:
+                                db.session.rollback()
+                                pending.error = item_error
+                    else:
+                        batch[0].error = e
+                finally:
+                    db.session.remove()
+                    for pending in batch:
+                        pending.done.set()
+
+    def _commit(self, batch):
+        """Write a batch in one transaction"""
+        from sqlalchemy import insert
+        from backend.app.database import db
+        from backend.app.models import Score, QuestionOptionCount
+
+        score_ids = [db.session.execute(insert(Score).values(**pending.score_values)).inserted_primary_key[0]
+                     for pending in batch]
+
+        # One upsert for the whole batch, in key order so concurrent writers lock rows alike
+        increments = {}
+        for pending in batch:
+            for row in pending.counter_rows:
+                key = (row['question_id'], row['answer'])
+                if key in increments:
+                    increments[key]['count'] += row['count']
+                else:
+                    increments[key] = dict(row)
+        QuestionOptionCount.add_counts([increments[key] for key in sorted(increments)])
+
+        db.session.commit()
+        for pending, score_id in zip(batch, score_ids):
+            pending.score_id = score_id
+        self.batches += 1
+        self.submissions += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+
+def init_group_commit(app):
+    """Set up the submission writer when GROUP_COMMIT_ENABLED is set"""
+    if not app.config.get('GROUP_COMMIT_ENABLED'):
+        return
+    app.extensions['group_commit'] = GroupCommitter(
+        app,
+        max_batch=app.config.get('GROUP_COMMIT_MAX_BATCH', 64),
+        interval_ms=app.config.get('GROUP_COMMIT_INTERVAL_MS', 5),
+        queue_size=app.config.get('GROUP_COMMIT_QUEUE_SIZE', 1000),
+        wait_seconds=app.config.get('GROUP_COMMIT_WAIT_SECONDS', 30)
+    )
+
+
+def save_submission(score, counter_rows=None):
+    """Commit a new score and its option counter increments; returns the stored Score
+
+    Without group commit they are committed in the request's transaction.
+    With it, the request's transaction is committed first (it only holds a
+    new answer layout, if any) so it does not hold SQLite locks the writer
+    needs, then the writes are queued and the committed row is loaded back.
+    """
+    from flask import current_app
+    from backend.app.database import db
+    from backend.app.models import Score, QuestionOptionCount
+
+    committer = current_app.extensions.get('group_commit')
+    if committer is None:
+        db.session.add(score)
+        QuestionOptionCount.add_counts(counter_rows or [])
+        db.session.commit()
+        return score
+
+    db.session.commit()
+    score_values = {column.key: getattr(score, column.key) for column in Score.__table__.columns
+                    if getattr(score, column.key) is not None}
+    score_id = committer.submit(score_values, counter_rows)
+    return db.session.get(Score, score_id)
@@ -25,4 +25,10 @@ def create_default_admin():
             
     except Exception as e:
         print(f"Error creating default admin: {str(e)}")
-        db.session.rollback() 
+        db.session.rollback()
+
+def init_database():
+    """Create missing tables and the default admin (run once per deploy)"""
+    # Primary only: the replica and the read-only analytics snapshot get their schema elsewhere
+    db.create_all(bind_key=None)
+    create_default_admin()
@@ -0,0 +1,348 @@
+"""
+Item analysis for quiz questions: difficulty, discrimination and distractors.
+
+A quiz's attempts are loaded into a NumPy response matrix (attempts x
+questions) holding the option each attempt chose, and every statistic is
+derived from a handful of running totals over that matrix:
+
+- difficulty: the share of attempts answering the question correctly (p-value)
+- discrimination: point-biserial correlation between getting the question
+  right and the score on the rest of the quiz (the question's own points are
+  left out of the total so it does not correlate with itself)
+- distractors: how often each option was picked and the average rest-of-quiz
+  score of the attempts that picked it
+- reliability: Cronbach's alpha of the whole quiz
+
+The totals are plain sums, so new attempts are added without rereading the
+old ones. They are cached per quiz version in ``item_analysis_cache``; the
+version is a fingerprint of the active questions, so editing a question's
+answer, points or options starts a fresh analysis.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+# Options picked by fewer attempts than this are flagged as non-functioning
+NON_FUNCTIONING_SHARE = 0.05
+# Questions whose discrimination is below this are flagged for review
+LOW_DISCRIMINATION = 0.2
+
+
+def quiz_version(questions):
+    """Fingerprint of everything about the questions that the analysis depends on"""
+    key = json.dumps([
+        [question.id, str(question.correct_answer), question.points or 0, question.get_answer_choices()]
+        for question in questions
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def active_questions(quiz_id):
+    """The quiz's active questions in a stable column order"""
+    from backend.app.models import Question
+    return Question.query.filter_by(
+        quiz_id=quiz_id,
+        is_active=True
+    ).order_by(Question.order, Question.id).all()
+
+
+def quiz_questions(quiz_id):
+    """All of the quiz's questions, deactivated ones included, in the same column order"""
+    from backend.app.models import Question
+    return Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order, Question.id).all()
+
+
+class AnswerKey:
+    """A quiz's active questions compiled for vectorized grading
+
+    Answers are coded per question as the index of the chosen answer choice,
+    'other' (an answer that is not one of its choices) or 'omitted', so a
+    batch of attempts becomes an integer matrix that is compared against the
+    correct codes in one operation.
+    """
+
+    def __init__(self, questions):
+        self.question_ids = [question.id for question in questions]
+        self.choices = [question.get_answer_choices() for question in questions]
+        self.points = np.array([question.points or 0 for question in questions], dtype=np.float64)
+        self.width = max((len(choices) for choices in self.choices), default=0) + 2
+        self.other = self.width - 2
+        self.omitted = self.width - 1
+        self.correct = np.array([
+            choices.index(str(question.correct_answer)) for question, choices in zip(questions, self.choices)
+        ], dtype=np.int64)
+        self.version = quiz_version(questions)
+        self._translations = {}
+        self._columns = {str(question_id): column for column, question_id in enumerate(self.question_ids)}
+        self._codes = [{choice: code for code, choice in enumerate(choices)} for choices in self.choices]
+
+    def response_matrix(self, answer_maps):
+        """Choice codes for a batch of attempts, shape (attempts, questions)"""
+        matrix = np.full((len(answer_maps), len(self.question_ids)), self.omitted, dtype=np.int64)
+        columns, codes, other = self._columns, self._codes, self.other
+        for row, answers in enumerate(answer_maps):
+            for question_id, answer in answers.items():
+                column = columns.get(str(question_id))
+                if column is not None and answer is not None:
+                    matrix[row, column] = codes[column].get(str(answer), other)
+        return matrix
+
+    def _translation(self, codec):
+        """(layout column per key column, code lookup table per key column) for a packed layout"""
+        translation = self._translations.get(codec.layout_id)
+        if translation is None:
+            from backend.app.utils.answer_encoding import OMITTED
+            layout_columns = np.zeros(len(self.question_ids), dtype=np.int64)
+            tables = np.full((len(self.question_ids), 256), self.omitted, dtype=np.int64)
+            for column, question_id in enumerate(self.question_ids):
+                layout_column = codec.column(question_id)
+                if layout_column is None:
+                    continue  # not in the layout: always omitted
+                layout_columns[column] = layout_column
+                for code, choice in enumerate(codec.choices[layout_column]):
+                    tables[column, code] = self._codes[column].get(choice, self.other)
+                tables[column, OMITTED] = self.omitted
+            translation = self._translations[codec.layout_id] = (layout_columns, tables)
+        return translation
+
+    def score_matrix(self, rows):
+        """Response matrix for score rows with answers, answers_packed and answer_layout_id
+
+        Packed rows are translated from their layout's codes with table
+        lookups, without building answer dictionaries; legacy JSON rows go
+        through response_matrix().
+        """
+        from backend.app.models import AnswerLayout, Score
+
+        matrix = np.full((len(rows), len(self.question_ids)), self.omitted, dtype=np.int64)
+        legacy, packed = [], {}
+        for index, row in enumerate(rows):
+            if row.answers_packed is not None and row.answer_layout_id is not None:
+                packed.setdefault(row.answer_layout_id, []).append(index)
+            else:
+                legacy.append(index)
+
+        if legacy:
+            matrix[legacy] = self.response_matrix([Score.parse_answers(rows[index].answers) for index in legacy])
+        for layout_id, indices in packed.items():
+            codec = AnswerLayout.codec(layout_id)
+            if not codec.question_ids:
+                continue
+            codes = codec.unpack_matrix([rows[index].answers_packed for index in indices])
+            layout_columns, tables = self._translation(codec)
+            columns = np.arange(len(self.question_ids))
+            matrix[indices] = tables[columns, codes[:, layout_columns]]
+        return matrix
+
+    def grade(self, matrix):
+        """(correct matrix as 0/1 floats, earned points per attempt) for a response matrix"""
+        correct = (matrix == self.correct).astype(np.float64)
+        return correct, correct @ self.points
+
+
+class ItemAnalysis(AnswerKey):
+    """Running totals for one quiz version
+
+    Each question has one column per choice plus 'other' and 'omitted'.
+    """
+
+    def __init__(self, questions, state=None):
+        super().__init__(questions)
+
+        shape = (len(self.question_ids), self.width)
+        state = state or {}
+        self.attempts = state.get('attempts', 0)
+        self.total_sum = state.get('total_sum', 0.0)
+        self.total_sq_sum = state.get('total_sq_sum', 0.0)
+        self.correct_count = np.array(state.get('correct_count', np.zeros(shape[0])), dtype=np.float64)
+        self.correct_total_sum = np.array(state.get('correct_total_sum', np.zeros(shape[0])), dtype=np.float64)
+        self.choice_count = np.array(state.get('choice_count', np.zeros(shape)), dtype=np.float64).reshape(shape)
+        self.choice_total_sum = np.array(state.get('choice_total_sum', np.zeros(shape)), dtype=np.float64).reshape(shape)
+
+    def to_state(self):
+        return {
+            'attempts': self.attempts,
+            'total_sum': self.total_sum,
+            'total_sq_sum': self.total_sq_sum,
+            'correct_count': self.correct_count.tolist(),
+            'correct_total_sum': self.correct_total_sum.tolist(),
+            'choice_count': self.choice_count.tolist(),
+            'choice_total_sum': self.choice_total_sum.tolist()
+        }
+
+    def add(self, matrix):
+        """Add a response matrix to the running totals"""
+        attempts, questions = matrix.shape
+        if attempts == 0 or questions == 0:
+            self.attempts += attempts
+            return
+
+        correct, totals = self.grade(matrix)
+
+        self.attempts += attempts
+        self.total_sum += float(totals.sum())
+        self.total_sq_sum += float(totals @ totals)
+        self.correct_count += correct.sum(axis=0)
+        self.correct_total_sum += correct.T @ totals
+
+        # One bincount over (question, choice) cells for counts and score sums
+        cells = (np.arange(questions) * self.width + matrix).ravel()
+        size = questions * self.width
+        self.choice_count += np.bincount(cells, minlength=size).reshape(questions, self.width)
+        self.choice_total_sum += np.bincount(
+            cells, weights=np.repeat(totals, questions), minlength=size
+        ).reshape(questions, self.width)
+
+    def statistics(self):
+        """Per-question statistics and a quiz summary from the running totals"""
+        n = self.attempts
+        max_total = float(self.points.sum())
+        summary = {
+            'attempts': n,
+            'questions': len(self.question_ids),
+            'mean_percentage': None,
+            'sd_percentage': None,
+            'reliability': None
+        }
+        if n == 0:
+            return summary, [{
+                'question_id': question_id,
+                'difficulty': None,
+                'point_biserial': None,
+                'correct_count': 0,
+                'omitted_count': 0,
+                'options': [],
+                'flags': []
+            } for question_id in self.question_ids]
+
+        points = self.points
+        p = self.correct_count / n
+        mean_total = self.total_sum / n
+        variance_total = max(self.total_sq_sum / n - mean_total ** 2, 0.0)
+
+        # Rest-of-quiz score: the total with the question's own points removed
+        rest_sum = self.total_sum - points * self.correct_count
+        rest_sq_sum = self.total_sq_sum - 2 * points * self.correct_total_sum + points ** 2 * self.correct_count
+        rest_cross_sum = self.correct_total_sum - points * self.correct_count
+        rest_mean = rest_sum / n
+        covariance = rest_cross_sum / n - p * rest_mean
+        denominator = np.sqrt(p * (1 - p) * np.maximum(rest_sq_sum / n - rest_mean ** 2, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            point_biserial = np.where(denominator > 1e-9, covariance / denominator, np.nan)
+            choice_rest_mean = (self.choice_total_sum - self.choice_count * points[:, None]
+                                * (np.arange(self.width) == self.correct[:, None])) / self.choice_count
+
+        k = len(self.question_ids)
+        if k > 1 and variance_total > 0:
+            item_variance = float((points ** 2 * p * (1 - p)).sum())
+            summary['reliability'] = round(k / (k - 1) * (1 - item_variance / variance_total), 4)
+        if max_total > 0:
+            summary['mean_percentage'] = round(mean_total / max_total * 100, 2)
+            summary['sd_percentage'] = round(np.sqrt(variance_total) / max_total * 100, 2)
+
+        items = []
+        for column, question_id in enumerate(self.question_ids):
+            rest_max = max_total - points[column]
+            correct_code = self.correct[column]
+            options, outscores_key = [], False
+            for code, choice in list(enumerate(self.choices[column])) + [(self.other, 'other')]:
+                count = int(self.choice_count[column, code])
+                if code == self.other and count == 0:
+                    continue
+                share = count / n
+                is_distractor = code != correct_code and code != self.other
+                rest_mean = float(choice_rest_mean[column, code]) if count else None
+                if is_distractor and count and self.correct_count[column] \
+                        and rest_mean > choice_rest_mean[column, correct_code]:
+                    outscores_key = True
+                options.append({
+                    'answer': choice,
+                    'is_correct': bool(code == correct_code),
+                    'count': count,
+                    'share': round(share, 4),
+                    'mean_rest_percentage': round(rest_mean / rest_max * 100, 2) if count and rest_max > 0 else None,
+                    'non_functioning': bool(is_distractor and share < NON_FUNCTIONING_SHARE)
+                })
+
+            discrimination = point_biserial[column]
+            flags = []
+            if np.isnan(discrimination):
+                flags.append('no_variance')
+            elif discrimination < 0:
+                flags.append('negative_discrimination')
+            elif discrimination < LOW_DISCRIMINATION:
+                flags.append('low_discrimination')
+            if outscores_key:
+                # Attempts choosing a wrong option did better on the rest of the quiz
+                flags.append('distractor_outscores_key')
+
+            items.append({
+                'question_id': question_id,
+                'difficulty': round(float(p[column]), 4),
+                'point_biserial': None if np.isnan(discrimination) else round(float(discrimination), 4),
+                'correct_count': int(self.correct_count[column]),
+                'omitted_count': int(self.choice_count[column, self.omitted]),
+                'options': options,
+                'flags': flags
+            })
+        return summary, items
+
+
+def analyze_quiz(quiz_id, batch_size=5000):
+    """Item analysis for a quiz, updating its cached totals with any new scores
+
+    Returns (version, summary, items, new_attempts). The cached totals are
+    rebuilt from all scores when the questions changed, or when the scores
+    they cover no longer match (a late commit below last_score_id, or
+    deleted scores).
+    """
+    from sqlalchemy import select, func
+    from backend.app.models import Score, ItemAnalysisCache
+    from backend.app.database import db
+    from backend.app.utils.db_routing import use_primary
+
+    questions = active_questions(quiz_id)
+    version = quiz_version(questions)
+
+    with use_primary():
+        cache = db.session.get(ItemAnalysisCache, quiz_id)
+
+    analysis, after_id = None, 0
+    if cache is not None and cache.version == version:
+        covered = db.session.scalar(select(func.count(Score.id)).where(
+            Score.quiz_id == quiz_id, Score.id <= cache.last_score_id
+        ))
+        if covered == cache.attempts:
+            analysis, after_id = ItemAnalysis(questions, json.loads(cache.state)), cache.last_score_id
+    if analysis is None:
+        analysis = ItemAnalysis(questions)
+
+    query = select(Score.id, Score.answers, Score.answers_packed, Score.answer_layout_id).where(
+        Score.quiz_id == quiz_id, Score.id > after_id
+    ).order_by(Score.id).execution_options(yield_per=batch_size)
+
+    last_id, new_attempts = after_id, 0
+    for batch in db.session.execute(query).partitions():
+        analysis.add(analysis.score_matrix(batch))
+        last_id = batch[-1].id
+        new_attempts += len(batch)
+
+    if cache is None or new_attempts or cache.version != version or after_id != cache.last_score_id:
+        with use_primary():
+            if cache is None:
+                cache = ItemAnalysisCache(quiz_id=quiz_id)
+                db.session.add(cache)
+            cache.version = version
+            cache.last_score_id = last_id
+            cache.attempts = analysis.attempts
+            cache.state = json.dumps(analysis.to_state())
+            try:
+                db.session.commit()
+            except Exception as e:
+                # A concurrent request saved the same totals first
+                db.session.rollback()
+                print(f"[ITEM ANALYSIS] Cache for quiz {quiz_id} not saved: {e}")
+
+    summary, items = analysis.statistics()
+    return version, summary, items, new_attempts
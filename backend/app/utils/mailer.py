@@ -0,0 +1,279 @@
+"""
+Pooled SMTP mailer for report and export emails.
+
+Opening a connection, running STARTTLS and logging in costs several round
+trips, so the mailer keeps up to ``SMTP_POOL_SIZE`` authenticated
+connections open and reuses them. Each connection is closed after
+``SMTP_MAX_MESSAGES_PER_CONNECTION`` messages because many servers cap or
+throttle long sessions. Transient failures (dropped sessions, 4xx replies,
+network errors) are retried on a fresh connection with exponential backoff;
+permanent 5xx rejections are not retried. ``send_batch`` renders messages on
+one thread pool and sends them on another, one sender per pooled connection.
+"""
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Idle connections older than this are checked with NOOP before reuse
+IDLE_CHECK_SECONDS = 30
+
+_mailer = None
+_mailer_pid = None
+_mailer_lock = threading.Lock()
+
+
+class PermanentMailError(Exception):
+    """The server rejected the message for good (5xx); retrying will not help"""
+
+
+class _PooledConnection:
+    """An authenticated SMTP session and how much it has been used"""
+
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def send(self, msg):
+        self.server.send_message(msg)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+    def is_alive(self):
+        if time.monotonic() - self.last_used < IDLE_CHECK_SECONDS:
+            return True
+        try:
+            return self.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self.server.close()
+            except OSError:
+                pass
+
+
+class SMTPPool:
+    """A bounded pool of reusable, authenticated SMTP connections"""
+
+    def __init__(self, host, port, username='', password='', starttls=True, size=4,
+                 max_messages_per_connection=100, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = max(1, size)
+        self.max_messages_per_connection = max(1, max_messages_per_connection)
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._stats_lock = threading.Lock()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._stats_lock:
+            self.connections_opened += 1
+        return _PooledConnection(server)
+
+    def _checkout(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if conn.is_alive():
+                return conn
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is dropped instead of returned if the block fails"""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception:
+            if conn is not None:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                if conn.sent >= self.max_messages_per_connection:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Mailer:
+    """Send email through an SMTPPool with retries and a pipelined batch mode"""
+
+    def __init__(self, pool, sender, max_retries=3, retry_backoff=0.5, render_workers=2):
+        self.pool = pool
+        self.sender = sender
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.render_workers = max(1, render_workers)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a mailer from a Flask config (or any mapping with the SMTP_* keys)"""
+        username = config.get('SMTP_USERNAME', '')
+        pool = SMTPPool(
+            config.get('SMTP_SERVER', 'smtp.gmail.com'),
+            int(config.get('SMTP_PORT', 587)),
+            username=username,
+            password=config.get('SMTP_PASSWORD', ''),
+            starttls=config.get('SMTP_STARTTLS', True),
+            size=int(config.get('SMTP_POOL_SIZE', 4)),
+            max_messages_per_connection=int(config.get('SMTP_MAX_MESSAGES_PER_CONNECTION', 100)),
+            timeout=int(config.get('SMTP_TIMEOUT_SECONDS', 30))
+        )
+        return cls(
+            pool,
+            sender=config.get('MAIL_DEFAULT_SENDER') or username,
+            max_retries=int(config.get('SMTP_MAX_RETRIES', 3)),
+            retry_backoff=float(config.get('SMTP_RETRY_BACKOFF_SECONDS', 0.5)),
+            render_workers=int(config.get('MAIL_RENDER_WORKERS', 2))
+        )
+
+    @property
+    def configured(self):
+        return bool(self.pool.username and self.pool.password)
+
+    def send(self, msg):
+        """Send one message, retrying transient failures; returns True when sent"""
+        if not msg.get('From'):
+            msg['From'] = self.sender
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.pool.connection() as conn:
+                    try:
+                        conn.send(msg)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+                            smtplib.SMTPDataError) as e:
+                        if _is_permanent(e):
+                            raise PermanentMailError(str(e)) from e
+                        raise
+                return True
+            except PermanentMailError as e:
+                print(f"[MAILER ERROR] {msg.get('To')}: rejected: {e}")
+                return False
+            except (smtplib.SMTPException, OSError) as e:
+                if attempt == self.max_retries:
+                    print(f"[MAILER ERROR] {msg.get('To')}: giving up after {attempt + 1} attempts: {e}")
+                    return False
+                # Exponential backoff with jitter so workers do not retry in lockstep
+                time.sleep(self.retry_backoff * (2 ** attempt) * (0.5 + random.random()))
+        return False
+
+    def send_batch(self, jobs, render, max_in_flight=None, on_result=None):
+        """Render and send many messages through a two-stage thread pipeline
+
+        render(job) returns an email message, or None to skip the job. jobs
+        may be a generator; at most max_in_flight jobs are rendered or queued
+        at once, so memory stays flat for large batches. on_result(job, sent)
+        is called from a worker thread for every job that was not skipped.
+        Returns a dict with sent / failed / skipped counts.
+        """
+        results = {'sent': 0, 'failed': 0, 'skipped': 0}
+        results_lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(max_in_flight or self.pool.size * 4)
+
+        def count(key):
+            with results_lock:
+                results[key] += 1
+
+        def report(job, sent):
+            count('sent' if sent else 'failed')
+            if on_result is not None:
+                on_result(job, sent)
+
+        def send_rendered(job, msg):
+            try:
+                report(job, self.send(msg))
+            finally:
+                in_flight.release()
+
+        def render_job(job):
+            try:
+                msg = render(job)
+            except Exception as e:
+                print(f"[MAILER ERROR] Failed to render message: {e}")
+                try:
+                    report(job, False)
+                finally:
+                    in_flight.release()
+                return
+            if msg is None:
+                count('skipped')
+                in_flight.release()
+                return
+            senders.submit(send_rendered, job, msg)
+
+        with ThreadPoolExecutor(self.pool.size, thread_name_prefix='mail-send') as senders:
+            with ThreadPoolExecutor(self.render_workers, thread_name_prefix='mail-render') as renderers:
+                for job in jobs:
+                    in_flight.acquire()
+                    renderers.submit(render_job, job)
+
+        return results
+
+    def close(self):
+        self.pool.close()
+
+
+def _is_permanent(error):
+    """5xx SMTP replies are permanent, 4xx are worth retrying"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return getattr(error, 'smtp_code', 0) >= 500
+
+
+def get_mailer():
+    """Get the process-wide mailer, built from the app config on first use"""
+    global _mailer, _mailer_pid
+
+    with _mailer_lock:
+        # Sockets must not be shared across fork, so a child builds its own pool
+        if _mailer is None or _mailer_pid != os.getpid():
+            from flask import current_app, has_app_context
+            if has_app_context():
+                config = current_app.config
+            else:
+                from backend.config import Config
+                config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+            _mailer = Mailer.from_config(config)
+            _mailer_pid = os.getpid()
+
+    return _mailer
@@ -0,0 +1,326 @@
+"""
+PDF score reports rendered with reportlab.
+
+Two reports are built from plain dictionaries, so they can be rendered in
+worker processes without touching the database:
+
+- user score report: one user's attempts, summary and per-subject averages
+- quiz class report: per-student results and score distribution for a quiz
+
+Report data is gathered one bulk query per chunk of users or quizzes
+(``collect_user_reports`` / ``collect_quiz_reports``), and
+``render_report_files`` renders the chunks in a ``ProcessPoolExecutor``,
+keeping a bounded number of chunks in flight.
+"""
+import io
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+HEADER_COLOR = '#4f46e5'
+DISTRIBUTION_BUCKETS = 10
+
+
+def _styles():
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+def _table(rows, col_widths=None, align_right_from=1):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(HEADER_COLOR)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (align_right_from, 1), (-1, -1), 'RIGHT'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#d1d5db')),
+    ]))
+    return table
+
+
+def _document(buffer, title):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate
+    return SimpleDocTemplate(buffer, pagesize=A4, title=title, author='Quiz Master',
+                             leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm)
+
+
+def build_user_report(data):
+    """Render a user's score report; data comes from collect_user_reports()"""
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = _styles()
+    attempts = data['attempts']
+    passed = sum(1 for attempt in attempts if attempt['passed'])
+    average = sum(attempt['percentage'] for attempt in attempts) / len(attempts) if attempts else 0
+
+    by_subject = defaultdict(list)
+    for attempt in attempts:
+        by_subject[attempt['subject']].append(attempt['percentage'])
+
+    story = [
+        Paragraph(f"Quiz Report - {escape(data['period_label'])}", styles['Title']),
+        Paragraph(f"{escape(data['name'])} ({escape(data['email'])})", styles['Heading3']),
+        Spacer(1, 8),
+        _table([
+            ['Attempts', 'Average Score', 'Passed', 'Pass Rate'],
+            [len(attempts), f'{average:.1f}%', passed, f'{passed * 100 / len(attempts):.1f}%' if attempts else '-'],
+        ], align_right_from=0),
+        Spacer(1, 12),
+        Paragraph('Subjects', styles['Heading2']),
+        _table([['Subject', 'Attempts', 'Average']] + [
+            [subject, len(scores), f'{sum(scores) / len(scores):.1f}%']
+            for subject, scores in sorted(by_subject.items(), key=lambda item: -sum(item[1]) / len(item[1]))
+        ]),
+        Spacer(1, 12),
+        Paragraph('Attempts', styles['Heading2']),
+        _table([['Date', 'Quiz', 'Subject', 'Score', 'Percentage', 'Result']] + [
+            [
+                attempt['date'].strftime('%Y-%m-%d'),
+                attempt['quiz_title'][:40],
+                attempt['subject'][:25],
+                f"{attempt['score']}/{attempt['max_score']}",
+                f"{attempt['percentage']:.1f}%",
+                'Passed' if attempt['passed'] else 'Failed'
+            ] for attempt in attempts
+        ], align_right_from=3),
+        Spacer(1, 12),
+        Paragraph(f"Generated {data['generated_at'].strftime('%Y-%m-%d %H:%M')} UTC", styles['Italic']),
+    ]
+
+    buffer = io.BytesIO()
+    _document(buffer, f"Quiz Report - {data['name']}").build(story)
+    return buffer.getvalue()
+
+
+def build_quiz_report(data):
+    """Render a quiz class report; data comes from collect_quiz_reports()"""
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = _styles()
+    students = data['students']
+    best_scores = [student['best_percentage'] for student in students]
+    passed = sum(1 for student in students if student['passed'])
+    average = sum(best_scores) / len(best_scores) if best_scores else 0
+
+    # Best score per student in 10-point buckets, 100% counted in the top one
+    distribution = [0] * DISTRIBUTION_BUCKETS
+    for percentage in best_scores:
+        distribution[min(int(percentage // 10), DISTRIBUTION_BUCKETS - 1)] += 1
+
+    story = [
+        Paragraph(f"Class Report - {escape(data['quiz_title'])}", styles['Title']),
+        Paragraph(f"{escape(data['subject'])} / {escape(data['chapter'])} - {escape(data['period_label'])}",
+                  styles['Heading3']),
+        Spacer(1, 8),
+        _table([
+            ['Students', 'Attempts', 'Average Best Score', 'Students Passed'],
+            [len(students), data['attempts'], f'{average:.1f}%', passed],
+        ], align_right_from=0),
+        Spacer(1, 12),
+        Paragraph('Best Score Distribution', styles['Heading2']),
+        _table([['Range', 'Students']] + [
+            [f'{bucket * 10}-{bucket * 10 + 9 if bucket < DISTRIBUTION_BUCKETS - 1 else 100}%', count]
+            for bucket, count in enumerate(distribution)
+        ]),
+        Spacer(1, 12),
+        Paragraph('Students', styles['Heading2']),
+        _table([['Student', 'Username', 'Attempts', 'Best Score', 'Last Attempt', 'Result']] + [
+            [
+                student['name'][:35],
+                student['username'][:25],
+                student['attempts'],
+                f"{student['best_percentage']:.1f}%",
+                student['last_attempt'].strftime('%Y-%m-%d'),
+                'Passed' if student['passed'] else 'Not passed'
+            ] for student in students
+        ], align_right_from=2),
+        Spacer(1, 12),
+        Paragraph(f"Generated {data['generated_at'].strftime('%Y-%m-%d %H:%M')} UTC", styles['Italic']),
+    ]
+
+    buffer = io.BytesIO()
+    _document(buffer, f"Class Report - {data['quiz_title']}").build(story)
+    return buffer.getvalue()
+
+
+REPORT_BUILDERS = {
+    'user': (build_user_report, 'user_id', 'user_{}.pdf'),
+    'quiz': (build_quiz_report, 'quiz_id', 'quiz_{}.pdf'),
+}
+
+
+def render_chunk(kind, reports, output_dir):
+    """Render one chunk of reports to output_dir; runs in a worker process
+
+    Returns the number of files written.
+    """
+    build, key, filename = REPORT_BUILDERS[kind]
+    os.makedirs(output_dir, exist_ok=True)
+    for data in reports:
+        path = os.path.join(output_dir, filename.format(data[key]))
+        with open(path + '.tmp', 'wb') as f:
+            f.write(build(data))
+        os.replace(path + '.tmp', path)
+    return len(reports)
+
+
+def render_report_files(kind, chunks, output_dir, workers=1):
+    """Render chunks of report data to PDF files, in parallel when workers > 1
+
+    chunks may be a generator (each item a list of report dicts); at most
+    two chunks per worker are gathered ahead, so memory stays bounded.
+    Returns the number of files written.
+    """
+    if workers > 1 and multiprocessing.current_process().daemon:
+        # Prefork Celery workers are daemonic and may not start child processes
+        print("[REPORT] Daemonic worker process; rendering PDF reports serially")
+        workers = 1
+    if workers <= 1:
+        return sum(render_chunk(kind, chunk, output_dir) for chunk in chunks)
+
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += sum(future.result() for future in done)
+            pending.add(pool.submit(render_chunk, kind, chunk, output_dir))
+        written += sum(future.result() for future in wait(pending).done)
+    return written
+
+
+def _period_filters(column, start, end):
+    filters = []
+    if start is not None:
+        filters.append(column >= start)
+    if end is not None:
+        filters.append(column < end)
+    return filters
+
+
+def month_range(month):
+    """(start, end) datetimes for a 'YYYY-MM' string; ValueError if malformed"""
+    start = datetime.strptime(month, '%Y-%m')
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def period_label(start, end):
+    if start is None:
+        return 'All time'
+    if end is not None and start.day == 1 and (end - start).days <= 31:
+        return start.strftime('%B %Y')
+    return f"{start:%Y-%m-%d} to {end:%Y-%m-%d}" if end else f"Since {start:%Y-%m-%d}"
+
+
+def collect_user_reports(user_ids, start=None, end=None):
+    """Report data for a chunk of users, from one joined query
+
+    Users without attempts in [start, end) get no report.
+    """
+    from sqlalchemy import select
+    from backend.app.models import User, Score, Quiz, Chapter, Subject
+    from backend.app.database import db
+
+    rows = db.session.execute(select(
+        User.id, User.full_name, User.username, User.email,
+        Quiz.title, Subject.name.label('subject'),
+        Score.score, Score.max_score, Score.percentage, Score.passed, Score.created_at
+    ).join(Score, Score.user_id == User.id).join(
+        Quiz, Quiz.id == Score.quiz_id
+    ).join(
+        Chapter, Chapter.id == Quiz.chapter_id
+    ).join(
+        Subject, Subject.id == Chapter.subject_id
+    ).where(
+        User.id.in_(user_ids), *_period_filters(Score.created_at, start, end)
+    ).order_by(User.id, Score.created_at.desc()))
+
+    generated_at = datetime.utcnow()
+    label = period_label(start, end)
+    reports = {}
+    for row in rows:
+        report = reports.get(row.id)
+        if report is None:
+            report = reports[row.id] = {
+                'user_id': row.id,
+                'name': row.full_name or row.username,
+                'email': row.email,
+                'period_label': label,
+                'generated_at': generated_at,
+                'attempts': []
+            }
+        report['attempts'].append({
+            'quiz_title': row.title,
+            'subject': row.subject,
+            'score': row.score,
+            'max_score': row.max_score,
+            'percentage': row.percentage,
+            'passed': bool(row.passed),
+            'date': row.created_at
+        })
+    return list(reports.values())
+
+
+def collect_quiz_reports(quiz_ids, start=None, end=None):
+    """Class report data for a chunk of quizzes, from one grouped query"""
+    from sqlalchemy import select, func, case
+    from backend.app.models import User, Score, Quiz, Chapter, Subject
+    from backend.app.database import db
+
+    quizzes = {row.id: row for row in db.session.execute(select(
+        Quiz.id, Quiz.title, Chapter.name.label('chapter'), Subject.name.label('subject')
+    ).join(Chapter, Chapter.id == Quiz.chapter_id).join(
+        Subject, Subject.id == Chapter.subject_id
+    ).where(Quiz.id.in_(quiz_ids)))}
+
+    rows = db.session.execute(select(
+        Score.quiz_id, User.id.label('user_id'), User.full_name, User.username,
+        func.count(Score.id).label('attempts'),
+        func.max(Score.percentage).label('best_percentage'),
+        func.max(Score.created_at).label('last_attempt'),
+        func.max(case((Score.passed == True, 1), else_=0)).label('passed')
+    ).join(User, User.id == Score.user_id).where(
+        Score.quiz_id.in_(quiz_ids), *_period_filters(Score.created_at, start, end)
+    ).group_by(
+        Score.quiz_id, User.id, User.full_name, User.username
+    ).order_by(Score.quiz_id, func.max(Score.percentage).desc(), User.id))
+
+    generated_at = datetime.utcnow()
+    label = period_label(start, end)
+    reports = {}
+    for row in rows:
+        report = reports.get(row.quiz_id)
+        if report is None:
+            quiz = quizzes[row.quiz_id]
+            report = reports[row.quiz_id] = {
+                'quiz_id': row.quiz_id,
+                'quiz_title': quiz.title,
+                'chapter': quiz.chapter,
+                'subject': quiz.subject,
+                'period_label': label,
+                'generated_at': generated_at,
+                'attempts': 0,
+                'students': []
+            }
+        report['attempts'] += row.attempts
+        report['students'].append({
+            'name': row.full_name or row.username,
+            'username': row.username,
+            'attempts': row.attempts,
+            'best_percentage': row.best_percentage,
+            'last_attempt': row.last_attempt,
+            'passed': bool(row.passed)
+        })
+    return list(reports.values())
@@ -0,0 +1,180 @@
+"""
+Regrade a quiz's stored scores after its answer key changed.
+
+Scores are read in keyset-paginated chunks (id above the job checkpoint),
+decoded into a response matrix and graded against the compiled key
+(``RegradeKey``, over all of the quiz's questions) in one vectorized
+comparison, using the rules every submit route grades with
+(utils/grading.py). Each row is only graded on the questions it was
+submitted against, so questions added or deactivated later never change
+it: a packed row on its answer layout's questions, whose current points
+give its max_score; a JSON row on the questions it answered that were in
+the quiz at the time, keeping its stored max_score. Only rows whose
+score, max_score, percentage or passed actually change are written, as
+one executemany UPDATE per chunk, committed together with the job
+checkpoint.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from backend.app.utils.item_analysis import AnswerKey
+
+
+class RegradeKey(AnswerKey):
+    """AnswerKey over all of a quiz's questions, with when each one was in the quiz"""
+
+    def __init__(self, questions):
+        super().__init__(questions)
+        self.created_at = [question.created_at for question in questions]
+        # A deactivated question was deactivated by its last update at the latest
+        self.retired_at = [None if question.is_active else question.updated_at for question in questions]
+        self._layout_masks = {}
+
+    def _in_quiz(self, column, at):
+        created_at, retired_at = self.created_at[column], self.retired_at[column]
+        return (created_at is None or created_at <= at) and (retired_at is None or retired_at > at)
+
+    def graded_mask(self, rows):
+        """(mask of the questions each row was graded on, whether that set is exact)
+
+        A packed row was graded on its answer layout, the quiz's active
+        questions when it was submitted. For a JSON row only the questions it
+        answered are known, less any that were not in the quiz at the time.
+        """
+        from backend.app.models import AnswerLayout, Score
+
+        mask = np.zeros((len(rows), len(self.question_ids)), dtype=bool)
+        exact = np.zeros(len(rows), dtype=bool)
+        for index, row in enumerate(rows):
+            if row.answers_packed is not None and row.answer_layout_id is not None:
+                layout_mask = self._layout_masks.get(row.answer_layout_id)
+                if layout_mask is None:
+                    codec = AnswerLayout.codec(row.answer_layout_id)
+                    layout_mask = self._layout_masks[row.answer_layout_id] = np.array(
+                        [codec.column(question_id) is not None for question_id in self.question_ids], dtype=bool
+                    )
+                mask[index] = layout_mask
+                exact[index] = True
+            else:
+                for question_id in Score.parse_answers(row.answers):
+                    column = self._columns.get(str(question_id))
+                    if column is not None and self._in_quiz(column, row.created_at):
+                        mask[index, column] = True
+        return mask, exact
+
+
+def grade_chunk(key, passing_score, rows):
+    """New (score, max_score, percentage, passed) for rows of (id, answers, answers_packed, ...)
+
+    key is a RegradeKey.
+
+    Returns the update parameter dicts for the rows whose values change.
+    """
+    from backend.app.utils.grading import score_percentage, score_passed
+
+    if not rows:
+        return []
+    graded, exact = key.graded_mask(rows)
+    correct, _ = key.grade(key.score_matrix(rows))
+    earned = ((correct * graded) @ key.points).astype(np.int64)
+
+    old_score = np.array([row.score for row in rows], dtype=np.int64)
+    old_max = np.array([row.max_score for row in rows], dtype=np.int64)
+    max_score = np.where(exact, (graded @ key.points).astype(np.int64), old_max)
+    percentage = score_percentage(earned, max_score)
+    passed = score_passed(percentage, passing_score)
+
+    old_percentage = np.array([row.percentage for row in rows], dtype=np.float64)
+    old_passed = np.array([bool(row.passed) for row in rows])
+    changed = np.flatnonzero(
+        (old_score != earned) | (old_max != max_score) | ~np.isclose(old_percentage, percentage) | (old_passed != passed)
+    )
+    return [{
+        'id': rows[i].id,
+        'score': int(earned[i]),
+        'max_score': int(max_score[i]),
+        'percentage': float(percentage[i]),
+        'passed': bool(passed[i])
+    } for i in changed]
+
+
+def run_regrade(job, chunk_size=2000, on_progress=None):
+    """Regrade job's quiz from its checkpoint to the end; returns the job
+
+    on_progress(job) is called after every committed chunk. The caller must
+    have claimed the job (RegradeJob.claim).
+    """
+    from sqlalchemy import select, update, func
+    from backend.app.models import Quiz, Score, RegradeJob
+    from backend.app.database import db
+    from backend.app.utils.item_analysis import quiz_questions
+
+    quiz = db.session.get(Quiz, job.quiz_id)
+    key = RegradeKey(quiz_questions(job.quiz_id))
+
+    if job.key_version != key.version:
+        # First run, or the key changed again since the last checkpoint
+        job.key_version = key.version
+        job.last_score_id = 0
+        job.processed = 0
+        job.changed = 0
+    job.status = 'running'
+    job.started_at = job.started_at or datetime.utcnow()
+    job.updated_at = datetime.utcnow()
+    job.total_scores = db.session.scalar(select(func.count(Score.id)).where(Score.quiz_id == job.quiz_id))
+    db.session.commit()
+
+    def restart(current):
+        job.key_version = current.version
+        job.last_score_id = 0
+        job.processed = 0
+        job.changed = 0
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+        return current
+
+    while True:
+        rows = db.session.execute(select(
+            Score.id, Score.answers, Score.answers_packed, Score.answer_layout_id,
+            Score.score, Score.max_score, Score.percentage, Score.passed, Score.created_at
+        ).where(
+            Score.quiz_id == job.quiz_id, Score.id > job.last_score_id
+        ).order_by(Score.id).limit(chunk_size)).all()
+        if not rows:
+            # The key may have changed since the last chunk's check
+            current = RegradeKey(quiz_questions(job.quiz_id))
+            if current.version != key.version:
+                key = restart(current)
+                continue
+            # Completes only if nobody re-requested the job after that check (request()
+            # clears key_version); otherwise check the key again
+            now = datetime.utcnow()
+            completed = db.session.execute(update(RegradeJob).where(
+                RegradeJob.id == job.id, RegradeJob.key_version == key.version
+            ).values(status='completed', error=None, finished_at=now, updated_at=now)).rowcount == 1
+            db.session.commit()
+            if completed:
+                break
+            job.key_version = key.version
+            db.session.commit()
+            continue
+
+        updates = grade_chunk(key, quiz.passing_score, rows)
+        if updates:
+            db.session.execute(update(Score), updates)
+
+        job.last_score_id = rows[-1].id
+        job.processed += len(rows)
+        job.changed += len(updates)
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+        if on_progress:
+            on_progress(job)
+
+        # Another edit to the quiz's questions restarts the job with the new key
+        current = RegradeKey(quiz_questions(job.quiz_id))
+        if current.version != key.version:
+            key = restart(current)
+
+    return job
@@ -0,0 +1,108 @@
+"""
+Spread monthly report delivery over a window instead of one burst.
+
+Time after the month closes (00:00 UTC on the 1st) is cut into slots of
+``MONTHLY_REPORT_TICK_MINUTES``, and every user is given a slot:
+
+- ``hash`` mode: a stable hash of the user id picks one slot inside the
+  window that opens ``MONTHLY_REPORT_WINDOW_START_HOUR`` hours into the 1st
+  and lasts ``MONTHLY_REPORT_WINDOW_HOURS``.
+- ``timezone`` mode: the slot of ``MONTHLY_REPORT_LOCAL_HOUR`` on the 1st in
+  the user's time zone, plus up to ``MONTHLY_REPORT_JITTER_MINUTES`` of
+  hash jitter. Users without a valid time zone fall back to hash mode, and
+  zones that reach that hour before the month closes in UTC get slot 0.
+
+The slot is also available as a SQL expression, so the due users can be
+selected and ordered in the database.
+"""
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import case
+
+# Knuth multiplicative hash; spreads consecutive ids evenly over the slots
+HASH_MULTIPLIER = 2654435761
+HASH_MODULUS = 2 ** 32
+
+
+def is_valid_timezone(name):
+    """Check that name is an IANA time zone such as 'Asia/Kolkata'"""
+    if not name or not isinstance(name, str):
+        return False
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+def monthly_report_period(now):
+    """(first day of the reported month, 00:00 UTC on the 1st when it closed)"""
+    send_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_start = (send_start - timedelta(days=1)).replace(day=1)
+    return period_start, send_start
+
+
+class ReportSchedule:
+    """Maps users to delivery slots after the reported month has closed"""
+
+    def __init__(self, mode='hash', window_start_hour=9, window_hours=12, local_hour=9,
+                 jitter_minutes=60, tick_minutes=5):
+        self.mode = mode
+        self.tick_minutes = max(1, tick_minutes)
+        self.window_start_slot = window_start_hour * 60 // self.tick_minutes
+        self.window_slots = max(1, window_hours * 60 // self.tick_minutes)
+        self.local_hour = local_hour
+        self.jitter_slots = max(1, jitter_minutes // self.tick_minutes)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            mode=config.get('MONTHLY_REPORT_SCHEDULE', 'hash'),
+            window_start_hour=int(config.get('MONTHLY_REPORT_WINDOW_START_HOUR', 9)),
+            window_hours=int(config.get('MONTHLY_REPORT_WINDOW_HOURS', 12)),
+            local_hour=int(config.get('MONTHLY_REPORT_LOCAL_HOUR', 9)),
+            jitter_minutes=int(config.get('MONTHLY_REPORT_JITTER_MINUTES', 60)),
+            tick_minutes=int(config.get('MONTHLY_REPORT_TICK_MINUTES', 5))
+        )
+
+    def current_slot(self, now, send_start):
+        """The last slot that is due at now; negative before the month closes"""
+        return int((now - send_start).total_seconds() // (self.tick_minutes * 60))
+
+    def timezone_slot(self, name, send_start):
+        """Slot of the local delivery hour on the 1st in zone name (None if invalid)"""
+        if not is_valid_timezone(name):
+            return None
+        local = datetime(send_start.year, send_start.month, 1, self.local_hour, tzinfo=ZoneInfo(name))
+        utc = local.astimezone(ZoneInfo('UTC')).replace(tzinfo=None)
+        return max(0, self.current_slot(utc, send_start))
+
+    def slot_for(self, user_id, timezone, send_start):
+        """Delivery slot for one user"""
+        user_hash = (user_id * HASH_MULTIPLIER) % HASH_MODULUS
+        if self.mode == 'timezone':
+            base = self.timezone_slot(timezone, send_start)
+            if base is not None:
+                return base + user_hash % self.jitter_slots
+        return self.window_start_slot + user_hash % self.window_slots
+
+    def slot_expression(self, user_id_column, timezone_column, timezones, send_start):
+        """SQL expression computing slot_for() for each row
+
+        timezones are the distinct zone names in use; each valid one becomes a
+        branch of a CASE, everything else gets the hash slot.
+        """
+        user_hash = (user_id_column * HASH_MULTIPLIER) % HASH_MODULUS
+        hash_slot = self.window_start_slot + user_hash % self.window_slots
+        if self.mode != 'timezone':
+            return hash_slot
+
+        jitter = user_hash % self.jitter_slots
+        zone_slots = {}
+        for name in timezones:
+            base = self.timezone_slot(name, send_start)
+            if base is not None:
+                zone_slots[name] = base + jitter
+        if not zone_slots:
+            return hash_slot
+        return case(zone_slots, value=timezone_column, else_=hash_slot)
@@ -0,0 +1,128 @@
+"""
+Slow-query log with EXPLAIN capture.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with their
+parameters, the endpoint or task that issued them and the application code
+line they came from. The query plan is captured on a background thread so
+the slow request is not delayed further. The latest entries are kept in a
+ring buffer that admins read through ``/api/admin/slow-queries``.
+Durations come from the sql_stats timing hooks, so statements are timed once.
+"""
+import logging
+import os
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MAX_PARAMS_LENGTH = 500
+
+_settings = {'threshold': 0.2, 'explain': True}
+_entries = deque(maxlen=200)
+_lock = threading.Lock()
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+_explain_thread = threading.local()
+
+
+def _stack_site():
+    """First application frame outside the instrumentation that ran the query"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(BACKEND_DIR) and not filename.startswith(UTILS_DIR):
+            return f'{os.path.relpath(filename, BACKEND_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def _origin():
+    """Endpoint of the current request, or the label of the running task"""
+    if has_request_context():
+        return f'{request.method} {request.path} ({request.endpoint})'
+    from backend.app.utils.sql_stats import current_stats
+    stats = current_stats()
+    return stats.label if stats else None
+
+
+def _explain_prefix(dialect_name):
+    return 'EXPLAIN QUERY PLAN ' if dialect_name == 'sqlite' else 'EXPLAIN '
+
+
+def _capture_explain(engine, statement, parameters, entry):
+    """Run EXPLAIN for a slow statement and attach the plan to its log entry"""
+    _explain_thread.active = True
+    try:
+        with engine.connect() as conn:
+            result = conn.exec_driver_sql(
+                _explain_prefix(engine.dialect.name) + statement,
+                parameters
+            )
+            entry['explain'] = [' | '.join(str(col) for col in row) for row in result]
+    except Exception as e:
+        entry['explain_error'] = str(e)
+    finally:
+        _explain_thread.active = False
+
+
+def _record_duration(conn, statement, parameters, executemany, duration):
+    """sql_stats duration listener: log the statement if it was slow"""
+    threshold = _settings['threshold']
+    if not threshold or duration < threshold or getattr(_explain_thread, 'active', False):
+        return
+
+    entry = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'duration_ms': round(duration * 1000, 2),
+        'statement': statement,
+        'parameters': repr(parameters)[:MAX_PARAMS_LENGTH],
+        'executemany': executemany,
+        'origin': _origin(),
+        'stack_site': _stack_site(),
+        'explain': None
+    }
+    with _lock:
+        _entries.append(entry)
+
+    logger.warning(
+        "[SLOW QUERY] %.2f ms from %s at %s: %s %s",
+        entry['duration_ms'], entry['origin'], entry['stack_site'], statement, entry['parameters']
+    )
+
+    # Only plain reads are explained; writes and batches are logged as-is
+    if _settings['explain'] and not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        _explain_executor.submit(_capture_explain, conn.engine, statement, parameters, entry)
+
+
+def get_slow_queries(limit=None):
+    """Newest slow-query entries first"""
+    with _lock:
+        entries = list(reversed(_entries))
+    return entries[:limit] if limit else entries
+
+
+def clear_slow_queries():
+    with _lock:
+        count = len(_entries)
+        _entries.clear()
+    return count
+
+
+def init_slow_query_log(app):
+    """Configure the threshold and subscribe to the sql_stats statement timings"""
+    global _entries
+
+    _settings['threshold'] = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+    _settings['explain'] = app.config.get('SLOW_QUERY_EXPLAIN', True)
+    size = app.config.get('SLOW_QUERY_LOG_SIZE', 200)
+    if _entries.maxlen != size:
+        with _lock:
+            _entries = deque(_entries, maxlen=size)
+
+    if _settings['threshold']:
+        from backend.app.utils.sql_stats import add_duration_listener
+        add_duration_listener(_record_duration)
@@ -0,0 +1,205 @@
+"""
+Per-request and per-task SQL instrumentation.
+
+Engine events count every statement and its duration into the stats object of
+the current request or Celery task. The same statement executed repeatedly
+with different parameters is reported as an N+1 pattern. Totals are exposed
+in the ``Server-Timing`` response header and the ``backend.app.utils.sql_stats``
+debug log. With ``SQL_STRICT_MODE`` on (meant for tests) a request that goes
+over ``SQL_MAX_QUERIES_PER_REQUEST`` or triggers the N+1 detector fails.
+
+These are the only cursor timing hooks; other consumers of statement
+durations (the slow-query log) register with add_duration_listener().
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Distinct parameter sets remembered per statement, enough to spot N+1 loops
+MAX_TRACKED_PARAMS = 50
+
+_current_stats = ContextVar('sql_stats', default=None)
+_duration_listeners = []
+_listeners_installed = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request or block issues too many queries"""
+
+
+class QueryStats:
+    """Query count, DB time and per-statement repeats for one unit of work"""
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = {}  # statement -> [executions, set of parameter reprs]
+
+    def record(self, statement, parameters, duration):
+        self.count += 1
+        self.total_time += duration
+        entry = self.statements.setdefault(statement, [0, set()])
+        entry[0] += 1
+        if len(entry[1]) < MAX_TRACKED_PARAMS:
+            entry[1].add(repr(parameters))
+
+    def n_plus_one(self, threshold):
+        """Statements repeated at least ``threshold`` times with different parameters"""
+        return [
+            {'statement': statement, 'executions': executions, 'distinct_params': len(params)}
+            for statement, (executions, params) in self.statements.items()
+            if executions >= threshold and len(params) > 1
+        ]
+
+    @property
+    def total_ms(self):
+        return self.total_time * 1000
+
+    def server_timing(self):
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+    def summary(self, threshold):
+        return {
+            'label': self.label,
+            'queries': self.count,
+            'db_time_ms': round(self.total_ms, 2),
+            'n_plus_one': self.n_plus_one(threshold)
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, not the pooled connection, so a
+    # statement that raises (and never reaches after_cursor_execute) leaves nothing behind
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, '_query_start_time', None)
+    if start_time is None:
+        return
+    duration = time.perf_counter() - start_time
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters, duration)
+
+    for listener in _duration_listeners:
+        listener(conn, statement, parameters, executemany, duration)
+
+
+def add_duration_listener(listener):
+    """Call listener(conn, statement, parameters, executemany, duration) after every statement"""
+    if listener not in _duration_listeners:
+        _duration_listeners.append(listener)
+    install_listeners()
+
+
+def install_listeners():
+    """Attach the timing hooks to every engine (idempotent)"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listeners_installed = True
+
+
+def current_stats():
+    """Stats of the request or task currently running, if any"""
+    return _current_stats.get()
+
+
+def _report(stats, threshold):
+    n_plus_one = stats.n_plus_one(threshold)
+    logger.debug(
+        "[SQL] %s: %d queries in %.2f ms", stats.label, stats.count, stats.total_ms
+    )
+    for pattern in n_plus_one:
+        logger.debug(
+            "[SQL] N+1 in %s: %d executions (%d distinct params) of %s",
+            stats.label, pattern['executions'], pattern['distinct_params'], pattern['statement']
+        )
+    return n_plus_one
+
+
+def _check_budget(stats, max_queries, threshold):
+    n_plus_one = stats.n_plus_one(threshold)
+    if max_queries is not None and stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{stats.label} issued {stats.count} queries (limit {max_queries})"
+        )
+    if n_plus_one:
+        raise QueryBudgetExceeded(
+            f"{stats.label} has N+1 query patterns: {[p['statement'] for p in n_plus_one]}"
+        )
+
+
+@contextmanager
+def track_queries(label='block', max_queries=None, n_plus_one_threshold=5, strict=False):
+    """Collect query stats for a block; in strict mode fail when over budget"""
+    install_listeners()
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+    _report(stats, n_plus_one_threshold)
+    if strict:
+        _check_budget(stats, max_queries, n_plus_one_threshold)
+
+
+def init_sql_stats(app):
+    """Register request hooks that collect and expose per-request SQL stats"""
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+
+    install_listeners()
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    strict = app.config.get('SQL_STRICT_MODE', False)
+    max_queries = app.config.get('SQL_MAX_QUERIES_PER_REQUEST', 50)
+
+    @app.before_request
+    def start_sql_stats():
+        _current_stats.set(QueryStats(f'{request.method} {request.path}'))
+
+    @app.after_request
+    def expose_sql_stats(response):
+        stats = _current_stats.get()
+        if stats is None:
+            return response
+        _report(stats, threshold)
+        response.headers.add('Server-Timing', stats.server_timing())
+        if strict:
+            _check_budget(stats, max_queries, threshold)
+        return response
+
+    @app.teardown_request
+    def clear_sql_stats(exc):
+        _current_stats.set(None)
+
+
+def connect_celery_signals(n_plus_one_threshold=5):
+    """Collect per-task SQL stats in Celery workers"""
+    from celery.signals import task_prerun, task_postrun
+
+    install_listeners()
+
+    @task_prerun.connect(weak=False)
+    def start_task_stats(task_id=None, task=None, **kwargs):
+        _current_stats.set(QueryStats(f'task {task.name}'))
+
+    @task_postrun.connect(weak=False)
+    def report_task_stats(task_id=None, task=None, **kwargs):
+        stats = _current_stats.get()
+        if stats is not None:
+            _report(stats, n_plus_one_threshold)
+            _current_stats.set(None)
@@ -0,0 +1,43 @@
+"""
+Startup phase timings for create_app().
+
+Every app records how long each init phase took in
+``app.extensions['startup_timings']``. Set ``STARTUP_PROFILE=true`` to print
+the report at boot, or run ``benchmarks/profile_startup.py`` for the full
+import-time tree as well.
+"""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Collect wall-clock timings of named init phases"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started_at
+
+    def to_dict(self):
+        return {
+            'phases': [{'name': name, 'ms': round(duration * 1000, 2)} for name, duration in self.phases],
+            'total_ms': round(self.total * 1000, 2)
+        }
+
+    def report(self):
+        lines = ['[STARTUP] create_app phase timings']
+        for name, duration in self.phases:
+            lines.append(f'  {name:<24} {duration * 1000:9.2f} ms')
+        lines.append(f'  {"total":<24} {self.total * 1000:9.2f} ms')
+        return '\n'.join(lines)
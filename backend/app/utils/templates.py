@@ -0,0 +1,66 @@
+"""
+Compiled template registry for email and report templates.
+
+Templates live in ``app/templates`` and are compiled once per process, then
+served from the Jinja environment's cache, instead of being parsed from a
+string for every email. Set ``TEMPLATE_BYTECODE_CACHE_DIR`` to also keep the
+compiled bytecode on disk so new worker processes skip compilation, and
+``TEMPLATE_AUTO_RELOAD=true`` in development to pick up edited files.
+Rendering needs no app context, so it is safe on mailer render threads.
+"""
+import os
+import threading
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+_environment = None
+_environment_pid = None
+_environment_lock = threading.Lock()
+
+
+def create_template_environment(bytecode_cache_dir='', auto_reload=False, cache_size=400):
+    """Build a Jinja environment over app/templates"""
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(['html']),
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload,
+        cache_size=cache_size
+    )
+
+
+def get_template_environment():
+    """Get the process-wide template environment, built from the config on first use"""
+    global _environment, _environment_pid
+
+    with _environment_lock:
+        if _environment is None or _environment_pid != os.getpid():
+            from flask import current_app, has_app_context
+            if has_app_context():
+                config = current_app.config
+            else:
+                from backend.config import Config
+                config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+            _environment = create_template_environment(
+                bytecode_cache_dir=config.get('TEMPLATE_BYTECODE_CACHE_DIR', ''),
+                auto_reload=config.get('TEMPLATE_AUTO_RELOAD', False)
+            )
+            _environment_pid = os.getpid()
+
+    return _environment
+
+
+def get_template(name):
+    """Get a compiled template by path relative to app/templates"""
+    return get_template_environment().get_template(name)
+
+
+def render_template(name, **context):
+    """Render a registry template, e.g. render_template('email/monthly_report.html', ...)"""
+    return get_template(name).render(**context)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streamed admin user export vs the buffered JSON export.
+
+Seeds a scratch SQLite database with USERS users and calls both endpoints
+through the Flask test client, reporting time to first byte, total time and
+peak Python memory (tracemalloc, on a separate run since tracing is slow):
+
+  1. POST /api/admin/users/export      - the whole CSV as a nested JSON list
+  2. GET  /api/admin/users/export.csv  - streamed text/csv
+  3. GET  /api/admin/users/export.csv?gzip=true
+
+    python benchmarks/bench_admin_user_export.py [users]
+"""
+
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from flask_jwt_extended import create_access_token
+from backend.config import Config
+from backend.app import create_app
+from backend.app.database import db
+from backend.app.models import User
+
+def seed(users):
+    for start in range(0, users, 50000):
+        db.session.execute(insert(User), [{
+            'username': f'user{i}',
+            'email': f'user{i}@bench.local',
+            'password_hash': 'x',
+            'full_name': f'User {i}',
+            'qualification': 'B.Sc',
+            'is_active': i % 10 != 0,
+            'last_login': datetime(2026, 1, 1) if i % 2 else None
+        } for i in range(start, min(start + 50000, users))])
+    db.session.commit()
+
+def download(client, method, url, headers):
+    """(seconds to first chunk, total seconds, bytes)"""
+    start = time.perf_counter()
+    response = client.open(url, method=method, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks, b''))
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    response.close()
+    return first_byte, time.perf_counter() - start, size
+
+def traced_peak(client, method, url, headers):
+    tracemalloc.start()
+    download(client, method, url, headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def run_benchmark(users=100000):
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'AUTO_CREATE_SCHEMA': True,
+        'SQL_INSTRUMENTATION': False,
+        'RATELIMIT_ENABLED': False
+    })
+    app = create_app(config_class)
+
+    with app.app_context():
+        seed(users)
+        token = create_access_token(identity=app.config['ADMIN_EMAIL'],
+                                    additional_claims={'role': 'admin', 'admin_id': 1})
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    print(f"Admin user export ({users} users)")
+    print("=" * 78)
+    for label, method, url in (
+        ('Buffered JSON (old)', 'POST', '/api/admin/users/export'),
+        ('Streamed CSV', 'GET', '/api/admin/users/export.csv'),
+        ('Streamed CSV, gzip', 'GET', '/api/admin/users/export.csv?gzip=true'),
+    ):
+        first_byte, total, size = download(client, method, url, headers)
+        peak = traced_peak(client, method, url, headers)
+        print(f"{label:<22} first byte {first_byte * 1000:8.1f} ms  total {total:6.2f} s  "
+              f"{size / 1024 / 1024:6.1f} MiB  peak {peak:7.1f} MiB")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark: submit latency under leaderboard load, with and without admission control.
+
+Seeds a scratch SQLite database with USERS users holding SCORES past
+scores, so the live global leaderboard is an expensive aggregate. Then
+STUDENTS threads each submit SUBMITS quiz attempts while BROWSERS threads
+keep reloading the leaderboard and their dashboard (low priority). Runs
+once without and once with admission control, and reports:
+
+  1. submit throughput and p50 / p99 latency
+  2. low priority requests answered fresh, stale or with a 503
+  3. the admission counters (/api/admin/admission/stats)
+
+    python benchmarks/bench_admission.py [students] [browsers] [submits] [scores]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from flask_jwt_extended import create_access_token
+from backend.config import Config
+from backend.app import create_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Question, Score
+
+QUESTIONS = 20
+USERS = 2000
+THINK_TIME = 0.1  # seconds a browser waits between page loads
+
+def seed(scores):
+    """One open quiz, USERS users and scores past attempts; returns (quiz id, question ids, user ids)"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    subject = Subject(name='Benchmark', code='BENCH')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quiz = Quiz(title='Benchmark', chapter_id=chapter.id, start_date=now - timedelta(hours=1),
+                end_date=now + timedelta(hours=1))
+    db.session.add(quiz)
+    db.session.flush()
+    question_ids = []
+    for i in range(QUESTIONS):
+        question = Question(quiz_id=quiz.id, question_text=f'Question {i}', correct_answer=str(i % 4), order=i)
+        question.set_options(['A', 'B', 'C', 'D'])
+        db.session.add(question)
+        db.session.flush()
+        question_ids.append(question.id)
+    db.session.execute(insert(User), [{
+        'username': f'student{i}', 'email': f'student{i}@bench.local', 'password_hash': 'x', 'full_name': f'Student {i}'
+    } for i in range(USERS)])
+    user_ids = db.session.scalars(select(User.id).order_by(User.id)).all()
+    for start in range(0, scores, 50000):
+        rows = []
+        for _ in range(start, min(start + 50000, scores)):
+            earned = rng.randrange(QUESTIONS + 1)
+            rows.append({
+                'user_id': rng.choice(user_ids), 'quiz_id': quiz.id, 'score': earned, 'max_score': QUESTIONS,
+                'percentage': earned * 100 / QUESTIONS, 'passed': earned * 100 / QUESTIONS >= 60,
+                'started_at': now, 'completed_at': now, 'created_at': now, 'answers': '{}'
+            })
+        db.session.execute(insert(Score), rows)
+    db.session.commit()
+    return quiz.id, question_ids, user_ids
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+def run_mode(admission_control, students, browsers, submits, scores):
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'AUTO_CREATE_SCHEMA': True,
+        'SQL_INSTRUMENTATION': False,
+        'SLOW_QUERY_THRESHOLD_MS': 0,
+        'RATELIMIT_ENABLED': False,
+        'ADMISSION_CONTROL_ENABLED': admission_control
+    })
+    app = create_app(config_class)
+
+    with app.app_context():
+        quiz_id, question_ids, user_ids = seed(scores)
+        headers = [{'Authorization': 'Bearer ' + create_access_token(
+            identity=f'student{i}@bench.local', additional_claims={'role': 'user', 'user_id': user_ids[i]}
+        )} for i in range(students + browsers)]
+        admin_headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=app.config['ADMIN_EMAIL'], additional_claims={'role': 'admin', 'admin_id': 1}
+        )}
+
+    latencies = []
+    low_results = {'fresh': 0, 'stale': 0, 'shed': 0}
+    submitting = threading.Event()
+    submitting.set()
+    start_line = threading.Barrier(students + browsers + 1)
+
+    def student(index):
+        rng = random.Random(index)
+        client = app.test_client()
+        start_line.wait()
+        for _ in range(submits):
+            answers = {str(question_id): str(rng.randrange(4)) for question_id in question_ids}
+            started = time.perf_counter()
+            client.post(f'/api/quiz/{quiz_id}/submit', json={'answers': answers}, headers=headers[index])
+            latencies.append(time.perf_counter() - started)
+
+    def browser(index):
+        client = app.test_client()
+        start_line.wait()
+        while submitting.is_set():
+            for url in ('/api/leaderboard', '/api/user/dashboard/stats'):
+                response = client.get(url, headers=headers[index])
+                admission = response.headers.get('X-Admission')
+                low_results['shed' if admission == 'shed' else 'stale' if admission == 'stale' else 'fresh'] += 1
+                time.sleep(THINK_TIME)
+
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(students)]
+    browser_threads = [threading.Thread(target=browser, args=(students + i,)) for i in range(browsers)]
+    for thread in threads + browser_threads:
+        thread.start()
+    start_line.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    submitting.clear()
+    for thread in browser_threads:
+        thread.join()
+
+    stats = app.test_client().get('/api/admin/admission/stats', headers=admin_headers).get_json()
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'low': low_results,
+        'stats': stats if stats.get('enabled') else None
+    }
+
+def run_benchmark(students=16, browsers=16, submits=10, scores=100000):
+    results = [(label, run_mode(enabled, students, browsers, submits, scores))
+               for label, enabled in (('No admission control', False), ('Admission control', True))]
+
+    print(f"Submits under leaderboard load ({students} students x {submits} submits, "
+          f"{browsers} browsers, {scores} past scores)")
+    print("=" * 60)
+    for label, result in results:
+        low = result['low']
+        print(f"{label}:")
+        print(f"  Submit throughput: {result['throughput']:8.1f} submits/s")
+        print(f"  Submit p50/p99:    {result['p50']:8.1f} / {result['p99']:.1f} ms")
+        print(f"  Low priority:      {low['fresh']} fresh, {low['stale']} stale, {low['shed']} shed (503)")
+        if result['stats']:
+            for name, counters in result['stats']['classes'].items():
+                print(f"  {name:<9} admitted {counters['admitted']:6d}  shed {counters['shed']:6d}  "
+                      f"peak in flight {counters['peak_in_flight']:3d}  p99 {counters['latency_p99_ms']} ms")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 16,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 10,
+        int(sys.argv[4]) if len(sys.argv) > 4 else 100000
+    )
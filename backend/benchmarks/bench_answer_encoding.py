@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: packed binary answers vs JSON text answers.
+
+Seeds a scratch SQLite database with SCORES legacy JSON scores of one quiz
+with QUESTIONS questions, converts them with pack_legacy_answers(), and
+reports:
+
+  1. storage: answer bytes as JSON text vs packed, and the database file
+     size after VACUUM
+  2. decode time for every score, both ways:
+     - to answer dictionaries (Score.parse_answers)
+     - to a graded response matrix (AnswerKey.score_matrix, used by
+       item analysis and regrades)
+
+Decoded maps must be identical.
+
+    python benchmarks/bench_answer_encoding.py [scores] [questions]
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, text
+from backend.config import Config
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Question, Score
+from backend.app.utils.answer_encoding import pack_legacy_answers, storage_stats
+from backend.app.utils.item_analysis import AnswerKey, active_questions
+
+def seed(scores, questions, now):
+    """Bulk-load one quiz with many JSON-encoded attempts"""
+    rng = random.Random(42)
+    subject = Subject(name='Benchmark', code='BENCH')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quiz = Quiz(title='Benchmark', chapter_id=chapter.id, start_date=now - timedelta(days=30), end_date=now)
+    db.session.add(quiz)
+    db.session.flush()
+    question_ids = []
+    for i in range(questions):
+        question = Question(quiz_id=quiz.id, question_text=f'Question {i}', correct_answer=str(i % 4), order=i)
+        question.set_options(['A', 'B', 'C', 'D'])
+        db.session.add(question)
+        db.session.flush()
+        question_ids.append(question.id)
+    user = User(username='bench', email='bench@bench.local', password_hash='x', full_name='Bench')
+    db.session.add(user)
+    db.session.flush()
+
+    for start in range(0, scores, 50000):
+        db.session.execute(insert(Score), [{
+            'user_id': user.id, 'quiz_id': quiz.id, 'score': 0, 'max_score': questions, 'percentage': 0.0,
+            'passed': False, 'started_at': now, 'completed_at': now, 'created_at': now,
+            'answers': json.dumps({str(question_id): str(rng.randrange(4))
+                                   for question_id in question_ids if rng.random() > 0.05})
+        } for _ in range(start, min(start + 50000, scores))])
+    db.session.commit()
+    return quiz.id
+
+def load_rows(quiz_id):
+    return db.session.execute(select(
+        Score.id, Score.answers, Score.answers_packed, Score.answer_layout_id
+    ).where(Score.quiz_id == quiz_id).order_by(Score.id)).all()
+
+def decode_times(rows, key):
+    started = time.perf_counter()
+    maps = [Score.parse_answers(row.answers, row.answers_packed, row.answer_layout_id) for row in rows]
+    to_dicts = time.perf_counter() - started
+
+    started = time.perf_counter()
+    key.score_matrix(rows)
+    to_matrix = time.perf_counter() - started
+    return maps, to_dicts, to_matrix
+
+def database_size(path):
+    db.session.commit()
+    with db.engine.connect() as conn:
+        conn.execution_options(isolation_level='AUTOCOMMIT').execute(text('VACUUM'))
+    return os.path.getsize(path) / 1024 / 1024
+
+def run_benchmark(scores=200000, questions=20):
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'bench.db')
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SLOW_QUERY_THRESHOLD_MS': 0
+    })
+    app = create_worker_app(config_class)
+
+    with app.app_context():
+        db.create_all()
+        quiz_id = seed(scores, questions, datetime.utcnow())
+        key = AnswerKey(active_questions(quiz_id))
+
+        json_stats = storage_stats()
+        json_size = database_size(path)
+        json_maps, json_dicts, json_matrix = decode_times(load_rows(quiz_id), key)
+
+        started = time.perf_counter()
+        summary = pack_legacy_answers(batch_size=5000)
+        convert_time = time.perf_counter() - started
+
+        packed_stats = storage_stats()
+        packed_size = database_size(path)
+        packed_maps, packed_dicts, packed_matrix = decode_times(load_rows(quiz_id), key)
+
+    print(f"Answer encoding ({scores} scores x {questions} questions)")
+    print("=" * 60)
+    print(f"Answer bytes, JSON:         {json_stats['json_bytes'] / 1024 / 1024:8.1f} MiB")
+    print(f"Answer bytes, packed:       {packed_stats['packed_bytes'] / 1024 / 1024:8.1f} MiB  "
+          f"({summary['packed']} packed, {summary['kept_json']} kept JSON)")
+    print(f"Database file (VACUUM):     {json_size:8.1f} MiB -> {packed_size:.1f} MiB")
+    print(f"Conversion:                 {convert_time:8.2f} s")
+    print(f"Decode to dicts, JSON:      {json_dicts:8.2f} s")
+    print(f"Decode to dicts, packed:    {packed_dicts:8.2f} s  ({json_dicts / packed_dicts:.1f}x)")
+    print(f"Response matrix, JSON:      {json_matrix:8.2f} s")
+    print(f"Response matrix, packed:    {packed_matrix:8.2f} s  ({json_matrix / packed_matrix:.1f}x)")
+    print(f"Decoded maps identical:     {json_maps == packed_maps}")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    )
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: daily reminder generation at scale.
+
+Seeds a scratch SQLite database with USERS users, QUIZZES open quizzes (a
+few of them created today) and a sprinkling of attempts, then times the
+set-based create_daily_reminders() plus the new-quiz broadcasts. The old
+per-user loop issued 2 + quizzes queries per user (activity count, quiz
+list, one attempt count per quiz) plus the existing-reminder lookups; its
+query count is printed for comparison and its run time is extrapolated
+from a small sample.
+
+    python benchmarks/bench_daily_reminders.py [users] [quizzes]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from backend.config import Config
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Score
+from backend.app.utils.sql_stats import track_queries
+
+LEGACY_SAMPLE_USERS = 200
+
+def seed(users, quizzes, now):
+    """Bulk-load users, quizzes and attempts"""
+    rng = random.Random(42)
+    subject = Subject(name='Benchmark', code='BENCH')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+
+    db.session.execute(insert(Quiz), [{
+        'title': f'Quiz {i}',
+        'slug': f'quiz-{i}',
+        'chapter_id': chapter.id,
+        'start_date': now - timedelta(days=7),
+        'end_date': now + timedelta(days=7),
+        'max_attempts': rng.choice([1, 2, 3]),
+        'is_active': True,
+        # ~2% of quizzes are new today
+        'created_at': now - timedelta(hours=2 if i % 50 == 0 else 72)
+    } for i in range(quizzes)])
+
+    db.session.execute(insert(User), [{
+        'username': f'user{i}',
+        'email': f'user{i}@bench.local',
+        'password_hash': 'x',
+        'full_name': f'User {i}',
+        'is_active': True
+    } for i in range(users)])
+
+    user_ids = [row[0] for row in db.session.query(User.id)]
+    quiz_ids = [row[0] for row in db.session.query(Quiz.id)]
+    scores = []
+    for user_id in user_ids:
+        for quiz_id in rng.sample(quiz_ids, rng.randint(0, 4)):
+            attempt_at = now - timedelta(hours=rng.choice([3, 30, 200]))
+            scores.append({
+                'user_id': user_id, 'quiz_id': quiz_id, 'score': 1, 'max_score': 1,
+                'percentage': 100.0, 'started_at': attempt_at, 'completed_at': attempt_at,
+                'created_at': attempt_at
+            })
+    for i in range(0, len(scores), 50000):
+        db.session.execute(insert(Score), scores[i:i + 50000])
+    db.session.commit()
+    return len(user_ids), len(quiz_ids), len(scores)
+
+def legacy_user_pass(user, quizzes, now):
+    """Per-user queries the old loop ran (reminder checks omitted)"""
+    yesterday = now - timedelta(days=1)
+    Score.query.filter(Score.user_id == user.id, Score.created_at >= yesterday).count()
+    Quiz.query.filter_by(is_active=True).all()
+    for quiz in quizzes:
+        Score.query.filter_by(user_id=user.id, quiz_id=quiz.id).count()
+
+def run_benchmark(users=50000, quizzes=200):
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'SLOW_QUERY_THRESHOLD_MS': 0
+    })
+    app = create_worker_app(config_class)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        n_users, n_quizzes, n_scores = seed(users, quizzes, now)
+        seed_time = time.perf_counter() - start
+
+        from celery_tasks.tasks import create_daily_reminders, create_new_quiz_broadcasts
+
+        with track_queries('daily_reminders') as stats:
+            start = time.perf_counter()
+            created = create_daily_reminders(now)
+            broadcasts = create_new_quiz_broadcasts(now)
+            db.session.commit()
+            set_based = time.perf_counter() - start
+
+        # Second run must find everything already reminded
+        start = time.perf_counter()
+        rerun_created = create_daily_reminders(now)
+        db.session.commit()
+        rerun = time.perf_counter() - start
+
+        # Old loop, timed on a sample of users and extrapolated
+        quiz_rows = Quiz.query.all()
+        sample = User.query.limit(LEGACY_SAMPLE_USERS).all()
+        start = time.perf_counter()
+        for user in sample:
+            legacy_user_pass(user, quiz_rows, now)
+        legacy_estimate = (time.perf_counter() - start) / len(sample) * n_users
+        legacy_queries = n_users * (2 + n_quizzes)
+
+    print(f"Daily reminders ({n_users} users x {n_quizzes} quizzes, {n_scores} attempts)")
+    print("=" * 60)
+    print(f"Seed time:                       {seed_time:10.2f} s")
+    print(f"Reminders created:               {created:10d}")
+    print(f"New-quiz broadcasts posted:      {broadcasts:10d}")
+    print(f"Set-based run:                   {set_based:10.2f} s  ({stats.count} queries)")
+    print(f"Re-run (nothing to create):      {rerun:10.2f} s  ({rerun_created} created)")
+    print(f"Per-user loop (estimated):       {legacy_estimate:10.2f} s  ({legacy_queries} queries)")
+    print(f"Speedup:                         {legacy_estimate / max(set_based, 1e-9):10.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
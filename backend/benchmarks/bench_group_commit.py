@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: submit throughput and latency with and without group commit.
+
+Seeds a scratch SQLite database with one open quiz of QUESTIONS questions
+and CLIENTS students, then has every student submit SUBMITS attempts at
+once from its own thread (POST /api/quiz/<id>/submit through the Flask test
+client), the way a class submits at the deadline. Runs once per commit
+mode on a fresh database and reports:
+
+  1. throughput (submissions per second)
+  2. p50 / p99 / max submit latency
+  3. failed submissions (e.g. "database is locked")
+  4. for group commit, the number and average size of the transactions
+
+    python benchmarks/bench_group_commit.py [clients] [submits] [questions]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, func, select
+from flask_jwt_extended import create_access_token
+from backend.config import Config
+from backend.app import create_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Question, Score, QuestionOptionCount
+
+def seed(clients, questions):
+    """One open quiz and a student per client; returns (quiz id, question ids, user ids)"""
+    now = datetime.utcnow()
+    subject = Subject(name='Benchmark', code='BENCH')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+    quiz = Quiz(title='Benchmark', chapter_id=chapter.id, start_date=now - timedelta(hours=1),
+                end_date=now + timedelta(hours=1))
+    db.session.add(quiz)
+    db.session.flush()
+    question_ids = []
+    for i in range(questions):
+        question = Question(quiz_id=quiz.id, question_text=f'Question {i}', correct_answer=str(i % 4), order=i)
+        question.set_options(['A', 'B', 'C', 'D'])
+        db.session.add(question)
+        db.session.flush()
+        question_ids.append(question.id)
+    db.session.execute(insert(User), [{
+        'username': f'student{i}', 'email': f'student{i}@bench.local', 'password_hash': 'x', 'full_name': f'Student {i}'
+    } for i in range(clients)])
+    db.session.commit()
+    user_ids = db.session.scalars(select(User.id).order_by(User.id)).all()
+    return quiz.id, question_ids, user_ids
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+def run_mode(group_commit, clients, submits, questions):
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'AUTO_CREATE_SCHEMA': True,
+        'SQL_INSTRUMENTATION': False,
+        'SLOW_QUERY_THRESHOLD_MS': 0,
+        'RATELIMIT_ENABLED': False,
+        'GROUP_COMMIT_ENABLED': group_commit
+    })
+    app = create_app(config_class)
+
+    with app.app_context():
+        quiz_id, question_ids, user_ids = seed(clients, questions)
+        headers = [{'Authorization': 'Bearer ' + create_access_token(
+            identity=f'student{i}@bench.local', additional_claims={'role': 'user', 'user_id': user_id}
+        )} for i, user_id in enumerate(user_ids)]
+
+    latencies = []
+    failures = []
+    start_line = threading.Barrier(clients + 1)
+
+    def student(index):
+        rng = random.Random(index)
+        client = app.test_client()
+        start_line.wait()
+        for _ in range(submits):
+            answers = {str(question_id): str(rng.randrange(4)) for question_id in question_ids}
+            started = time.perf_counter()
+            response = client.post(f'/api/quiz/{quiz_id}/submit', json={'answers': answers}, headers=headers[index])
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 201:
+                failures.append(response.get_json().get('error'))
+
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start_line.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stored = db.session.scalar(select(func.count(Score.id)))
+        counted = db.session.scalar(select(func.sum(QuestionOptionCount.count))) or 0
+    committer = app.extensions.get('group_commit')
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'max': max(latencies) * 1000,
+        'failed': len(failures),
+        'first_error': failures[0] if failures else None,
+        'stored': stored,
+        'counters_match': counted == stored * questions,
+        'stats': committer.stats() if committer else None
+    }
+
+def run_benchmark(clients=32, submits=20, questions=20):
+    results = [(label, run_mode(group_commit, clients, submits, questions))
+               for label, group_commit in (('Commit per submit', False), ('Group commit', True))]
+
+    print(f"Submit throughput ({clients} concurrent students x {submits} submits, {questions} questions)")
+    print("=" * 60)
+    for label, result in results:
+        print(f"{label}:")
+        print(f"  Throughput:        {result['throughput']:8.1f} submits/s")
+        print(f"  Latency p50/p99:   {result['p50']:8.1f} / {result['p99']:.1f} ms  (max {result['max']:.1f} ms)")
+        print(f"  Failed:            {result['failed']:8d}" +
+              (f"  ({result['first_error']})" if result['first_error'] else ''))
+        print(f"  Scores stored:     {result['stored']:8d}  (counters match: {result['counters_match']})")
+        if result['stats']:
+            print(f"  Transactions:      {result['stats']['batches']:8d}  "
+                  f"(average {result['stats']['average_batch']}, largest {result['stats']['largest_batch']})")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    )
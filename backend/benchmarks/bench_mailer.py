@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled, pipelined mailer vs one SMTP connection per email.
+
+Runs a local SMTP stand-in on a free port that accepts and discards
+messages. To model a real provider it waits HANDSHAKE_MS before greeting
+each new connection (standing in for TLS + login) and MESSAGE_MS per
+message. Three runs are timed and reported in emails per second:
+
+  1. the old path: connect, send, quit for every email
+  2. the pooled mailer's send_batch (render + send thread pools)
+  3. the pooled mailer while the server drops every session after a few
+     messages, to check reconnects lose nothing
+
+    python benchmarks/bench_mailer.py [emails]
+"""
+
+import sys
+import os
+import smtplib
+import socketserver
+import threading
+import time
+from email.mime.text import MIMEText
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app.utils.mailer import Mailer, SMTPPool
+
+HANDSHAKE_MS = 40
+MESSAGE_MS = 2
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        time.sleep(HANDSHAKE_MS / 1000)
+        self.reply('220 sink ready')
+        messages_in_session = 0
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250-sink')
+                self.reply('250-AUTH PLAIN')
+                self.reply('250 SIZE 10485760')
+            elif command.startswith('AUTH'):
+                self.reply('235 Authentication successful')
+            elif command.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(MESSAGE_MS / 1000)
+                with server.lock:
+                    server.received += 1
+                self.reply('250 OK queued')
+                messages_in_session += 1
+                if server.drop_after and messages_in_session >= server.drop_after:
+                    # Hang up without QUIT, like a server enforcing a session limit
+                    return
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_after=0):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.drop_after = drop_after
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+def build_message(i):
+    msg = MIMEText(f'<p>Report {i}</p>' * 50, 'html')
+    msg['Subject'] = f'Monthly Quiz Report {i}'
+    msg['From'] = 'reports@quizmaster.local'
+    msg['To'] = f'user{i}@example.com'
+    return msg
+
+
+def run_per_email(port, emails):
+    for i in range(emails):
+        with smtplib.SMTP('127.0.0.1', port) as server:
+            server.send_message(build_message(i))
+
+
+def make_mailer(port):
+    pool = SMTPPool('127.0.0.1', port, starttls=False, size=4, max_messages_per_connection=100)
+    return Mailer(pool, sender='reports@quizmaster.local', max_retries=3, retry_backoff=0.01)
+
+
+def timed(label, emails, sink, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.2f} s  {emails / elapsed:8.1f} emails/s  received {sink.received}/{emails}")
+    return result
+
+
+def run_benchmark(emails=300):
+    print(f"Mailer throughput ({emails} emails, {HANDSHAKE_MS} ms handshake, {MESSAGE_MS} ms per message)")
+    print("=" * 78)
+
+    sink = SMTPSink()
+    timed('Connection per email (old)', emails, sink, lambda: run_per_email(sink.port, emails))
+
+    sink = SMTPSink()
+    mailer = make_mailer(sink.port)
+    result = timed('Pooled send_batch', emails, sink,
+                   lambda: mailer.send_batch(range(emails), render=build_message))
+    mailer.close()
+    print(f"{'':<34} {result}, connections opened: {mailer.pool.connections_opened}")
+
+    sink = SMTPSink(drop_after=37)
+    mailer = make_mailer(sink.port)
+    result = timed('Pooled, server drops every 37', emails, sink,
+                   lambda: mailer.send_batch(range(emails), render=build_message))
+    mailer.close()
+    print(f"{'':<34} {result}, connections opened: {mailer.pool.connections_opened}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
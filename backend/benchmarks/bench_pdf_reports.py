@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: monthly PDF report batch throughput.
+
+Seeds a scratch SQLite database with REPORTS users who each made ATTEMPTS
+attempts last month, then measures:
+
+  1. gathering report data one query per user (sampled and extrapolated)
+     vs one bulk query per chunk (collect_user_reports)
+  2. rendering every user's PDF serially vs in a ProcessPoolExecutor
+     (render_report_files), reported as reports per second
+
+Rendering is CPU-bound, so the pool scales with the cores available;
+on a single core it only adds process start-up and pickling overhead.
+
+    python benchmarks/bench_pdf_reports.py [reports] [workers] [attempts]
+"""
+
+import sys
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from backend.config import Config
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Score
+from backend.app.utils.report_schedule import monthly_report_period
+from backend.app.utils.pdf_reports import collect_user_reports, render_report_files
+
+CHUNK_SIZE = 200
+PER_USER_SAMPLE = 500
+
+def seed(users, attempts, start_date, quizzes=200):
+    """Bulk-load users with attempts spread over the reported month"""
+    rng = random.Random(42)
+    subject_ids = []
+    for i in range(5):
+        subject = Subject(name=f'Subject {i}', code=f'BENCH{i}')
+        db.session.add(subject)
+        db.session.flush()
+        subject_ids.append(subject.id)
+    chapter_ids = []
+    for subject_id in subject_ids:
+        chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject_id)
+        db.session.add(chapter)
+        db.session.flush()
+        chapter_ids.append(chapter.id)
+
+    db.session.execute(insert(Quiz), [{
+        'title': f'Quiz {i}',
+        'slug': f'quiz-{i}',
+        'chapter_id': chapter_ids[i % len(chapter_ids)],
+        'start_date': start_date - timedelta(days=30),
+        'end_date': start_date + timedelta(days=60),
+        'is_active': True
+    } for i in range(quizzes)])
+    db.session.execute(insert(User), [{
+        'username': f'user{i}', 'email': f'user{i}@bench.local', 'password_hash': 'x',
+        'full_name': f'Bench User {i}', 'role': 'user', 'is_active': True
+    } for i in range(users)])
+
+    quiz_ids = [row[0] for row in db.session.query(Quiz.id)]
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.role == 'user').order_by(User.id)]
+    rows = []
+    for user_id in user_ids:
+        for _ in range(attempts):
+            attempt_at = start_date + timedelta(minutes=rng.randint(0, 27 * 24 * 60))
+            percentage = rng.randint(0, 100)
+            rows.append({
+                'user_id': user_id, 'quiz_id': rng.choice(quiz_ids), 'score': percentage,
+                'max_score': 100, 'percentage': float(percentage), 'passed': percentage >= 60,
+                'attempt_number': 1, 'time_taken_seconds': rng.randint(30, 1800),
+                'started_at': attempt_at, 'completed_at': attempt_at, 'created_at': attempt_at
+            })
+        if len(rows) >= 50000:
+            db.session.execute(insert(Score), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(Score), rows)
+    db.session.commit()
+    return user_ids
+
+def chunked(ids, start_date, end_date):
+    for i in range(0, len(ids), CHUNK_SIZE):
+        yield collect_user_reports(ids[i:i + CHUNK_SIZE], start_date, end_date)
+
+def run_benchmark(reports=10000, workers=None, attempts=5):
+    workers = workers or os.cpu_count() or 1
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'SLOW_QUERY_THRESHOLD_MS': 0
+    })
+    app = create_worker_app(config_class)
+    start_date, end_date = monthly_report_period(datetime.utcnow())
+
+    with app.app_context():
+        db.create_all()
+        user_ids = seed(reports, attempts, start_date)
+
+        # Data gathering: one query per user (sampled) vs one query per chunk
+        sample = user_ids[:PER_USER_SAMPLE]
+        started = time.perf_counter()
+        for user_id in sample:
+            collect_user_reports([user_id], start_date, end_date)
+        per_user_time = (time.perf_counter() - started) * len(user_ids) / len(sample)
+
+        started = time.perf_counter()
+        data = [report for chunk in chunked(user_ids, start_date, end_date) for report in chunk]
+        bulk_time = time.perf_counter() - started
+        chunks = [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+    # Rendering, from already gathered data so only the PDF work is compared
+    serial_dir = os.path.join(tmpdir, 'serial')
+    started = time.perf_counter()
+    serial_count = render_report_files('user', chunks, serial_dir, workers=1)
+    serial_time = time.perf_counter() - started
+
+    pool_dir = os.path.join(tmpdir, 'pool')
+    started = time.perf_counter()
+    pool_count = render_report_files('user', chunks, pool_dir, workers=workers)
+    pool_time = time.perf_counter() - started
+
+    size = sum(os.path.getsize(os.path.join(pool_dir, name)) for name in os.listdir(pool_dir))
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"Monthly PDF reports ({reports} users x {attempts} attempts, chunks of {CHUNK_SIZE})")
+    print("=" * 60)
+    print(f"CPUs available:              {os.cpu_count()}")
+    print(f"Data, one query per user:    {per_user_time:8.2f} s  ({len(user_ids)} queries, "
+          f"extrapolated from {len(sample)})")
+    print(f"Data, one query per chunk:   {bulk_time:8.2f} s  ({len(chunks)} queries)")
+    print(f"Render serial:               {serial_time:8.2f} s  {serial_count / serial_time:8.1f} reports/s")
+    print(f"Render pool ({workers} workers):     {pool_time:8.2f} s  {pool_count / pool_time:8.1f} reports/s")
+    print(f"Pool speedup:                {serial_time / pool_time:8.2f}x")
+    print(f"Average report size:         {size / pool_count / 1024:8.1f} KiB")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    )
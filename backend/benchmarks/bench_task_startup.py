@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-task app startup overhead in Celery workers.
+
+Compares building the full web app for every task (the old behaviour of
+the tasks in celery_tasks/tasks.py) with the worker app that is built once
+per worker process and reused.
+
+    python benchmarks/bench_task_startup.py [iterations]
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.config import Config
+import backend.app as app_module
+
+def run_benchmark(iterations=50):
+    """Time app setup per task for both factories against a scratch database"""
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'SLOW_QUERY_THRESHOLD_MS': 0
+    })
+
+    # First boot of the web app creates the schema and hashes the admin password
+    start = time.perf_counter()
+    app_module.create_app(config_class)
+    first_boot = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        app = app_module.create_app(config_class)
+        with app.app_context():
+            pass
+    full_per_task = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    app_module.create_worker_app(config_class)
+    worker_build = time.perf_counter() - start
+
+    # Reuse path: what every task after the first one in a worker pays
+    app_module._worker_app = app_module.create_worker_app(config_class)
+    app_module._worker_app_pid = os.getpid()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        app = app_module.get_worker_app()
+        with app.app_context():
+            pass
+    worker_per_task = (time.perf_counter() - start) / iterations
+
+    print(f"Task startup overhead ({iterations} iterations)")
+    print("=" * 50)
+    print(f"create_app() first boot:        {first_boot * 1000:10.2f} ms")
+    print(f"create_app() per task:          {full_per_task * 1000:10.2f} ms")
+    print(f"create_worker_app() once:       {worker_build * 1000:10.2f} ms")
+    print(f"get_worker_app() per task:      {worker_per_task * 1000:10.4f} ms")
+    print(f"Speedup per task:               {full_per_task / max(worker_per_task, 1e-9):10.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled template registry vs building a Template per email.
+
+Renders the monthly report email N times (default 100k) with report-shaped
+data, both ways:
+
+  1. the old path: jinja2.Template(source) parsed and compiled for every email
+     (timed on a sample and extrapolated, it is far too slow to run in full)
+  2. the registry: compiled once per process, then rendered from cache
+
+It also times a cold start (first render in a fresh environment) with and
+without the on-disk bytecode cache, which is what a new worker pays.
+
+    python benchmarks/bench_templates.py [renders]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from jinja2 import Template
+from backend.app.utils.templates import TEMPLATES_DIR, create_template_environment
+
+TEMPLATE_NAME = 'email/monthly_report.html'
+OLD_PATH_SAMPLE = 2000
+
+
+def build_context(i):
+    now = datetime(2026, 9, 30, 12, 0)
+    return {
+        'user_name': f'User {i}',
+        'month_name': 'September',
+        'year': 2026,
+        'total_attempts': 12 + i % 7,
+        'average_score': f"{60 + i % 40:.1f}",
+        'passed_count': 8 + i % 5,
+        # Same shape as iter_monthly_reports() builds
+        'top_subjects': [
+            {'name': f'Subject {s}', 'average': 90.0 - s * 7.5 - i % 5, 'attempts': 10 - s}
+            for s in range(3)
+        ],
+        'recent_activity': [
+            {'quiz_title': f'Quiz {q}', 'percentage': 50 + q * 5, 'created_at': now - timedelta(days=q)}
+            for q in range(5)
+        ],
+    }
+
+
+def run_benchmark(renders=100000):
+    with open(os.path.join(TEMPLATES_DIR, TEMPLATE_NAME), encoding='utf-8') as f:
+        source = f.read()
+    contexts = [build_context(i) for i in range(100)]
+
+    print(f"Monthly report rendering ({renders} emails)")
+    print("=" * 70)
+
+    sample = min(renders, OLD_PATH_SAMPLE)
+    start = time.perf_counter()
+    for i in range(sample):
+        Template(source, autoescape=True).render(**contexts[i % len(contexts)])
+    per_render = (time.perf_counter() - start) / sample
+    print(f"{'Template per email (old)':<32} {per_render * 1e6:8.1f} us/render  "
+          f"~{per_render * renders:8.1f} s for {renders} (from {sample})")
+
+    environment = create_template_environment()
+    template = environment.get_template(TEMPLATE_NAME)
+    start = time.perf_counter()
+    for i in range(renders):
+        template.render(**contexts[i % len(contexts)])
+    elapsed = time.perf_counter() - start
+    print(f"{'Compiled registry':<32} {elapsed / renders * 1e6:8.1f} us/render  "
+          f"{elapsed:9.1f} s for {renders}  ({per_render * renders / elapsed:.0f}x)")
+
+    print()
+    print("Cold start (first render in a new worker)")
+    cache_dir = tempfile.mkdtemp(prefix='template-bytecode-')
+    try:
+        for label, cache in (('no bytecode cache', ''), ('bytecode cache, first run', cache_dir),
+                             ('bytecode cache, warm', cache_dir)):
+            start = time.perf_counter()
+            create_template_environment(bytecode_cache_dir=cache).get_template(TEMPLATE_NAME).render(**contexts[0])
+            print(f"  {label:<30} {(time.perf_counter() - start) * 1000:8.2f} ms")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming user scores CSV export vs the old DataFrame export.
+
+Seeds a scratch SQLite database with one user who has ATTEMPTS attempts
+spread over QUIZZES quizzes, then writes that user's CSV both ways while
+tracemalloc records peak Python memory:
+
+  1. the old path: load every Score, lazy-load quiz/chapter/subject per row,
+     build a list of dicts, a DataFrame, then to_csv
+  2. iter_user_score_rows(): one joined query on a server-side cursor,
+     written to csv.writer chunk by chunk
+
+Both files must be identical.
+
+    python benchmarks/bench_user_export.py [attempts] [quizzes]
+"""
+
+import sys
+import os
+import csv
+import filecmp
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from backend.config import Config
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import User, Subject, Chapter, Quiz, Score
+
+def seed(attempts, quizzes, now):
+    """Bulk-load one user with a long attempt history"""
+    rng = random.Random(42)
+    subject = Subject(name='Benchmark', code='BENCH')
+    db.session.add(subject)
+    db.session.flush()
+    chapter = Chapter(name='Benchmark', chapter_number=1, subject_id=subject.id)
+    db.session.add(chapter)
+    db.session.flush()
+
+    db.session.execute(insert(Quiz), [{
+        'title': f'Quiz {i}',
+        'slug': f'quiz-{i}',
+        'chapter_id': chapter.id,
+        'start_date': now - timedelta(days=400),
+        'end_date': now + timedelta(days=7),
+        'is_active': True
+    } for i in range(quizzes)])
+    user = User(username='exporter', email='exporter@bench.local', password_hash='x', full_name='Exporter')
+    db.session.add(user)
+    db.session.flush()
+
+    quiz_ids = [row[0] for row in db.session.query(Quiz.id)]
+    for start in range(0, attempts, 50000):
+        rows = []
+        for i in range(start, min(start + 50000, attempts)):
+            attempt_at = now - timedelta(minutes=i * 7)
+            percentage = rng.randint(0, 100)
+            rows.append({
+                'user_id': user.id, 'quiz_id': rng.choice(quiz_ids), 'score': percentage,
+                'max_score': 100, 'percentage': float(percentage), 'passed': percentage >= 60,
+                'attempt_number': 1, 'time_taken_seconds': rng.randint(30, 1800),
+                'started_at': attempt_at, 'completed_at': attempt_at, 'created_at': attempt_at
+            })
+        db.session.execute(insert(Score), rows)
+    db.session.commit()
+    return user.id
+
+def legacy_export(user_id, filepath):
+    """The old export: ORM objects, lazy loads, list of dicts, DataFrame"""
+    import pandas as pd
+    scores = Score.query.filter_by(user_id=user_id).order_by(Score.created_at.desc()).all()
+    data = []
+    for score in scores:
+        data.append({
+            'Quiz ID': score.quiz_id,
+            'Quiz Title': score.quiz.title,
+            'Subject': score.quiz.chapter.subject.name,
+            'Chapter': score.quiz.chapter.name,
+            'Date of Quiz': score.quiz.start_date.strftime('%Y-%m-%d'),
+            'Score': f"{score.score}/{score.max_score}",
+            'Percentage': f"{score.percentage}%",
+            'Passed': 'Yes' if score.passed else 'No',
+            'Attempt Number': score.attempt_number,
+            'Time Taken (minutes)': score.time_taken_seconds // 60 if score.time_taken_seconds else 0,
+            'Completed Date': score.created_at.strftime('%Y-%m-%d %H:%M')
+        })
+    pd.DataFrame(data).to_csv(filepath, index=False)
+
+def streaming_export(user_id, filepath):
+    from celery_tasks.tasks import USER_SCORES_CSV_COLUMNS, iter_user_score_rows
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(USER_SCORES_CSV_COLUMNS)
+        for chunk in iter_user_score_rows(user_id):
+            writer.writerows(chunk)
+
+def measure(fn, *args):
+    """Wall time of a plain run, then peak memory of a traced run (tracing is slow)"""
+    db.session.expunge_all()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+def run_benchmark(attempts=200000, quizzes=500):
+    tmpdir = tempfile.mkdtemp()
+    config_class = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db',
+        'SLOW_QUERY_THRESHOLD_MS': 0
+    })
+    app = create_worker_app(config_class)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        user_id = seed(attempts, quizzes, now)
+
+        legacy_file = os.path.join(tmpdir, 'legacy.csv')
+        streaming_file = os.path.join(tmpdir, 'streaming.csv')
+        legacy_time, legacy_peak = measure(legacy_export, user_id, legacy_file)
+        streaming_time, streaming_peak = measure(streaming_export, user_id, streaming_file)
+
+    print(f"User scores CSV export ({attempts} attempts over {quizzes} quizzes)")
+    print("=" * 60)
+    print(f"DataFrame export (old):   {legacy_time:8.2f} s  peak {legacy_peak:8.1f} MiB")
+    print(f"Streaming export:         {streaming_time:8.2f} s  peak {streaming_peak:8.1f} MiB")
+    print(f"Files identical:          {filecmp.cmp(legacy_file, streaming_file, shallow=False)}")
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    )
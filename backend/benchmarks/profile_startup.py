@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Startup profile: import-time tree and create_app() phase timings.
+
+Imports are measured in fresh interpreters with ``python -X importtime`` so
+module caching does not hide their cost. Phase timings come from the
+StartupTimer that create_app() records.
+
+    python benchmarks/profile_startup.py [min_ms]
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.append(PROJECT_DIR)
+
+TARGETS = [
+    ('web app', 'from backend.app import create_app', PROJECT_DIR),
+    ('celery worker', 'import celery_app; import celery_tasks.tasks', BACKEND_DIR),
+]
+
+def import_tree(code, cwd, min_ms):
+    """Run code under -X importtime and return (total_ms, tree lines)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=cwd, capture_output=True, text=True
+    )
+    lines = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        cumulative = int(cumulative_us)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            total_us += cumulative
+        if cumulative >= min_ms * 1000:
+            lines.append((depth, name.strip(), cumulative / 1000))
+    # importtime prints children before parents; reverse for a readable tree
+    return total_us / 1000, list(reversed(lines))
+
+def run_profile(min_ms=20):
+    for label, code, cwd in TARGETS:
+        total_ms, tree = import_tree(code, cwd, min_ms)
+        print(f"Import tree: {label} ({total_ms:.1f} ms total, showing >= {min_ms} ms)")
+        print("=" * 60)
+        for depth, name, ms in tree:
+            print(f"{ms:9.1f} ms  {'  ' * depth}{name}")
+        print()
+
+    from backend.config import Config
+    from backend.app import create_app
+    tmpdir = tempfile.mkdtemp()
+    for auto_schema in (True, False):
+        config_class = type('ProfileConfig', (Config,), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/profile.db',
+            'AUTO_CREATE_SCHEMA': auto_schema,
+            'STARTUP_PROFILE': True
+        })
+        print(f"AUTO_CREATE_SCHEMA={auto_schema}")
+        create_app(config_class)
+        print()
+
+if __name__ == "__main__":
+    run_profile(float(sys.argv[1]) if len(sys.argv) > 1 else 20)
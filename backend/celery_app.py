@@ -3,6 +3,8 @@ from celery.schedules import crontab
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Project root, so tasks can import the app as the backend package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 
 # Create Celery instance
@@ -28,13 +30,39 @@ celery.conf.update(
             'schedule': crontab(hour=12, minute=30),  # Daily at 6:00 PM IST (12:30 PM UTC)
             'options': {'queue': 'periodic'}
         },
-        'monthly-report': {
-            'task': 'celery_tasks.tasks.generate_monthly_reports',
-            'schedule': crontab(hour=9, minute=0, day_of_month=1),  # First day of month at 2:30 PM IST
+        'analytics-snapshot': {
+            'task': 'celery_tasks.tasks.build_analytics_snapshot',
+            'schedule': crontab(hour=0, minute=20),  # Nightly, once the day has closed
             'options': {'queue': 'periodic'}
         },
+        'analytics-export': {
+            'task': 'celery_tasks.tasks.export_analytics_parquet',
+            'schedule': crontab(hour=1, minute=30),  # Nightly, appends scores since the last run
+            'options': {'queue': 'periodic'}
+        },
+        'regrade-resume': {
+            'task': 'celery_tasks.tasks.resume_regrade_jobs',
+            'schedule': crontab(minute='*/10'),  # Picks up regrades interrupted by a worker restart
+            'options': {'queue': 'periodic'}
+        },
+        'monthly-pdf-reports': {
+            'task': 'celery_tasks.tasks.generate_monthly_pdf_reports',
+            'schedule': crontab(hour=2, minute=0, day_of_month=1),  # After the month closes and the snapshot is built
+            'options': {'queue': 'periodic'}
+        },
+        'monthly-report-tick': {
+            'task': 'celery_tasks.tasks.send_monthly_report_slice',
+            # Each tick sends the reports whose slot has come due (see MONTHLY_REPORT_* settings)
+            'schedule': crontab(minute=f'*/{Config.MONTHLY_REPORT_TICK_MINUTES}', day_of_month='1-3'),
+            'options': {'queue': 'periodic', 'expires': Config.MONTHLY_REPORT_TICK_MINUTES * 60}
+        },
     }
 )
 
+# Per-task SQL stats (query count, DB time, N+1 patterns) in the worker debug log
+if Config.SQL_INSTRUMENTATION:
+    from backend.app.utils.sql_stats import connect_celery_signals
+    connect_celery_signals(Config.SQL_N_PLUS_ONE_THRESHOLD)
+
 if __name__ == '__main__':
     celery.start() 
\ No newline at end of file
@@ -1,196 +1,474 @@
 from celery import shared_task
 from datetime import datetime, timedelta
-import pandas as pd
 import os
 import json
-import requests
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
-import smtplib
-from jinja2 import Template
+
+# Heavy dependencies (pandas, requests) are imported inside the functions
+# that use them so worker boot does not pay for them
 
 @shared_task
 def send_daily_reminders():
-    """Create daily reminder notifications in database for inactive users and new quizzes"""
+    """Post new-quiz broadcasts, then fan daily reminders out over user-id shards
+    
+    New quizzes get one broadcast row each, shown to users at read time. The
+    per-user inactive reminders run as a chord: REMINDER_SHARD_CONCURRENCY lanes, each a chain of
+    shard tasks with REMINDER_SHARD_SIZE users per shard and its own short
+    transaction, followed by summarize_daily_reminders.
+    """
     try:
-        from app import create_app
-        from app.models import User, Quiz, Score, Reminder
-        from app.database import db
+        from celery import chain, chord, group
+        from backend.app import get_worker_app
+        from backend.app.database import db
+        
+        # All shards share one timestamp so they agree on "today"
+        now = datetime.utcnow()
+        run_at = now.isoformat()
         
-        app = create_app()
+        app = get_worker_app()
         with app.app_context():
-            # Get current time
-            now = datetime.utcnow()
-            yesterday = now - timedelta(days=1)
-            
-            # Get all active users
-            users = User.query.filter_by(is_active=True).all()
-            
-            reminders_created = 0
-            
-            for user in users:
-                # Check if user has been inactive (no quiz attempts in last 1 day)
-                recent_activity = Score.query.filter(
-                    Score.user_id == user.id,
-                    Score.created_at >= yesterday
-                ).count()
-                
-                # Check for new quizzes available to user
-                available_quizzes = []
-                quizzes = Quiz.query.filter_by(is_active=True).all()
-                
-                for quiz in quizzes:
-                    if quiz.is_available:
-                        # Check if user has attempts remaining
-                        attempts = Score.query.filter_by(
-                            user_id=user.id,
-                            quiz_id=quiz.id
-                        ).count()
-                        
-                        if attempts < quiz.max_attempts:
-                            available_quizzes.append(quiz)
-                
-                # Create reminders based on conditions
-                
-                # 1. Inactive user reminder
-                if recent_activity == 0 and available_quizzes:
-                    message = f"Hey {user.full_name}! You haven't attempted any quizzes today. You have {len(available_quizzes)} quiz(s) available to attempt."
-                    
-                    # Check if similar reminder already exists today
-                    existing_reminder = Reminder.query.filter(
-                        Reminder.user_id == user.id,
-                        Reminder.reminder_type == 'inactive_user',
-                        Reminder.created_at >= now.replace(hour=0, minute=0, second=0, microsecond=0)
-                    ).first()
-                    
-                    if not existing_reminder:
-                        reminder = Reminder(
-                            user_id=user.id,
-                            message=message,
-                            reminder_type='inactive_user'
-                        )
-                        db.session.add(reminder)
-                        reminders_created += 1
-                
-                # 2. New quiz reminders (for quizzes created in last day)
-                new_quizzes = [q for q in available_quizzes if q.created_at >= yesterday]
-                if new_quizzes:
-                    for quiz in new_quizzes:
-                        message = f"New quiz available: '{quiz.title}' in {quiz.chapter.subject.name}. Don't miss out!"
-                        
-                        # Check if reminder for this specific quiz already exists
-                        existing_quiz_reminder = Reminder.query.filter(
-                            Reminder.user_id == user.id,
-                            Reminder.reminder_type == 'new_quiz',
-                            Reminder.message.contains(quiz.title),
-                            Reminder.created_at >= now.replace(hour=0, minute=0, second=0, microsecond=0)
-                        ).first()
-                        
-                        if not existing_quiz_reminder:
-                            reminder = Reminder(
-                                user_id=user.id,
-                                message=message,
-                                reminder_type='new_quiz'
-                            )
-                            db.session.add(reminder)
-                            reminders_created += 1
-            
-            # Commit all reminders
+            broadcasts_created = create_new_quiz_broadcasts(
+                now, app.config.get('NEW_QUIZ_BROADCAST_AUDIENCE', 'all')
+            )
             db.session.commit()
             
-            print(f"[REMINDER] Created {reminders_created} new reminders for users")
-            return {'status': 'success', 'message': f'Created {reminders_created} daily reminders', 'reminders_created': reminders_created}
+            shard_size = max(1, app.config.get('REMINDER_SHARD_SIZE', 5000))
+            concurrency = max(1, app.config.get('REMINDER_SHARD_CONCURRENCY', 4))
+            shards = get_user_id_shards(shard_size)
+        
+        if not shards:
+            print(f"[REMINDER] Posted {broadcasts_created} broadcasts, no active users to remind")
+            return {'status': 'success', 'message': 'No active users', 'reminders_created': 0,
+                    'broadcasts_created': broadcasts_created}
+        
+        # Lane i takes shards i, i + lanes, ...; each lane passes its results down its chain
+        lanes = []
+        for lane in range(min(concurrency, len(shards))):
+            lane_shards = shards[lane::concurrency]
+            first_start, first_end = lane_shards[0]
+            lanes.append(chain(
+                send_reminder_shard.s([], first_start, first_end, run_at),
+                *[send_reminder_shard.s(start_id, end_id, run_at) for start_id, end_id in lane_shards[1:]]
+            ))
+        
+        chord(group(lanes))(summarize_daily_reminders.s(run_at, broadcasts_created))
+        
+        print(f"[REMINDER] Dispatched {len(shards)} shards of {shard_size} users across {len(lanes)} lanes")
+        return {'status': 'dispatched', 'message': f'Dispatched {len(shards)} reminder shards', 'shards': len(shards)}
         
     except Exception as e:
         print(f"[REMINDER ERROR] {str(e)}")
         return {'status': 'error', 'message': str(e)}
 
 @shared_task
-def generate_monthly_reports():
-    """Generate and send monthly activity reports via email"""
+def send_reminder_shard(previous, start_id, end_id, run_at):
+    """Create daily reminders for active users with start_id <= id < end_id"""
+    from backend.app import get_worker_app
+    from backend.app.database import db
+    
+    shard = {'start_id': start_id, 'end_id': end_id}
+    try:
+        app = get_worker_app()
+        with app.app_context():
+            try:
+                shard['reminders_created'] = create_daily_reminders(
+                    datetime.fromisoformat(run_at), start_id=start_id, end_id=end_id
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        shard['status'] = 'success'
+    except Exception as e:
+        # A failed shard is reported, not raised, so its lane and the summary still run
+        print(f"[REMINDER ERROR] Shard {start_id}-{end_id}: {str(e)}")
+        shard.update({'status': 'error', 'message': str(e), 'reminders_created': 0})
+    
+    return previous + [shard]
+
+@shared_task
+def summarize_daily_reminders(lane_results, run_at, broadcasts_created=0):
+    """Aggregate the shard results of one daily reminder run"""
+    shards = [shard for lane in lane_results for shard in lane]
+    failed = [shard for shard in shards if shard['status'] != 'success']
+    reminders_created = sum(shard['reminders_created'] for shard in shards)
+    duration = (datetime.utcnow() - datetime.fromisoformat(run_at)).total_seconds()
+    
+    print(f"[REMINDER] Created {reminders_created} new reminders and {broadcasts_created} broadcasts "
+          f"({len(shards)} shards, {len(failed)} failed, {duration:.1f}s)")
+    return {
+        'status': 'success' if not failed else 'partial',
+        'message': f'Created {reminders_created} daily reminders',
+        'reminders_created': reminders_created,
+        'broadcasts_created': broadcasts_created,
+        'shards': len(shards),
+        'failed_shards': failed,
+        'duration_seconds': round(duration, 2)
+    }
+
+def get_user_id_shards(shard_size):
+    """Split active user ids into [start_id, end_id) ranges of shard_size users
+    
+    Boundaries are every shard_size-th id, found in one window query, so shards
+    stay even when ids are sparse. The last range is open-ended (end_id None).
+    """
+    from sqlalchemy import func, select
+    from backend.app.models import User
+    from backend.app.database import db
+    
+    numbered = select(
+        User.id.label('id'),
+        func.row_number().over(order_by=User.id).label('position')
+    ).where(User.is_active == True).subquery()
+    
+    boundaries = db.session.execute(
+        select(numbered.c.id).where((numbered.c.position - 1) % shard_size == 0).order_by(numbered.c.id)
+    ).scalars().all()
+    
+    return list(zip(boundaries, boundaries[1:] + [None]))
+
+def create_daily_reminders(now, start_id=None, end_id=None):
+    """Create inactive-user reminders with one set-based INSERT ... SELECT
+    
+    Attempts remaining and recent activity are computed in SQL for all users
+    at once (new quizzes are announced by create_new_quiz_broadcasts instead).
+    Each reminder carries a dedup key (type, entity id, day) backed by a unique
+    index, so the insert skips existing reminders with ON CONFLICT DO NOTHING
+    instead of looking them up first, and the users that got a reminder have
+    their unread counters bumped. start_id / end_id limit the run to one shard
+    of user ids. The caller commits. Returns the number of reminders created.
+    """
+    from sqlalchemy import func, select, exists, literal, cast, String
+    from backend.app.models import User, Quiz, Score, Reminder, ReminderReadState
+    from backend.app.database import db
+    
+    yesterday = now - timedelta(days=1)
+    today = now.date()
+    
+    # Users in this shard (all users when no range is given)
+    in_shard, scores_in_shard = [], []
+    if start_id is not None:
+        in_shard.append(User.id >= start_id)
+        scores_in_shard.append(Score.user_id >= start_id)
+    if end_id is not None:
+        in_shard.append(User.id < end_id)
+        scores_in_shard.append(Score.user_id < end_id)
+    
+    columns = ['user_id', 'message', 'reminder_type', 'entity_id', 'reminder_date', 'is_read', 'created_at']
+    
+    # Quizzes currently open (same rule as Quiz.is_available)
+    available_ids = [quiz_id for quiz_id, in db.session.query(Quiz.id).filter(
+        Quiz.is_active == True,
+        Quiz.start_date <= now,
+        Quiz.end_date >= now
+    )]
+    if not available_ids:
+        return 0
+    
+    # (user, quiz) pairs with no attempts left
+    exhausted = db.session.query(
+        Score.user_id.label('user_id'),
+        Score.quiz_id.label('quiz_id')
+    ).join(Quiz, Quiz.id == Score.quiz_id).filter(
+        Score.quiz_id.in_(available_ids),
+        *scores_in_shard
+    ).group_by(
+        Score.user_id, Score.quiz_id, Quiz.max_attempts
+    ).having(
+        func.count(Score.id) >= Quiz.max_attempts
+    ).subquery()
+    
+    exhausted_counts = db.session.query(
+        exhausted.c.user_id,
+        func.count().label('exhausted')
+    ).group_by(exhausted.c.user_id).subquery()
+    
+    # Inactive users: no attempt since yesterday and at least one quiz left
+    remaining = len(available_ids) - func.coalesce(exhausted_counts.c.exhausted, 0)
+    inactive_users = select(
+        User.id,
+        literal('Hey ') + User.full_name
+        + literal("! You haven't attempted any quizzes today. You have ")
+        + cast(remaining, String) + literal(' quiz(s) available to attempt.'),
+        literal('inactive_user'),
+        literal(0),
+        literal(today),
+        literal(False),
+        literal(now)
+    ).outerjoin(
+        exhausted_counts, exhausted_counts.c.user_id == User.id
+    ).where(
+        User.is_active == True,
+        *in_shard,
+        ~exists().where(Score.user_id == User.id, Score.created_at >= yesterday),
+        remaining > 0
+    )
+    
+    # RETURNING yields only the rows actually inserted, for the per-user counters
+    created_for = db.session.execute(
+        Reminder.insert_ignore_duplicates().from_select(columns, inactive_users).returning(Reminder.user_id)
+    ).scalars().all()
+    ReminderReadState.record_inserted(db.session.connection(), created_for)
+    return len(created_for)
+
+def create_new_quiz_broadcasts(now, audience='all'):
+    """Post one broadcast per quiz created in the last day
+    
+    Broadcasts are fanned out when users read their reminders, so writes scale
+    with new quizzes rather than users x quizzes. audience is 'all' or
+    'subject_followers'. The caller commits. Returns the number posted.
+    """
+    from sqlalchemy.orm import joinedload
+    from backend.app.models import Quiz, Chapter, BroadcastNotification
+    from backend.app.database import db
+    
+    new_quizzes = Quiz.query.options(
+        joinedload(Quiz.chapter).joinedload(Chapter.subject)
+    ).filter(
+        Quiz.is_active == True,
+        Quiz.start_date <= now,
+        Quiz.end_date >= now,
+        Quiz.created_at >= now - timedelta(days=1)
+    ).all()
+    if not new_quizzes:
+        return 0
+    
+    # Core execute on the session's connection so rowcount reflects skipped conflicts
+    result = db.session.connection().execute(BroadcastNotification.insert_ignore_duplicates(), [{
+        'message': f"New quiz available: '{quiz.title}' in {quiz.chapter.subject.name}. Don't miss out!",
+        'notification_type': 'new_quiz',
+        'audience': audience,
+        'subject_id': quiz.chapter.subject_id,
+        'entity_id': quiz.id,
+        'created_at': now,
+        'expires_at': quiz.end_date
+    } for quiz in new_quizzes])
+    
+    return result.rowcount
+
+@shared_task
+def send_monthly_report_slice():
+    """Send the monthly reports that have come due, a rate-limited slice per tick"""
     try:
-        from app import create_app
-        from app.models import User, Score, Quiz
-        from app.database import db
+        from backend.app import get_worker_app
+        from backend.app.utils.mailer import get_mailer
         
-        app = create_app()
+        app = get_worker_app()
         with app.app_context():
-            # Get last month's date range
-            today = datetime.utcnow()
-            first_day_last_month = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-            last_day_last_month = today.replace(day=1) - timedelta(days=1)
+            mailer = get_mailer()
+            if not mailer.configured:
+                print("SMTP credentials not configured")
+                return {'status': 'error', 'message': 'SMTP credentials not configured'}
             
-            # Get all users with activity last month
-            users_with_scores = db.session.query(User).join(Score).filter(
-                Score.created_at >= first_day_last_month,
-                Score.created_at <= last_day_last_month
-            ).distinct().all()
+            results = send_monthly_report_batch(
+                datetime.utcnow(), app.config['MONTHLY_REPORT_USERS_PER_TICK']
+            )
+            return {'status': 'success', **results}
+        
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def generate_monthly_reports():
+    """Send every outstanding monthly report for last month now, ignoring the schedule"""
+    try:
+        from backend.app import get_worker_app
+        from backend.app.utils.mailer import get_mailer
+        
+        app = get_worker_app()
+        with app.app_context():
+            mailer = get_mailer()
+            if not mailer.configured:
+                print("SMTP credentials not configured")
+                return {'status': 'error', 'message': 'SMTP credentials not configured'}
             
-            reports_sent = 0
-            for user in users_with_scores:
-                # Generate report for each user
-                report_data = generate_user_monthly_report(user.id, first_day_last_month, last_day_last_month)
-                
-                # Send email with HTML report
-                if send_monthly_report_email(user, report_data, first_day_last_month):
-                    reports_sent += 1
-                    print(f"[REPORT] Sent monthly report to {user.email}")
+            # Same checkpointed path as the scheduled ticks, so reports already
+            # sent this month are not sent again
+            now = datetime.utcnow()
+            totals = {'claimed': 0, 'retried': 0, 'sent': 0, 'failed': 0, 'skipped': 0}
+            while True:
+                results = send_monthly_report_batch(
+                    now, app.config['MONTHLY_REPORT_USERS_PER_TICK'], respect_schedule=False
+                )
+                for key in totals:
+                    totals[key] += results[key]
+                if not results['claimed']:
+                    break
             
+            print(f"[REPORT] Sent {totals['sent']} monthly reports ({totals['failed']} failed)")
             return {
                 'status': 'success',
-                'message': f'Sent {reports_sent} monthly reports'
+                'message': f"Sent {totals['sent']} monthly reports",
+                'failed': totals['failed']
             }
         
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
-@shared_task
-def export_user_scores_csv(user_id):
-    """Export user's scores to CSV and send notification"""
+def send_monthly_report_batch(now, limit, respect_schedule=True):
+    """Claim and send up to limit of last month's outstanding reports
+    
+    Deliveries to retry come first: 'failed' rows with attempts left and
+    'pending' rows whose lease expired because their run crashed. They are
+    claimed again with a conditional UPDATE. The rest of the batch is users
+    with attempts last month and no delivery row for the period, in slot
+    order (see app/utils/report_schedule.py); with respect_schedule only
+    those whose slot has come due at now. Everything is claimed as
+    'pending' on the primary before anything is sent, so an overlapping tick
+    never sends a report twice, then sent through the mailer and marked
+    'sent', 'failed' or 'skipped'.
+    """
+    from flask import current_app
+    from sqlalchemy import update, select
+    from backend.app.models import User, Score, MonthlyReportDelivery
+    from backend.app.database import db, insert_ignore
+    from backend.app.utils.db_routing import use_primary, use_replica, use_snapshot
+    from backend.app.utils.mailer import get_mailer
+    from backend.app.utils.report_schedule import ReportSchedule, monthly_report_period
+    
+    period_start, send_start = monthly_report_period(now)
+    period_end = send_start - timedelta(microseconds=1)
+    schedule = ReportSchedule.from_config(current_app.config)
+    results = {'claimed': 0, 'retried': 0, 'sent': 0, 'failed': 0, 'skipped': 0}
+    
+    if respect_schedule and schedule.current_slot(now, send_start) < 0:
+        return results
+    
+    with use_primary():
+        reclaimable = MonthlyReportDelivery.reclaimable(
+            period_start.date(),
+            now - timedelta(minutes=current_app.config.get('MONTHLY_REPORT_LEASE_MINUTES', 30)),
+            current_app.config.get('MONTHLY_REPORT_MAX_ATTEMPTS', 3)
+        )
+        retry_ids = [row.user_id for row in db.session.query(MonthlyReportDelivery.user_id).filter(
+            reclaimable
+        ).order_by(MonthlyReportDelivery.claimed_at).limit(limit)]
+        # The filter is checked again by the UPDATE, so a concurrent tick cannot take the same rows
+        reclaimed_ids = [row.user_id for row in db.session.execute(
+            update(MonthlyReportDelivery).where(
+                reclaimable, MonthlyReportDelivery.user_id.in_(retry_ids)
+            ).values(
+                status='pending', claimed_at=now, finished_at=None, attempts=MonthlyReportDelivery.attempts + 1
+            ).returning(MonthlyReportDelivery.user_id)
+        )] if retry_ids else []
+        db.session.commit()
+        results['retried'] = len(reclaimed_ids)
+        
+        timezones = []
+        if schedule.mode == 'timezone':
+            timezones = [row[0] for row in db.session.query(User.timezone).filter(
+                User.timezone.isnot(None)
+            ).distinct()]
+        slot = schedule.slot_expression(User.id, User.timezone, timezones, send_start)
+        
+        active = db.session.query(Score.id).filter(
+            Score.user_id == User.id,
+            Score.created_at >= period_start,
+            Score.created_at <= period_end
+        ).exists()
+        claimed_before = db.session.query(MonthlyReportDelivery.user_id).filter(
+            MonthlyReportDelivery.period == period_start.date(),
+            MonthlyReportDelivery.user_id == User.id
+        ).exists()
+        candidates = db.session.query(User.id).filter(active, ~claimed_before)
+        if respect_schedule:
+            candidates = candidates.filter(slot <= schedule.current_slot(now, send_start))
+        candidate_ids = [row.id for row in candidates.order_by(slot, User.id).limit(limit - len(reclaimed_ids))]
+        
+        # Only rows this run inserted are ours; anything else was claimed concurrently
+        claimed_ids = [row.user_id for row in db.session.connection().execute(
+            insert_ignore(MonthlyReportDelivery, ['period', 'user_id']).returning(MonthlyReportDelivery.user_id),
+            [{'period': period_start.date(), 'user_id': user_id, 'status': 'pending', 'claimed_at': now, 'attempts': 1}
+             for user_id in candidate_ids]
+        )] if candidate_ids else []
+        db.session.commit()
+    
+    claimed_ids = reclaimed_ids + claimed_ids
+    results['claimed'] = len(claimed_ids)
+    if not claimed_ids:
+        return results
+    
+    outcomes = {'sent': [], 'failed': []}
+    # The aggregation reads last night's snapshot once it covers the whole month
+    with use_replica(), use_snapshot(covers=send_start):
+        get_mailer().send_batch(
+            iter_monthly_reports(period_start, period_end, user_ids=claimed_ids),
+            render=lambda report: build_monthly_report_email(report[0], report[1], period_start),
+            on_result=lambda report, sent: outcomes['sent' if sent else 'failed'].append(report[0].id)
+        )
+    outcomes['skipped'] = list(set(claimed_ids) - set(outcomes['sent']) - set(outcomes['failed']))
+    
+    finished_at = datetime.utcnow()
+    for status, user_ids in outcomes.items():
+        results[status] = len(user_ids)
+        if user_ids:
+            db.session.execute(
+                update(MonthlyReportDelivery).where(
+                    MonthlyReportDelivery.period == period_start.date(),
+                    MonthlyReportDelivery.user_id.in_(user_ids)
+                ).values(status=status, finished_at=finished_at)
+            )
+    db.session.commit()
+    
+    print(f"[REPORT] {period_start:%Y-%m} slice: sent {results['sent']}, failed {results['failed']}, "
+          f"skipped {results['skipped']} of {results['claimed']} claimed ({results['retried']} retries)")
+    return results
+
+USER_SCORES_CSV_COLUMNS = [
+    'Quiz ID', 'Quiz Title', 'Subject', 'Chapter', 'Date of Quiz', 'Score', 'Percentage',
+    'Passed', 'Attempt Number', 'Time Taken (minutes)', 'Completed Date'
+]
+
+@shared_task(bind=True)
+def export_user_scores_csv(self, user_id, chunk_size=None):
+    """Export user's scores to CSV and send notification
+    
+    Rows come from one joined query streamed with a server-side cursor and are
+    written chunk by chunk (EXPORT_BATCH_SIZE rows unless chunk_size is given),
+    so memory stays flat however long the history is. Progress is published as
+    task state for get_export_status.
+    """
     try:
-        from app import create_app
-        from app.models import User, Score
-        from app.database import db
+        import csv
+        from backend.app import get_worker_app
+        from backend.app.models import User, Score
+        from backend.app.utils.db_routing import use_replica
         
-        app = create_app()
-        with app.app_context():
+        app = get_worker_app()
+        chunk_size = chunk_size or app.config['EXPORT_BATCH_SIZE']
+        with app.app_context(), use_replica():
             user = User.query.get(user_id)
             if not user:
                 return {'status': 'error', 'message': 'User not found'}
             
-            # Get all scores for the user
-            scores = Score.query.filter_by(user_id=user_id).order_by(Score.created_at.desc()).all()
-            
-            # Prepare data for CSV
-            data = []
-            for score in scores:
-                data.append({
-                    'Quiz ID': score.quiz_id,
-                    'Quiz Title': score.quiz.title,
-                    'Subject': score.quiz.chapter.subject.name,
-                    'Chapter': score.quiz.chapter.name,
-                    'Date of Quiz': score.quiz.start_date.strftime('%Y-%m-%d'),
-                    'Score': f"{score.score}/{score.max_score}",
-                    'Percentage': f"{score.percentage}%",
-                    'Passed': 'Yes' if score.passed else 'No',
-                    'Attempt Number': score.attempt_number,
-                    'Time Taken (minutes)': score.time_taken_seconds // 60 if score.time_taken_seconds else 0,
-                    'Completed Date': score.created_at.strftime('%Y-%m-%d %H:%M')
-                })
-            
-            # Create DataFrame and save to CSV
-            df = pd.DataFrame(data)
+            total = Score.query.filter_by(user_id=user_id).count()
             filename = f"user_{user_id}_scores_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
             filepath = os.path.join('exports', filename)
             os.makedirs('exports', exist_ok=True)
             
-            df.to_csv(filepath, index=False)
+            # Written under a temporary name so a half-written file is never picked up
+            partial_path = filepath + '.part'
+            rows = 0
+            try:
+                with open(partial_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f, lineterminator='\n')
+                    writer.writerow(USER_SCORES_CSV_COLUMNS)
+                    for chunk in iter_user_score_rows(user_id, chunk_size):
+                        writer.writerows(chunk)
+                        rows += len(chunk)
+                        self.update_state(state='PROGRESS', meta={
+                            'progress': round(rows * 100 / total) if total else 100,
+                            'rows': rows,
+                            'total': total
+                        })
+                os.replace(partial_path, filepath)
+            finally:
+                # Only still there when the export failed before the rename
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
             
             # Send notification to user
             email_sent = send_export_notification(user, filename, 'user_scores')
@@ -200,13 +478,255 @@ def export_user_scores_csv(user_id):
                 'message': 'CSV exported successfully',
                 'filename': filename,
                 'filepath': filepath,
-                'rows': len(data),
+                'rows': rows,
                 'email_sent': email_sent
             }
             
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
+def iter_user_score_rows(user_id, chunk_size=1000):
+    """Yield a user's scores as lists of CSV rows (USER_SCORES_CSV_COLUMNS), newest first"""
+    from sqlalchemy import select
+    from backend.app.models import Score, Quiz, Chapter, Subject
+    from backend.app.database import db
+    
+    query = select(
+        Score.quiz_id, Quiz.title, Subject.name, Chapter.name, Quiz.start_date,
+        Score.score, Score.max_score, Score.percentage, Score.passed,
+        Score.attempt_number, Score.time_taken_seconds, Score.created_at
+    ).join(Quiz, Quiz.id == Score.quiz_id).join(
+        Chapter, Chapter.id == Quiz.chapter_id
+    ).join(
+        Subject, Subject.id == Chapter.subject_id
+    ).where(Score.user_id == user_id).order_by(Score.created_at.desc())
+    
+    # yield_per streams from a server-side cursor, chunk_size rows at a time
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield [[
+            quiz_id,
+            quiz_title,
+            subject_name,
+            chapter_name,
+            start_date.strftime('%Y-%m-%d') if start_date else '',
+            f"{score}/{max_score}",
+            f"{percentage}%",
+            'Yes' if passed else 'No',
+            attempt_number,
+            time_taken_seconds // 60 if time_taken_seconds else 0,
+            created_at.strftime('%Y-%m-%d %H:%M')
+        ] for (quiz_id, quiz_title, subject_name, chapter_name, start_date, score, max_score,
+               percentage, passed, attempt_number, time_taken_seconds, created_at) in partition]
+
+@shared_task
+def export_analytics_parquet():
+    """Append new scores and flattened answers to the partitioned Parquet analytics dataset"""
+    try:
+        from backend.app import get_worker_app
+        from backend.app.utils.db_routing import use_replica
+        from backend.app.utils.analytics_export import export_analytics
+        
+        app = get_worker_app()
+        with app.app_context(), use_replica():
+            summary = export_analytics(
+                app.config['ANALYTICS_EXPORT_DIR'],
+                batch_size=app.config['ANALYTICS_EXPORT_BATCH_SIZE']
+            )
+            
+            print(f"[ANALYTICS] Exported {summary['scores']} scores and {summary['answers']} answers "
+                  f"(score ids {summary['previous_score_id'] + 1}-{summary['last_score_id']}, {summary['files']} files)")
+            return {'status': 'success', **summary}
+        
+    except Exception as e:
+        print(f"[ANALYTICS ERROR] {e}")
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def generate_monthly_pdf_reports(month=None):
+    """Render PDF score reports for every active user and class reports for every quiz
+
+    month is 'YYYY-MM' and defaults to the month that just closed. Files go to
+    PDF_REPORT_DIR/<month>/users/ and /quizzes/; report data is gathered one
+    query per chunk and the chunks are rendered in a process pool.
+    """
+    try:
+        import time
+        from backend.app import get_worker_app
+        from backend.app.models import Score
+        from backend.app.database import db
+        from backend.app.utils.db_routing import use_replica, use_snapshot
+        from backend.app.utils.report_schedule import monthly_report_period
+        from backend.app.utils.pdf_reports import (
+            month_range, collect_user_reports, collect_quiz_reports, render_report_files
+        )
+        
+        if month:
+            start_date, end_date = month_range(month)
+        else:
+            start_date, end_date = monthly_report_period(datetime.utcnow())
+            month = start_date.strftime('%Y-%m')
+        
+        app = get_worker_app()
+        output_dir = os.path.join(app.config['PDF_REPORT_DIR'], month)
+        chunk_size = app.config['PDF_REPORT_CHUNK_SIZE']
+        workers = app.config['PDF_REPORT_WORKERS']
+        
+        def chunks(column, collect):
+            ids = [row[0] for row in db.session.query(column).filter(
+                Score.created_at >= start_date,
+                Score.created_at < end_date
+            ).distinct().order_by(column).all()]
+            for i in range(0, len(ids), chunk_size):
+                yield collect(ids[i:i + chunk_size], start_date, end_date)
+        
+        started = time.perf_counter()
+        with app.app_context(), use_replica(), use_snapshot(covers=end_date):
+            users = render_report_files(
+                'user', chunks(Score.user_id, collect_user_reports), os.path.join(output_dir, 'users'), workers
+            )
+            quizzes = render_report_files(
+                'quiz', chunks(Score.quiz_id, collect_quiz_reports), os.path.join(output_dir, 'quizzes'), workers
+            )
+        elapsed = time.perf_counter() - started
+        
+        print(f"[REPORT] Rendered {users} user and {quizzes} quiz PDF reports for {month} "
+              f"in {elapsed:.1f}s ({workers} workers)")
+        return {
+            'status': 'success',
+            'month': month,
+            'user_reports': users,
+            'quiz_reports': quizzes,
+            'output_dir': output_dir,
+            'seconds': round(elapsed, 1)
+        }
+        
+    except Exception as e:
+        print(f"[REPORT ERROR] PDF reports failed: {e}")
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task(bind=True)
+def regrade_quiz_scores(self, job_id):
+    """Regrade a quiz's scores against its current answer key, resuming from the job checkpoint"""
+    try:
+        from backend.app import get_worker_app
+        from backend.app.database import db
+        from backend.app.models import RegradeJob
+        from backend.app.utils.db_routing import SNAPSHOT_BIND_KEY
+        from backend.app.utils.regrade import run_regrade
+        
+        app = get_worker_app()
+        with app.app_context():
+            # resume_regrade_jobs may queue a job twice; only the worker that claims it runs it
+            if not RegradeJob.claim(job_id):
+                return {'status': 'skipped', 'job_id': job_id}
+            job = db.session.get(RegradeJob, job_id)
+            
+            def report(job):
+                self.update_state(state='PROGRESS', meta={
+                    'progress': job.progress,
+                    'processed': job.processed,
+                    'total': job.total_scores,
+                    'changed': job.changed
+                })
+            
+            try:
+                run_regrade(job, app.config['REGRADE_CHUNK_SIZE'], on_progress=report)
+            except Exception as e:
+                db.session.rollback()
+                job.status = 'failed'
+                job.error = str(e)
+                job.updated_at = datetime.utcnow()
+                db.session.commit()
+                raise
+            
+            print(f"[REGRADE] Quiz {job.quiz_id}: regraded {job.processed} scores, {job.changed} changed")
+            
+            # Leaderboard and trend facts in the analytics snapshot are built from scores
+            if job.changed and SNAPSHOT_BIND_KEY in db.engines:
+                build_analytics_snapshot.delay()
+            
+            return {'status': 'success', **job.to_dict()}
+        
+    except Exception as e:
+        print(f"[REGRADE ERROR] Job {job_id}: {e}")
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def resume_regrade_jobs(stale_minutes=10):
+    """Requeue regrade jobs that were never picked up or whose worker stopped mid-run
+    
+    A job that is only waiting in the queue may be queued again; the worker
+    that claims it first runs it and the other skips it.
+    """
+    try:
+        from backend.app import get_worker_app
+        from backend.app.models import RegradeJob
+        
+        app = get_worker_app()
+        with app.app_context():
+            stale = RegradeJob.query.filter(
+                RegradeJob.status.in_(RegradeJob.UNFINISHED),
+                RegradeJob.updated_at < datetime.utcnow() - timedelta(minutes=stale_minutes)
+            ).all()
+            for job in stale:
+                regrade_quiz_scores.delay(job.id)
+            
+            if stale:
+                print(f"[REGRADE] Resumed {len(stale)} stalled regrade jobs")
+            return {'status': 'success', 'resumed': [job.id for job in stale]}
+        
+    except Exception as e:
+        print(f"[REGRADE ERROR] Resume failed: {e}")
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def pack_score_answers(after_id=0):
+    """Convert JSON answer maps of stored scores to the packed binary encoding"""
+    try:
+        from backend.app import get_worker_app
+        from backend.app.utils.answer_encoding import pack_legacy_answers, storage_stats
+        
+        app = get_worker_app()
+        with app.app_context():
+            summary = pack_legacy_answers(after_id, batch_size=app.config['ANSWER_PACK_BATCH_SIZE'])
+            stats = storage_stats()
+            
+            saved = summary['json_bytes'] - summary['packed_bytes']
+            print(f"[ANSWERS] Packed {summary['packed']} of {summary['scanned']} scores "
+                  f"({summary['kept_json']} kept as JSON), {saved / 1024 / 1024:.1f} MB saved; "
+                  f"now {stats['packed_scores']} packed ({stats['packed_bytes']} bytes), "
+                  f"{stats['json_scores']} JSON ({stats['json_bytes']} bytes)")
+            return {'status': 'success', **summary, 'storage': stats}
+        
+    except Exception as e:
+        print(f"[ANSWERS ERROR] {e}")
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def build_analytics_snapshot():
+    """Rebuild the read-only analytics snapshot that reporting queries can opt into"""
+    try:
+        from backend.app import get_worker_app
+        from backend.app.database import db
+        from backend.app.utils.db_routing import SNAPSHOT_BIND_KEY, snapshot_path
+        from backend.app.utils.analytics_snapshot import build_snapshot
+        
+        app = get_worker_app()
+        with app.app_context():
+            snapshot_engine = db.engines.get(SNAPSHOT_BIND_KEY)
+            if snapshot_engine is None:
+                return {'status': 'skipped', 'message': 'ANALYTICS_SNAPSHOT_PATH is not configured'}
+            
+            summary = build_snapshot(db.engines[None], snapshot_path(snapshot_engine))
+            print(f"[ANALYTICS] Snapshot built: {summary['size_mb']} MB, "
+                  f"{summary['daily_facts']} daily facts, {summary['user_facts']} user facts")
+            return {'status': 'success', **summary}
+        
+    except Exception as e:
+        print(f"[ANALYTICS ERROR] Snapshot build failed: {e}")
+        return {'status': 'error', 'message': str(e)}
+
 def create_daily_reminder_message(user, available_quizzes):
     """Create a formatted message for daily reminders"""
     message = {
@@ -246,6 +766,8 @@ def create_daily_reminder_message(user, available_quizzes):
 def send_google_chat_notification(webhook_url, message):
     """Send notification to Google Chat"""
     try:
+        import requests
+        
         response = requests.post(
             webhook_url,
             json=message,
@@ -256,91 +778,150 @@ def send_google_chat_notification(webhook_url, message):
         print(f"Failed to send Google Chat notification: {e}")
         return False
 
-def generate_user_monthly_report(user_id, start_date, end_date):
-    """Generate comprehensive monthly report data for a user"""
-    from app.models import Score
+def iter_monthly_reports(start_date, end_date, user_id=None, batch_size=1000, user_ids=None):
+    """Yield (user, report_data) for every user with attempts in the period
     
-    scores = Score.query.filter(
-        Score.user_id == user_id,
-        Score.created_at >= start_date,
-        Score.created_at <= end_date
-    ).all()
+    Totals, per-subject averages and the 10 most recent attempts come from
+    three grouped queries ordered by user id, streamed with yield_per and
+    merged here, so the run issues a fixed number of queries and holds one
+    user's report in memory at a time. user is a row with id, email,
+    username and full_name. user_ids limits the run to a slice of users.
+    """
+    from sqlalchemy import func, case, select
+    from backend.app.models import User, Score, Quiz, Chapter, Subject
+    from backend.app.database import db
     
-    if not scores:
-        return {
-            'total_attempts': 0,
-            'average_score': 0,
-            'passed_count': 0,
-            'failed_count': 0,
-            'top_subjects': [],
-            'recent_activity': []
-        }
+    in_period = [Score.created_at >= start_date, Score.created_at <= end_date]
+    if user_id is not None:
+        in_period.append(Score.user_id == user_id)
+    if user_ids is not None:
+        in_period.append(Score.user_id.in_(user_ids))
     
-    # Calculate statistics
-    avg_score = sum(s.percentage for s in scores) / len(scores)
-    passed_count = sum(1 for s in scores if s.passed)
-    
-    # Get top subjects
-    subject_scores = {}
-    for score in scores:
-        subject = score.quiz.chapter.subject.name
-        if subject not in subject_scores:
-            subject_scores[subject] = []
-        subject_scores[subject].append(score.percentage)
-    
-    top_subjects = []
-    for subject, percentages in subject_scores.items():
-        avg_percentage = sum(percentages) / len(percentages)
-        top_subjects.append({
-            'name': subject,
-            'average': avg_percentage,
-            'attempts': len(percentages)
-        })
+    totals = db.session.query(
+        User.id, User.email, User.username, User.full_name,
+        func.count(Score.id).label('total_attempts'),
+        func.avg(Score.percentage).label('average_score'),
+        func.sum(case((Score.passed == True, 1), else_=0)).label('passed_count')
+    ).join(Score, Score.user_id == User.id).filter(*in_period).group_by(
+        User.id, User.email, User.username, User.full_name
+    ).order_by(User.id).yield_per(batch_size)
     
-    top_subjects.sort(key=lambda x: x['average'], reverse=True)
+    subjects = db.session.query(
+        Score.user_id,
+        Subject.name,
+        func.avg(Score.percentage).label('average'),
+        func.count(Score.id).label('attempts')
+    ).join(Quiz, Quiz.id == Score.quiz_id).join(
+        Chapter, Chapter.id == Quiz.chapter_id
+    ).join(
+        Subject, Subject.id == Chapter.subject_id
+    ).filter(*in_period).group_by(
+        Score.user_id, Subject.id, Subject.name
+    ).order_by(Score.user_id).yield_per(batch_size)
+    
+    ranked = select(
+        Score.user_id.label('user_id'),
+        Quiz.title.label('quiz_title'),
+        Score.percentage.label('percentage'),
+        Score.created_at.label('created_at'),
+        func.row_number().over(
+            partition_by=Score.user_id,
+            order_by=(Score.created_at.desc(), Score.id.desc())
+        ).label('position')
+    ).join(Quiz, Quiz.id == Score.quiz_id).where(*in_period).subquery()
+    recent = db.session.query(ranked).filter(ranked.c.position <= 10).order_by(
+        ranked.c.user_id, ranked.c.position
+    ).yield_per(batch_size)
+    
+    subject_rows = _group_rows_by_user(subjects)
+    recent_rows = _group_rows_by_user(recent)
+    subject_user, subject_group = next(subject_rows, (None, []))
+    recent_user, recent_group = next(recent_rows, (None, []))
+    
+    # All three streams are ordered by user id; advance the side streams in step
+    for user in totals:
+        user_subjects, user_recent = [], []
+        while subject_user is not None and subject_user <= user.id:
+            if subject_user == user.id:
+                user_subjects = subject_group
+            subject_user, subject_group = next(subject_rows, (None, []))
+        while recent_user is not None and recent_user <= user.id:
+            if recent_user == user.id:
+                user_recent = recent_group
+            recent_user, recent_group = next(recent_rows, (None, []))
+        
+        top_subjects = sorted(
+            ({'name': row.name, 'average': float(row.average), 'attempts': row.attempts} for row in user_subjects),
+            key=lambda x: x['average'],
+            reverse=True
+        )
+        passed_count = int(user.passed_count or 0)
+        
+        yield user, {
+            'total_attempts': user.total_attempts,
+            'average_score': float(user.average_score or 0),
+            'passed_count': passed_count,
+            'failed_count': user.total_attempts - passed_count,
+            'top_subjects': top_subjects[:5],
+            'recent_activity': [{
+                'quiz_title': row.quiz_title,
+                'percentage': row.percentage,
+                'created_at': row.created_at
+            } for row in user_recent]
+        }
+
+def _group_rows_by_user(rows):
+    """Group a user-id-ordered row stream into (user_id, [rows]) pairs"""
+    current_user, group = None, []
+    for row in rows:
+        if row.user_id != current_user and group:
+            yield current_user, group
+            group = []
+        current_user = row.user_id
+        group.append(row)
+    if group:
+        yield current_user, group
+
+def generate_user_monthly_report(user_id, start_date, end_date):
+    """Generate comprehensive monthly report data for a user"""
+    for _, report_data in iter_monthly_reports(start_date, end_date, user_id=user_id):
+        return report_data
     
     return {
-        'total_attempts': len(scores),
-        'average_score': avg_score,
-        'passed_count': passed_count,
-        'failed_count': len(scores) - passed_count,
-        'top_subjects': top_subjects[:5],
-        'recent_activity': scores[:10],
-        'scores': scores
+        'total_attempts': 0,
+        'average_score': 0,
+        'passed_count': 0,
+        'failed_count': 0,
+        'top_subjects': [],
+        'recent_activity': []
     }
 
+def build_monthly_report_email(user, report_data, month_date):
+    """Build the monthly report email for a user"""
+    # Create HTML report
+    html_content = create_monthly_report_html(user, report_data, month_date)
+    
+    # Create email
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f'Monthly Quiz Report - {month_date.strftime("%B %Y")}'
+    msg['To'] = user.email
+    
+    html_part = MIMEText(html_content, 'html')
+    msg.attach(html_part)
+    return msg
+
 def send_monthly_report_email(user, report_data, month_date):
     """Send monthly report via email"""
     try:
-        # Email configuration
-        smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        smtp_username = os.getenv('SMTP_USERNAME', '')
-        smtp_password = os.getenv('SMTP_PASSWORD', '')
+        from backend.app.utils.mailer import get_mailer
         
-        if not all([smtp_username, smtp_password]):
+        mailer = get_mailer()
+        if not mailer.configured:
             print("SMTP credentials not configured")
             return False
         
-        # Create HTML report
-        html_content = create_monthly_report_html(user, report_data, month_date)
-        
-        # Create email
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f'Monthly Quiz Report - {month_date.strftime("%B %Y")}'
-        msg['From'] = smtp_username
-        msg['To'] = user.email
-        
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
-        
-        return True
+        # Send email on a pooled connection
+        return mailer.send(build_monthly_report_email(user, report_data, month_date))
         
     except Exception as e:
         print(f"Failed to send monthly report email: {e}")
@@ -348,75 +929,11 @@ def send_monthly_report_email(user, report_data, month_date):
 
 def create_monthly_report_html(user, report_data, month_date):
     """Create HTML content for monthly report"""
-    template = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; }
-            .header { background: #3498db; color: white; padding: 20px; text-align: center; }
-            .stats { display: flex; justify-content: space-around; margin: 20px 0; }
-            .stat-box { background: #f8f9fa; padding: 15px; border-radius: 5px; text-align: center; }
-            .subject-list { margin: 20px 0; }
-            .subject-item { background: #e9ecef; padding: 10px; margin: 5px 0; border-radius: 3px; }
-            .activity-list { margin: 20px 0; }
-            .activity-item { border-bottom: 1px solid #ddd; padding: 10px 0; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Monthly Quiz Report</h1>
-            <p>{{ month_name }} {{ year }}</p>
-        </div>
-        
-        <h2>Hello {{ user_name }}!</h2>
-        <p>Here's your quiz activity summary for {{ month_name }} {{ year }}:</p>
-        
-        <div class="stats">
-            <div class="stat-box">
-                <h3>{{ total_attempts }}</h3>
-                <p>Total Attempts</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ average_score }}%</h3>
-                <p>Average Score</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ passed_count }}</h3>
-                <p>Passed Quizzes</p>
-            </div>
-        </div>
-        
-        {% if top_subjects %}
-        <h3>Top Performing Subjects</h3>
-        <div class="subject-list">
-            {% for subject in top_subjects %}
-            <div class="subject-item">
-                <strong>{{ subject.name }}</strong> - {{ subject.average }}% ({{ subject.attempts }} attempts)
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-        
-        {% if recent_activity %}
-        <h3>Recent Activity</h3>
-        <div class="activity-list">
-            {% for score in recent_activity %}
-            <div class="activity-item">
-                <strong>{{ score.quiz.title }}</strong> - {{ score.percentage }}% 
-                ({{ score.created_at.strftime('%Y-%m-%d') }})
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-        
-        <p>Keep up the great work! Continue practicing to improve your scores.</p>
-    </body>
-    </html>
-    """
+    from backend.app.utils.templates import render_template
     
-    jinja_template = Template(template)
-    return jinja_template.render(
+    # Compiled once per process from app/templates/email/monthly_report.html
+    return render_template(
+        'email/monthly_report.html',
         user_name=user.full_name or user.username,
         month_name=month_date.strftime('%B'),
         year=month_date.year,
@@ -430,13 +947,15 @@ def create_monthly_report_html(user, report_data, month_date):
 def send_export_notification(user, filename, export_type):
     """Send notification to user about completed export"""
     try:
+        from backend.app.utils.mailer import get_mailer
+        from backend.app.utils.templates import render_template
+        
         # Send email notification
-        smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        smtp_username = os.getenv('SMTP_USERNAME', '')
-        smtp_password = os.getenv('SMTP_PASSWORD', '')
+        mailer = get_mailer()
+        smtp_username = mailer.pool.username
+        smtp_password = mailer.pool.password
         
-        print(f"SMTP Configuration - Server: {smtp_server}, Port: {smtp_port}")
+        print(f"SMTP Configuration - Server: {mailer.pool.host}, Port: {mailer.pool.port}")
         print(f"SMTP Username: {'SET' if smtp_username else 'NOT SET'}")
         print(f"SMTP Password: {'SET' if smtp_password else 'NOT SET'}")
         
@@ -450,30 +969,20 @@ def send_export_notification(user, filename, export_type):
         
         msg = MIMEMultipart()
         msg['Subject'] = 'Quiz Export Completed'
-        msg['From'] = smtp_username
         msg['To'] = user.email
         
-        body = f"""
-        Hello {user.full_name or user.username},
-        
-        Your quiz export has been completed successfully!
-        
-        File: {filename}
-        Export Type: {export_type}
-        
-        The file has been saved to the server and is available for download.
-        
-        Best regards,
-        Quiz Master Team
-        """
+        body = render_template(
+            'email/export_completed.txt',
+            user_name=user.full_name or user.username,
+            filename=filename,
+            export_type=export_type
+        )
         
         msg.attach(MIMEText(body, 'plain'))
         
         print(f"Attempting to send email to {user.email}")
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
+        if not mailer.send(msg):
+            return False
         
         print(f"Email sent successfully to {user.email}")
         return True
@@ -484,8 +993,8 @@ def send_export_notification(user, filename, export_type):
 
 def generate_user_report(user_id, start_date, end_date):
     """Generate user performance report data"""
-    from app.models import Score
-    from app.database import db
+    from backend.app.models import Score
+    from backend.app.database import db
     
     scores = Score.query.filter(
         Score.user_id == user_id,
@@ -16,7 +16,115 @@ class Config:
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_DATABASE_URI = database_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # Read replica (optional) - GET requests and reporting tasks read from it
+    replica_url = os.getenv('REPLICA_DATABASE_URL', '')
+    if replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {'replica': replica_url} if replica_url else {}
+    READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
+    REPLICA_HEALTH_CHECK_SECONDS = int(os.getenv('REPLICA_HEALTH_CHECK_SECONDS', '30'))
+
+    # Analytics snapshot (optional) - nightly read-only SQLite copy with fact tables that
+    # leaderboards, dashboard trends and monthly reports read instead of the live scores
+    ANALYTICS_SNAPSHOT_PATH = os.getenv('ANALYTICS_SNAPSHOT_PATH', '')
+    if ANALYTICS_SNAPSHOT_PATH:
+        SQLALCHEMY_BINDS['analytics'] = f'sqlite:///file:{ANALYTICS_SNAPSHOT_PATH}?mode=ro&uri=true'
+    ANALYTICS_SNAPSHOT_MAX_AGE_HOURS = int(os.getenv('ANALYTICS_SNAPSHOT_MAX_AGE_HOURS', '36'))
+
+    # SQL instrumentation - strict mode fails requests over budget (use in tests)
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'true').lower() == 'true'
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))
+    SQL_STRICT_MODE = os.getenv('SQL_STRICT_MODE', 'false').lower() == 'true'
+    SQL_MAX_QUERIES_PER_REQUEST = int(os.getenv('SQL_MAX_QUERIES_PER_REQUEST', '50'))
+
+    # Slow query log (0 disables) - viewable at /api/admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '200'))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+
+    # Startup - schema creation at boot is opt-in (otherwise run init_database.py)
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'false').lower() == 'true'
+    STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'false').lower() == 'true'
+
+    # Daily reminders - users per shard task and shards processed at once
+    REMINDER_SHARD_SIZE = int(os.getenv('REMINDER_SHARD_SIZE', '5000'))
+    REMINDER_SHARD_CONCURRENCY = int(os.getenv('REMINDER_SHARD_CONCURRENCY', '4'))
+
+    # Audience of new-quiz broadcasts: 'all' or 'subject_followers'
+    NEW_QUIZ_BROADCAST_AUDIENCE = os.getenv('NEW_QUIZ_BROADCAST_AUDIENCE', 'all')
+
+    # Email - pooled SMTP connections shared by report and export emails
+    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+    SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '4'))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+    SMTP_MAX_RETRIES = int(os.getenv('SMTP_MAX_RETRIES', '3'))
+    SMTP_RETRY_BACKOFF_SECONDS = float(os.getenv('SMTP_RETRY_BACKOFF_SECONDS', '0.5'))
+    MAIL_RENDER_WORKERS = int(os.getenv('MAIL_RENDER_WORKERS', '2'))
+
+    # CSV exports (streamed downloads and the user scores export task) - rows fetched per batch
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # Analytics export - Parquet dataset of scores/answers, appended past a watermark
+    ANALYTICS_EXPORT_DIR = os.getenv('ANALYTICS_EXPORT_DIR', os.path.join('exports', 'analytics'))
+    ANALYTICS_EXPORT_BATCH_SIZE = int(os.getenv('ANALYTICS_EXPORT_BATCH_SIZE', '50000'))
+
+    # Packed answer encoding - scores converted per batch by the pack_score_answers task
+    ANSWER_PACK_BATCH_SIZE = int(os.getenv('ANSWER_PACK_BATCH_SIZE', '5000'))
+
+    # Group commit (optional) - submissions are queued and committed together, one
+    # transaction per GROUP_COMMIT_MAX_BATCH submissions or GROUP_COMMIT_INTERVAL_MS
+    GROUP_COMMIT_ENABLED = os.getenv('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv('GROUP_COMMIT_MAX_BATCH', '64'))
+    GROUP_COMMIT_INTERVAL_MS = int(os.getenv('GROUP_COMMIT_INTERVAL_MS', '5'))
+    GROUP_COMMIT_QUEUE_SIZE = int(os.getenv('GROUP_COMMIT_QUEUE_SIZE', '1000'))
+    GROUP_COMMIT_WAIT_SECONDS = int(os.getenv('GROUP_COMMIT_WAIT_SECONDS', '30'))
+
+    # Admission control (optional) - concurrent requests per route priority class and
+    # per process (0 = no limit); requests that cannot queue are served stale or get a 503
+    ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'false').lower() == 'true'
+    ADMISSION_CRITICAL_CONCURRENCY = int(os.getenv('ADMISSION_CRITICAL_CONCURRENCY', '0'))
+    ADMISSION_CRITICAL_QUEUE = int(os.getenv('ADMISSION_CRITICAL_QUEUE', '0'))
+    ADMISSION_NORMAL_CONCURRENCY = int(os.getenv('ADMISSION_NORMAL_CONCURRENCY', '16'))
+    ADMISSION_NORMAL_QUEUE = int(os.getenv('ADMISSION_NORMAL_QUEUE', '32'))
+    ADMISSION_LOW_CONCURRENCY = int(os.getenv('ADMISSION_LOW_CONCURRENCY', '4'))
+    ADMISSION_LOW_QUEUE = int(os.getenv('ADMISSION_LOW_QUEUE', '8'))
+    ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', '500'))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+    ADMISSION_STALE_MAX_AGE_SECONDS = int(os.getenv('ADMISSION_STALE_MAX_AGE_SECONDS', '300'))
+    ADMISSION_STALE_CACHE_SIZE = int(os.getenv('ADMISSION_STALE_CACHE_SIZE', '1000'))
+
+    # Regrades after an answer key fix - scores read and updated per chunk
+    REGRADE_CHUNK_SIZE = int(os.getenv('REGRADE_CHUNK_SIZE', '2000'))
+
+    # PDF reports - monthly batches render chunks of reports in a process pool
+    PDF_REPORT_DIR = os.getenv('PDF_REPORT_DIR', os.path.join('exports', 'reports'))
+    PDF_REPORT_WORKERS = int(os.getenv('PDF_REPORT_WORKERS') or os.cpu_count() or 1)
+    PDF_REPORT_CHUNK_SIZE = int(os.getenv('PDF_REPORT_CHUNK_SIZE', '200'))
+
+    # Monthly reports - delivered in slots after the month closes instead of one burst.
+    # 'hash' spreads users over the UTC window; 'timezone' sends at the local hour (+ jitter).
+    # The window must end by day 3, when the ticks stop.
+    MONTHLY_REPORT_SCHEDULE = os.getenv('MONTHLY_REPORT_SCHEDULE', 'hash')
+    MONTHLY_REPORT_WINDOW_START_HOUR = int(os.getenv('MONTHLY_REPORT_WINDOW_START_HOUR', '9'))
+    MONTHLY_REPORT_WINDOW_HOURS = int(os.getenv('MONTHLY_REPORT_WINDOW_HOURS', '12'))
+    MONTHLY_REPORT_LOCAL_HOUR = int(os.getenv('MONTHLY_REPORT_LOCAL_HOUR', '9'))
+    MONTHLY_REPORT_JITTER_MINUTES = int(os.getenv('MONTHLY_REPORT_JITTER_MINUTES', '60'))
+    MONTHLY_REPORT_TICK_MINUTES = int(os.getenv('MONTHLY_REPORT_TICK_MINUTES', '5'))
+    MONTHLY_REPORT_USERS_PER_TICK = int(os.getenv('MONTHLY_REPORT_USERS_PER_TICK', '500'))
+    # Claims still 'pending' after the lease are taken to be from a crashed run and sent again;
+    # failed sends are retried on later ticks up to MONTHLY_REPORT_MAX_ATTEMPTS in total
+    MONTHLY_REPORT_LEASE_MINUTES = int(os.getenv('MONTHLY_REPORT_LEASE_MINUTES', '30'))
+    MONTHLY_REPORT_MAX_ATTEMPTS = int(os.getenv('MONTHLY_REPORT_MAX_ATTEMPTS', '3'))
+
+    # Email/report templates - compiled once per process; bytecode cache dir is optional
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv('TEMPLATE_BYTECODE_CACHE_DIR', '')
+    TEMPLATE_AUTO_RELOAD = os.getenv('TEMPLATE_AUTO_RELOAD', 'false').lower() == 'true'
+
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
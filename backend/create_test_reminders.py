@@ -5,16 +5,16 @@ Script to create test reminders for users
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app
-from app.models import User, Reminder
-from app.database import db
+from backend.app import create_worker_app
+from backend.app.models import User, Reminder
+from backend.app.database import db
 from datetime import datetime
 
 def create_test_reminders():
     """Create test reminders for users"""
-    app = create_app()
+    app = create_worker_app()
     with app.app_context():
         print("Creating test reminders...")
         print("=" * 50)
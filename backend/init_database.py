@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Script to create missing tables and the default admin.
+Run it once per deploy; the web app no longer does this at boot unless
+AUTO_CREATE_SCHEMA=true.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_worker_app
+from backend.app.utils.init_db import init_database
+
+if __name__ == "__main__":
+    app = create_worker_app()
+    with app.app_context():
+        init_database()
+        print("Database initialized")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Migration script to add broadcast notifications and subject followers
+Run this to create the broadcast, receipt, follower and read state tables
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import BroadcastNotification, BroadcastReceipt, ReminderReadState, SubjectFollower
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[
+            SubjectFollower.__table__,
+            BroadcastNotification.__table__,
+            BroadcastReceipt.__table__,
+            ReminderReadState.__table__
+        ])
+
+        print("✅ Broadcast notification tables created successfully!")
+
+if __name__ == '__main__':
+    run_migration()
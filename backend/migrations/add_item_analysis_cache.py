@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Migration script for the item analysis cache
+Run this to add the table holding per-quiz item analysis totals
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import ItemAnalysisCache
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[ItemAnalysisCache.__table__])
+
+        print("✅ Item analysis cache migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
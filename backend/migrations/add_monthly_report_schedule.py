@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration script for scheduled monthly report delivery
+Run this to add users.timezone and the monthly report delivery checkpoint table
+(with its attempts column, also added to an existing table)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import MonthlyReportDelivery
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import text, inspect
+
+        existing_columns = {column['name'] for column in inspect(db.engine).get_columns('users')}
+
+        # Users without a time zone are scheduled by user-id hash
+        if 'timezone' not in existing_columns:
+            with db.engine.connect() as conn:
+                conn.execute(text("""
+                    ALTER TABLE users ADD COLUMN timezone VARCHAR(50)
+                """))
+                conn.commit()
+
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[MonthlyReportDelivery.__table__])
+
+        # Send attempts per delivery, for retries of failed and crashed sends
+        delivery_columns = {column['name'] for column in inspect(db.engine).get_columns('monthly_report_deliveries')}
+        if 'attempts' not in delivery_columns:
+            with db.engine.connect() as conn:
+                conn.execute(text("""
+                    ALTER TABLE monthly_report_deliveries ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1
+                """))
+                conn.commit()
+
+        print("✅ Monthly report schedule migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
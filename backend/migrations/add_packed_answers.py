@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Migration script for the packed answer encoding
+Run this to add answer_layouts and the packed answer columns on scores.
+Existing JSON answers keep working; convert them in the background with the
+pack_score_answers Celery task, or inline with --convert.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import AnswerLayout
+
+def run_migration(convert=False):
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import text, inspect
+
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[AnswerLayout.__table__])
+
+        existing_columns = {column['name'] for column in inspect(db.engine).get_columns('scores')}
+        binary_type = db.LargeBinary().compile(dialect=db.engine.dialect)
+        with db.engine.connect() as conn:
+            if 'answers_packed' not in existing_columns:
+                conn.execute(text(f"ALTER TABLE scores ADD COLUMN answers_packed {binary_type}"))
+            if 'answer_layout_id' not in existing_columns:
+                conn.execute(text("ALTER TABLE scores ADD COLUMN answer_layout_id INTEGER REFERENCES answer_layouts(id)"))
+            conn.commit()
+
+        print("✅ Packed answers migration completed successfully!")
+
+        if convert:
+            from backend.app.utils.answer_encoding import pack_legacy_answers
+            summary = pack_legacy_answers(batch_size=app.config['ANSWER_PACK_BATCH_SIZE'])
+            print(f"✅ Packed {summary['packed']} of {summary['scanned']} scores: "
+                  f"{summary['json_bytes']} JSON bytes -> {summary['packed_bytes']} packed bytes")
+
+if __name__ == '__main__':
+    run_migration(convert='--convert' in sys.argv)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Migration script for live answer-option counters
+Run this to add question_option_counts and fill it from the existing scores
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db, insert_or_increment
+from backend.app.models import Question, Score, QuestionOptionCount
+
+BATCH_SIZE = 5000
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import select
+
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[QuestionOptionCount.__table__])
+
+        if db.session.query(QuestionOptionCount.question_id).first() is not None:
+            print("✅ question_option_counts already populated, nothing to backfill")
+            return
+
+        questions_by_quiz = {}
+        for question in Question.query.filter_by(is_active=True).all():
+            questions_by_quiz.setdefault(question.quiz_id, []).append(question)
+
+        # One pass over the scores, in id order, counting each batch in memory
+        upsert = insert_or_increment(QuestionOptionCount, ['question_id', 'answer'], ['count'])
+        query = select(
+            Score.quiz_id, Score.answers, Score.answers_packed, Score.answer_layout_id
+        ).order_by(Score.id).execution_options(yield_per=BATCH_SIZE)
+        scores = 0
+        for batch in db.session.execute(query).partitions():
+            by_quiz = {}
+            for row in batch:
+                by_quiz.setdefault(row.quiz_id, []).append(
+                    Score.parse_answers(row.answers, row.answers_packed, row.answer_layout_id)
+                )
+            rows = []
+            for quiz_id, answer_maps in by_quiz.items():
+                rows.extend(QuestionOptionCount.count_rows(quiz_id, questions_by_quiz.get(quiz_id, []), answer_maps))
+            if rows:
+                db.session.execute(upsert, rows)
+            scores += len(batch)
+        db.session.commit()
+
+        print(f"✅ Answer option counters migration completed successfully! ({scores} scores counted)")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the structured dedup key to reminders
+Run this to add entity_id / reminder_date and the unique dedup index
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import text, inspect
+
+        existing_columns = {column['name'] for column in inspect(db.engine).get_columns('reminders')}
+
+        with db.engine.connect() as conn:
+            if 'entity_id' not in existing_columns:
+                conn.execute(text("""
+                    ALTER TABLE reminders ADD COLUMN entity_id INTEGER NOT NULL DEFAULT 0
+                """))
+
+            # Existing reminders keep a NULL day, so they never collide with new ones
+            if 'reminder_date' not in existing_columns:
+                conn.execute(text("""
+                    ALTER TABLE reminders ADD COLUMN reminder_date DATE
+                """))
+
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_reminders_dedup
+                ON reminders(user_id, reminder_type, entity_id, reminder_date)
+            """))
+
+            conn.commit()
+
+        print("✅ Reminder dedup key added successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the indexes used by set-based daily reminder generation
+Run this to create the indexes on an existing database
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import text
+        
+        with db.engine.connect() as conn:
+            # Recent activity per user and attempts per user/quiz
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_scores_user_created ON scores(user_id, created_at)
+            """))
+            
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_scores_quiz_user ON scores(quiz_id, user_id)
+            """))
+            
+            # Existing reminders of a type for a user today
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_reminders_user_type_created ON reminders(user_id, reminder_type, created_at)
+            """))
+            
+            conn.commit()
+        
+        print("✅ Reminder query indexes created successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Migration script to add per-user reminder read cursors and counters
+Run this to create reminder_read_states (or add the reminder cursor and
+counters to the one add_broadcast_notifications.py created) and backfill it
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import ReminderReadState
+
+def run_migration():
+    app = create_worker_app()
+    with app.app_context():
+        from sqlalchemy import text, inspect
+        
+        # create_all skips tables that already exist
+        db.metadata.create_all(bind=db.engine, tables=[ReminderReadState.__table__])
+        
+        # A table created by add_broadcast_notifications.py only has the broadcast cursor
+        existing_columns = {column['name'] for column in inspect(db.engine).get_columns('reminder_read_states')}
+        added_columns = [name for name in ('last_read_reminder_id', 'total_count', 'unread_count')
+                         if name not in existing_columns]
+        
+        with db.engine.connect() as conn:
+            for name in added_columns:
+                conn.execute(text(f"""
+                    ALTER TABLE reminder_read_states ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0
+                """))
+            
+            # Rows written before the counters existed are counted from reminders
+            if added_columns:
+                conn.execute(text("""
+                    UPDATE reminder_read_states SET
+                        total_count = (SELECT COUNT(*) FROM reminders
+                                       WHERE reminders.user_id = reminder_read_states.user_id),
+                        unread_count = (SELECT COUNT(*) FROM reminders
+                                        WHERE reminders.user_id = reminder_read_states.user_id
+                                        AND NOT reminders.is_read)
+                """))
+            
+            # One row per user with reminders; users that already have a row keep it
+            conn.execute(text("""
+                INSERT INTO reminder_read_states
+                    (user_id, last_read_reminder_id, last_read_broadcast_id, total_count, unread_count, updated_at)
+                SELECT user_id, 0, 0, COUNT(*), SUM(CASE WHEN is_read THEN 0 ELSE 1 END), CURRENT_TIMESTAMP
+                FROM reminders
+                WHERE user_id NOT IN (SELECT user_id FROM reminder_read_states)
+                GROUP BY user_id
+            """))
+            
+            conn.commit()
+            
+            # Cursors need ids that are never reused (add_reminders_table.py creates it that way)
+            if db.engine.dialect.name == 'sqlite':
+                table_sql = conn.execute(text(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'reminders'"
+                )).scalar() or ''
+                if 'AUTOINCREMENT' not in table_sql.upper():
+                    print("⚠️  reminders table has no AUTOINCREMENT; ids of deleted reminders can be reused")
+        
+        print("✅ Reminder read state table created and backfilled successfully!")
+
+if __name__ == '__main__':
+    run_migration()
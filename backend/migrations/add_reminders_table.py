@@ -5,13 +5,13 @@ Run this to create the reminders table in your database
 """
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app import create_app
-from app.database import db
+from backend.app import create_worker_app
+from backend.app.database import db
 
 def run_migration():
-    app = create_app()
+    app = create_worker_app()
     with app.app_context():
         # Create reminders table using text() for raw SQL
         from sqlalchemy import text
@@ -10,11 +10,11 @@ import re
 from datetime import datetime
 
 # Add the backend directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app import create_app
-from app.database import db
-from app.models import Subject, Chapter, Quiz
+from backend.app import create_worker_app
+from backend.app.database import db
+from backend.app.models import Subject, Chapter, Quiz
 
 def generate_slug(name):
     """Generate a slug from a name"""
@@ -23,7 +23,7 @@ def generate_slug(name):
 
 def add_slugs():
     """Add slugs to existing records"""
-    app = create_app()
+    app = create_worker_app()
     
     with app.app_context():
         print("Starting migration: Adding slugs to existing records...")
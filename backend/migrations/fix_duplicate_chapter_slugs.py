@@ -5,16 +5,16 @@ Migration script to fix duplicate chapter slugs across subjects
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app import create_app
-from app.models import Chapter, Subject
-from app.database import db
+from backend.app import create_worker_app
+from backend.app.models import Chapter, Subject
+from backend.app.database import db
 from collections import defaultdict
 
 def fix_duplicate_chapter_slugs():
     """Fix duplicate chapter slugs by making them unique within their context"""
-    app = create_app()
+    app = create_worker_app()
     
     with app.app_context():
         print("🔍 Checking for duplicate chapter slugs...")
@@ -101,7 +101,7 @@ def fix_duplicate_chapter_slugs():
 
 def check_current_duplicates():
     """Check current state of duplicate chapter names across subjects"""
-    app = create_app()
+    app = create_worker_app()
     
     with app.app_context():
         print("🔍 Current duplicate chapter names across subjects:")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script to copy the primary SQLite database into the local read replica.
+Use it to test read/write routing locally with two SQLite files:
+
+    REPLICA_DATABASE_URL=sqlite:///quizmaster_replica.db python sync_replica.py
+
+PostgreSQL replicas are kept in sync by streaming replication instead.
+"""
+
+import sys
+import os
+import sqlite3
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app
+from backend.app.database import db
+from backend.app.utils.db_routing import REPLICA_BIND_KEY
+
+def sync_replica():
+    """Copy the primary SQLite database into the replica file"""
+    app = create_app()
+    with app.app_context():
+        replica_engine = db.engines.get(REPLICA_BIND_KEY)
+        if replica_engine is None:
+            print("REPLICA_DATABASE_URL is not configured")
+            return
+
+        primary_url = db.engines[None].url
+        replica_url = replica_engine.url
+        if primary_url.get_backend_name() != 'sqlite' or replica_url.get_backend_name() != 'sqlite':
+            print("Only SQLite primary and replica files can be synced by this script")
+            return
+
+        # Use the backup API so the copy is consistent even while the app is running
+        source = sqlite3.connect(primary_url.database)
+        target = sqlite3.connect(replica_url.database)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        # Drop pooled connections that still point at the old replica contents
+        replica_engine.dispose()
+        print(f"Replica synced: {primary_url.database} -> {replica_url.database}")
+
+if __name__ == "__main__":
+    sync_replica()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import Config
+
+
+@pytest.fixture
+def worker_app(tmp_path, monkeypatch):
+    """Worker app on a scratch SQLite database, returned by get_worker_app() in tasks"""
+    import backend.app
+    from backend.app import create_worker_app
+    from backend.app.database import db
+
+    config_class = type('TestConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/test.db',
+        'SQLALCHEMY_BINDS': {},
+        'SLOW_QUERY_THRESHOLD_MS': 0,
+        'TESTING': True
+    })
+    app = create_worker_app(config_class)
+    with app.app_context():
+        db.create_all()
+    monkeypatch.setattr(backend.app, 'get_worker_app', lambda: app)
+    return app
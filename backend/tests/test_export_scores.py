@@ -0,0 +1,53 @@
+import os
+
+from backend.celery_tasks import tasks
+
+
+def test_failed_export_leaves_no_partial_file(worker_app, monkeypatch, tmp_path):
+    from backend.app.database import db
+    from backend.app.models import User
+
+    with worker_app.app_context():
+        user = User(username='student', email='student@example.com', password_hash='x', full_name='Student')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    def iter_user_score_rows(user_id, chunk_size=1000):
+        yield [[1, 'Quiz', 'Subject', 'Chapter', '2026-01-01', '1/2', '50.0%', 'No', 1, 0, '2026-01-01 10:00']]
+        raise RuntimeError('connection lost')
+
+    monkeypatch.setattr(tasks, 'iter_user_score_rows', iter_user_score_rows)
+    monkeypatch.setattr(tasks.export_user_scores_csv, 'update_state', lambda *args, **kwargs: None)
+    monkeypatch.chdir(tmp_path)
+
+    result = tasks.export_user_scores_csv(user_id)
+
+    assert result == {'status': 'error', 'message': 'connection lost'}
+    assert os.listdir(tmp_path / 'exports') == []
+
+
+def test_export_reads_its_batch_size_from_config(worker_app, monkeypatch, tmp_path):
+    from backend.app.database import db
+    from backend.app.models import User
+
+    with worker_app.app_context():
+        user = User(username='student', email='student@example.com', password_hash='x', full_name='Student')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    chunk_sizes = []
+
+    def iter_user_score_rows(user_id, chunk_size=1000):
+        chunk_sizes.append(chunk_size)
+        return iter(())
+
+    worker_app.config['EXPORT_BATCH_SIZE'] = 250
+    monkeypatch.setattr(tasks, 'iter_user_score_rows', iter_user_score_rows)
+    monkeypatch.setattr(tasks, 'send_export_notification', lambda *args: False)
+    monkeypatch.chdir(tmp_path)
+
+    assert tasks.export_user_scores_csv(user_id)['status'] == 'success'
+    assert tasks.export_user_scores_csv(user_id, chunk_size=10)['status'] == 'success'
+    assert chunk_sizes == [250, 10]
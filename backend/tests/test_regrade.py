@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from backend.app.utils.grading import grade_submission
+
+
+def _submit(db, quiz, user, answers, codec=None):
+    from backend.app.models import Score
+    from backend.app.utils.item_analysis import active_questions
+
+    grade = grade_submission(active_questions(quiz.id), answers, quiz.passing_score)
+    now = datetime.utcnow()
+    score = Score(user_id=user.id, quiz_id=quiz.id, score=grade['earned'], max_score=grade['max_score'],
+                  percentage=grade['percentage'], passed=grade['passed'], started_at=now, completed_at=now)
+    score.set_answers(answers, codec)
+    db.session.add(score)
+    db.session.commit()
+    return score.id
+
+
+def test_regrade_only_uses_the_questions_each_attempt_was_graded_on(worker_app):
+    from backend.app.database import db
+    from backend.app.models import User, Subject, Chapter, Quiz, Question, Score, AnswerLayout, RegradeJob
+    from backend.app.utils.item_analysis import active_questions
+    from backend.app.utils.regrade import run_regrade
+
+    with worker_app.app_context():
+        subject = Subject(name='Math', code='M1')
+        db.session.add(subject)
+        db.session.flush()
+        chapter = Chapter(name='Algebra', chapter_number=1, subject_id=subject.id)
+        db.session.add(chapter)
+        db.session.flush()
+        now = datetime.utcnow()
+        quiz = Quiz(title='Quiz', chapter_id=chapter.id, start_date=now - timedelta(days=1),
+                    end_date=now + timedelta(days=1), passing_score=60)
+        db.session.add(quiz)
+        db.session.flush()
+        first, second = (Question(quiz_id=quiz.id, question_text=f'q{i}', correct_answer='0', order=i, points=2)
+                         for i in range(2))
+        for question in (first, second):
+            question.set_options(['a', 'b', 'c', 'd'])
+            db.session.add(question)
+        user = User(username='student', email='student@example.com', password_hash='x', full_name='Student')
+        db.session.add(user)
+        db.session.commit()
+
+        answers = {str(first.id): '1', str(second.id): '0'}
+        packed_id = _submit(db, quiz, user, answers, AnswerLayout.for_questions(quiz.id, active_questions(quiz.id)))
+        json_id = _submit(db, quiz, user, answers)
+        assert db.session.get(Score, packed_id).answers_packed is not None
+
+        # After the attempts: a new question, the second one retired, then the first one's key fixed
+        added = Question(quiz_id=quiz.id, question_text='q2', correct_answer='0', order=2, points=5)
+        added.set_options(['a', 'b', 'c', 'd'])
+        db.session.add(added)
+        second.is_active = False
+        first.correct_answer = '1'
+        db.session.commit()
+
+        job, _ = RegradeJob.request(quiz.id)
+        assert RegradeJob.claim(job.id)
+        run_regrade(job)
+
+        assert job.status == 'completed'
+        assert job.changed == 2
+        for score_id in (packed_id, json_id):
+            score = db.session.get(Score, score_id)
+            assert (score.score, score.max_score, score.percentage, score.passed) == (4, 4, 100.0, True)
+
+        # Points changed on a question the packed attempt was graded on
+        first.points = 6
+        db.session.commit()
+        job, _ = RegradeJob.request(quiz.id)
+        assert RegradeJob.claim(job.id)
+        run_regrade(job)
+
+        packed = db.session.get(Score, packed_id)
+        assert (packed.score, packed.max_score) == (8, 8)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from backend.celery_tasks import tasks
+
+
+def test_failed_shard_is_reported_and_summary_still_runs(worker_app, monkeypatch):
+    def create_daily_reminders(now, start_id=None, end_id=None):
+        if start_id == 100:
+            raise RuntimeError('shard exploded')
+        return 3
+
+    monkeypatch.setattr(tasks, 'create_daily_reminders', create_daily_reminders)
+    run_at = datetime.utcnow().isoformat()
+
+    # One lane: a good shard, the failing one, then another good shard
+    lane = tasks.send_reminder_shard([], 1, 100, run_at)
+    lane = tasks.send_reminder_shard(lane, 100, 200, run_at)
+    lane = tasks.send_reminder_shard(lane, 200, None, run_at)
+
+    assert [shard['status'] for shard in lane] == ['success', 'error', 'success']
+    assert lane[1]['message'] == 'shard exploded'
+
+    summary = tasks.summarize_daily_reminders([lane], run_at)
+    assert summary['status'] == 'partial'
+    assert summary['reminders_created'] == 6
+    assert [shard['start_id'] for shard in summary['failed_shards']] == [100]